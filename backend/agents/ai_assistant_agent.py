@@ -1,71 +1,91 @@
-import requests
 import os
-from typing import Dict, List, Any
+from typing import Dict, List, Any, AsyncIterator, Tuple
 from backend.agents.base_agent import BaseAgent
+from backend.llm_utils import stream_llm_content
+from backend.rag import select_context
 from backend.utils import logger
 
 class AIAssistantAgent(BaseAgent):
     """Agent responsible for handling AI Chatbot requests using research context"""
-    
+
     def __init__(self):
         super().__init__("AI Assistant")
         self.google_api_key = os.getenv("GOOGLE_API_KEY")
-    
+        self.groq_api_key = os.getenv("GROQ_API_KEY")
+
     async def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Answer questions using the research context"""
         question = state.get("question", "")
-        context = state.get("context", "")
-        
+
         logger.info(f"[{self.name}] Answering question: {question}")
-        
-        if not self.google_api_key:
-            raise Exception("GOOGLE_API_KEY not configured")
-        
+
         if not question:
             logger.warning(f"[{self.name}] No question provided")
             state["answer"] = "No question provided."
             return state
-        
-        # Generate answer
-        answer = self._generate_answer_with_gemini(question, context)
-        
+
+        prompt, citations = await self._prepare_prompt(question, state.get("context", ""))
+
+        # Generate answer (Gemini, failing over to Groq)
+        try:
+            answer = "".join([text async for text in stream_llm_content(prompt)])
+        except Exception as e:
+            logger.error(f"[{self.name}] QA generation failed: {str(e)}")
+            raise Exception(f"Question answering failed: {str(e)}")
+
         logger.info(f"[{self.name}] Question answered successfully")
-        
+
         # Update state
         state["answer"] = answer
-        
+        state["citations"] = citations
+
         return state
-    
-    def _generate_answer_with_gemini(self, question: str, context: str) -> str:
-        """Generate answer using Google Gemini API"""
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key={self.google_api_key}"
-        
+
+    async def stream(self, state: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Answer a question incrementally, yielding citations, then text chunks as they are generated"""
+        question = state.get("question", "")
+
+        logger.info(f"[{self.name}] Streaming answer to question: {question}")
+
+        if not question:
+            yield {"type": "token", "text": "No question provided."}
+            return
+
+        prompt, citations = await self._prepare_prompt(question, state.get("context", ""))
+        yield {"type": "citations", "citations": citations}
+
+        async for text in stream_llm_content(prompt):
+            yield {"type": "token", "text": text}
+
+        logger.info(f"[{self.name}] Streamed answer finished")
+
+    async def _prepare_prompt(self, question: str, context: str) -> Tuple[str, List[Dict[str, Any]]]:
+        """Build the Q&A prompt from the chunks of context relevant to the question"""
+        if not self.google_api_key and not self.groq_api_key:
+            raise Exception("Neither GOOGLE_API_KEY nor GROQ_API_KEY is configured")
+
+        # Long contexts are narrowed to the chunks relevant to the question
+        citations = []
+        try:
+            selection = await select_context(context, question)
+            logger.info(
+                f"[{self.name}] Prompt context {selection.tokens_before} -> {selection.tokens_after} tokens "
+                f"({len(selection.chunks)} chunks, confidence {selection.confidence:.2f}"
+                f"{', full context' if selection.full_context else ''})"
+            )
+            context = selection.text
+            citations = selection.citations()
+        except Exception as e:
+            logger.warning(f"[{self.name}] Context retrieval failed, using full context: {str(e)}")
+
+        citation_instruction = " The context is split into numbered excerpts; cite the ones you use as [1], [2], etc." if citations else ""
         prompt = f"""You are a helpful AI assistant. Answer the following question using the provided context information.
-        
+
 Question: {question}
 
 Context Information:
 {context}
 
-Provide a clear and concise answer based on the context. If the context doesn't contain relevant information, say so."""
-
-        payload = {
-            "contents": [{
-                "parts": [{
-                    "text": prompt
-                }]
-            }],
-            "generationConfig": {
-                "temperature": 0.5,
-                "maxOutputTokens": 2048
-            }
-        }
-        
-        try:
-            response = requests.post(url, json=payload)
-            response.raise_for_status()
-            result = response.json()
-            return result["candidates"][0]["content"]["parts"][0]["text"]
-        except Exception as e:
-            logger.error(f"[{self.name}] Gemini QA failed: {str(e)}")
-            raise Exception(f"Question answering failed: {str(e)}")
\ No newline at end of file
+Provide a clear and concise answer based on the context. If the context doesn't contain relevant information, say so.{citation_instruction}"""
+
+        return prompt, citations
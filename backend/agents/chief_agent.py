@@ -1,4 +1,4 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from backend.agents.base_agent import BaseAgent
 from backend.agents.researcher_agent import ResearcherAgent
 from backend.agents.image_agent import ImageAgent
@@ -7,6 +7,7 @@ from backend.agents.report_agent import ReportAgent
 from backend.agents.ai_assistant_agent import AIAssistantAgent
 from backend.agents.document_analyzer_agent import DocumentAnalyzerAgent
 from backend.agents.local_document_analyzer import LocalDocumentAnalyzerAgent
+from backend.cpu_executor import CPUExecutorBusyError, CPUJobCancelled
 from backend.utils import logger
 
 class ChiefAgent(BaseAgent):
@@ -33,7 +34,7 @@ class ChiefAgent(BaseAgent):
                 logger.info(f"[{self.name}] Processing AI Chatbot request")
                 state = await self.ai_assistant.execute(state)
             # Check if this is a document analysis request
-            elif state.get("file_base64"):
+            elif state.get("file_base64") or state.get("file_path"):
                 # For document analysis, try API-based first, then Groq, then local
                 logger.info(f"[{self.name}] Processing document analysis request")
                 try:
@@ -41,12 +42,17 @@ class ChiefAgent(BaseAgent):
                     state = await self.document_analyzer.execute(state)
                     # If we get here, the analysis was successful (even if it used fallback)
                     logger.info(f"[{self.name}] Document analysis completed successfully")
+                except CPUExecutorBusyError:
+                    # Local analysis would queue on the same executor
+                    raise
                 except Exception as llm_error:
                     logger.warning(f"[{self.name}] LLM document analysis failed: {str(llm_error)}")
                     try:
                         # Second try: Local document analyzer as final fallback
                         logger.info(f"[{self.name}] Falling back to local document analysis")
                         state = await self.local_document_analyzer.execute(state)
+                    except (CPUExecutorBusyError, CPUJobCancelled):
+                        raise
                     except Exception as local_error:
                         logger.error(f"[{self.name}] All document analysis methods failed. LLM error: {str(llm_error)}, Local error: {str(local_error)}")
                         # If all methods fail, provide a meaningful error message
@@ -94,4 +100,15 @@ We apologize for the inconvenience."""
             
         except Exception as e:
             logger.error(f"[{self.name}] Workflow failed: {str(e)}")
-            raise e
\ No newline at end of file
+            raise e
+
+
+_chief_agent: Optional[ChiefAgent] = None
+
+
+def get_chief_agent() -> ChiefAgent:
+    """Return the shared chief agent; agents keep no per-request state, so one instance serves every request"""
+    global _chief_agent
+    if _chief_agent is None:
+        _chief_agent = ChiefAgent()
+    return _chief_agent
@@ -1,76 +1,251 @@
-import requests
 import os
-from typing import Dict, Any
+import time
+import asyncio
+from typing import Dict, Any, Awaitable, Callable, Iterator, List, Optional, Tuple
 from .base_agent import BaseAgent
+from .local_document_analyzer import LocalDocumentAnalyzerAgent
 from ..utils import logger
 from ..llm_utils import generate_llm_content
+from ..rag import TextChunker
+from ..cpu_executor import CPUExecutorBusyError, get_cpu_executor
+
+# Map-reduce over long documents: chunk size, parallel LLM calls, and the
+# size of the summaries combined in one reduce call
+DOC_ANALYSIS_CHUNK_TOKENS = int(os.getenv("DOC_ANALYSIS_CHUNK_TOKENS", "3000"))
+DOC_ANALYSIS_CHUNK_OVERLAP_TOKENS = int(os.getenv("DOC_ANALYSIS_CHUNK_OVERLAP_TOKENS", "150"))
+DOC_ANALYSIS_CONCURRENCY = int(os.getenv("DOC_ANALYSIS_CONCURRENCY", "4"))
+DOC_ANALYSIS_REDUCE_TOKENS = int(os.getenv("DOC_ANALYSIS_REDUCE_TOKENS", "12000"))
+
+REPORT_INSTRUCTIONS = """Structure your response with these sections:
+1. EXECUTIVE SUMMARY: A clear overview of what the document is about
+2. KEY TOPICS COVERED: The main subjects discussed
+3. MAIN ARGUMENTS/POINTS: Core ideas or positions presented
+4. SIGNIFICANT DETAILS: Important facts, figures, or examples
+5. CONCLUSION: Overall takeaway from the document
+
+Provide a detailed, accessible explanation without technical jargon."""
+
+SUMMARY_INSTRUCTION = "You are a precise research assistant. Summarize faithfully without adding information."
 
 class DocumentAnalyzerAgent(BaseAgent):
     """Agent responsible for analyzing documents using multiple LLM providers with fallback support"""
-    
+
     def __init__(self):
         super().__init__("Document Analyzer")
         self.google_api_key = os.getenv("GOOGLE_API_KEY")
-    
+        self.extractor = LocalDocumentAnalyzerAgent()
+        self.chunker = TextChunker(DOC_ANALYSIS_CHUNK_TOKENS, DOC_ANALYSIS_CHUNK_OVERLAP_TOKENS)
+
     async def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze document using LLM providers with fallback support"""
         file_base64 = state.get("file_base64", "")
+        file_path = state.get("file_path")
         mime_type = state.get("mime_type", "text/plain")
-        
+
         logger.info(f"[{self.name}] Analyzing document with MIME type: {mime_type}")
-        
-        if not file_base64:
+
+        if not file_base64 and not file_path:
             raise Exception("No document content provided")
-        
+
         # Analyze document using improved LLM utility with fallback support
+        # Text is extracted and chunked lazily, so only the chunks being summarized are held in memory
+        pieces = self.extractor.iter_text(file_base64, mime_type, file_path, state.get("content_sha256"), state.get("pages"))
+        chunk_stream = self.chunker.split_stream(pieces)
         try:
-            analysis_result = self._analyze_document_with_llm(file_base64, mime_type)
-            
+            analysis_result = await self._analyze_document_with_llm(chunk_stream, mime_type, state.get("llm_limiter"))
+
             # Check if we got a fallback response and treat it as a valid response
             # but log that we're using fallback content
             if analysis_result.get("provider") == "Fallback":
                 logger.warning(f"[{self.name}] Using fallback response due to LLM failures")
-            
+
             logger.info(f"[{self.name}] Document analysis completed using {analysis_result.get('provider', 'Unknown')}")
-            
+
             # Update state
             state["report"] = analysis_result.get("content", "")
             state["sources"] = [{"title": "Uploaded Document", "uri": "#local-file"}]
             state["images"] = []
-            
+            # Only genuine LLM reports are worth reusing for the same document
+            state["report_cacheable"] = analysis_result.get("provider") != "Fallback"
+
             return state
+        except CPUExecutorBusyError:
+            raise
         except Exception as e:
             logger.error(f"[{self.name}] Document analysis failed: {str(e)}")
             # Re-raise to trigger the next fallback in the chain
             raise Exception(f"Document analysis failed: {str(e)}")
-    
-    def _analyze_document_with_llm(self, file_base64: str, mime_type: str) -> Dict[str, Any]:
-        """Analyze document using LLM providers with comprehensive fallback support"""
+        finally:
+            try:
+                chunk_stream.close()
+                pieces.close()
+            except ValueError:
+                # Still running on a worker thread after a cancellation; it is closed when collected
+                pass
+
+    async def _analyze_document_with_llm(self, chunk_stream: Iterator[str], mime_type: str,
+                                         limiter: Optional[asyncio.Semaphore] = None) -> Dict[str, Any]:
+        """
+        Map-reduce the document text: summarize chunks concurrently, then write the report from the summaries.
+        limiter, if given, caps LLM calls shared with other documents (e.g. of one batch).
+        """
         try:
+            started = time.perf_counter()
+
+            async def next_chunk() -> Optional[str]:
+                # Extraction and chunking are CPU-bound and advance one chunk per call
+                return await get_cpu_executor().run(next, chunk_stream, None, name="document chunk extraction")
+
+            first = await next_chunk()
+            if first is None:
+                raise Exception("No readable text found in the document")
+            second = await next_chunk()
+
+            if second is None:
+                # Short documents go to the LLM in a single pass
+                chunk_count = 1
+                source = f"Document text:\n{first}"
+            else:
+                logger.info(f"[{self.name}] Summarizing chunks with concurrency {DOC_ANALYSIS_CONCURRENCY}")
+                summaries, chunk_count = await self._map_chunks([first, second], next_chunk, limiter)
+                del first, second
+                summaries = await self._reduce_summaries(summaries, limiter)
+                source = "Summaries of consecutive sections of the document, in order:\n\n" + "\n\n".join(summaries)
+
             # Use our enhanced LLM utility that handles multiple providers with fallback
-            prompt = f"""Analyze this document (MIME type: {mime_type}) and provide a comprehensive, meaningful summary of its contents. 
-            Focus on the key points, main ideas, and important details.
-            Structure your response with these sections:
-            1. EXECUTIVE SUMMARY: A clear overview of what the document is about
-            2. KEY TOPICS COVERED: The main subjects discussed
-            3. MAIN ARGUMENTS/POINTS: Core ideas or positions presented
-            4. SIGNIFICANT DETAILS: Important facts, figures, or examples
-            5. CONCLUSION: Overall takeaway from the document
-            
-            Provide a detailed, accessible explanation without technical jargon."""
-            
+            prompt = f"""Analyze this document (MIME type: {mime_type}) and provide a comprehensive, meaningful summary of its contents.
+Focus on the key points, main ideas, and important details.
+{REPORT_INSTRUCTIONS}
+
+{source}"""
+
             system_instruction = "You are a professional document analyst. Provide a thorough, insightful analysis of the document content."
-            
+
             # Try to generate content using our improved LLM utility with fallback
-            result = generate_llm_content(
-                prompt=prompt,
-                system_instruction=system_instruction,
-                is_report=True
-            )
-            
+            result = await self._generate(limiter, prompt, system_instruction, True)
+
+            logger.info(f"[{self.name}] Map-reduce over {chunk_count} chunks took {time.perf_counter() - started:.1f}s")
             return result
-            
+
+        except CPUExecutorBusyError:
+            raise
         except Exception as e:
             logger.error(f"[{self.name}] LLM document analysis failed: {str(e)}")
             # Re-raise to trigger the next fallback in the chain
-            raise Exception(f"LLM document analysis failed: {str(e)}")
\ No newline at end of file
+            raise Exception(f"LLM document analysis failed: {str(e)}")
+
+    async def synthesize(self, reports: List[Tuple[str, str]], limiter: Optional[asyncio.Semaphore] = None) -> Dict[str, Any]:
+        """Cross-document synthesis of several documents' (name, report) pairs"""
+        sections = [f"Document {index}: {name}\n{report}" for index, (name, report) in enumerate(reports, start=1)]
+        sections = await self._reduce_summaries(sections, limiter)
+        prompt = f"""Synthesize the analyses of these {len(reports)} documents into one report.
+Structure your response with these sections:
+1. OVERVIEW: What the documents are about as a set
+2. COMMON THEMES: Topics and conclusions the documents share
+3. DIFFERENCES AND CONTRADICTIONS: Where the documents disagree or diverge, naming them
+4. NOTABLE DETAILS: Facts and figures that stand out, with the document they come from
+5. CONCLUSION: Overall takeaway across the documents
+
+""" + "\n\n".join(sections)
+        system_instruction = "You are a professional document analyst comparing several documents. Attribute every point to its documents."
+        result = await self._generate(limiter, prompt, system_instruction, True)
+        logger.info(f"[{self.name}] Synthesized {len(reports)} documents using {result.get('provider', 'Unknown')}")
+        return result
+
+    async def _generate(self, limiter: Optional[asyncio.Semaphore], *args) -> Dict[str, Any]:
+        """generate_llm_content(*args) off the event loop, within the shared limiter if there is one"""
+        if limiter is None:
+            return await asyncio.to_thread(generate_llm_content, *args)
+        async with limiter:
+            return await asyncio.to_thread(generate_llm_content, *args)
+
+    async def _summarize(self, prompt: str, limiter: Optional[asyncio.Semaphore]) -> Optional[str]:
+        """One summarization call; None marks a failed call"""
+        result = await self._generate(limiter, prompt, SUMMARY_INSTRUCTION, False)
+        if result.get("provider") == "Fallback":
+            return None
+        return result.get("content")
+
+    async def _summarize_all(self, prompts: List[str], limiter: Optional[asyncio.Semaphore]) -> List[Optional[str]]:
+        """Run one LLM call per prompt, at most DOC_ANALYSIS_CONCURRENCY at a time; None marks a failed call"""
+        semaphore = asyncio.Semaphore(DOC_ANALYSIS_CONCURRENCY)
+
+        async def summarize(prompt: str) -> Optional[str]:
+            async with semaphore:
+                return await self._summarize(prompt, limiter)
+
+        return await asyncio.gather(*[summarize(prompt) for prompt in prompts])
+
+    async def _map_chunks(self, chunks: List[str], next_chunk: Callable[[], Awaitable[Optional[str]]],
+                          limiter: Optional[asyncio.Semaphore]) -> Tuple[List[str], int]:
+        """
+        Summarize the given chunks and then every further chunk from next_chunk(),
+        keeping document order. A chunk is only pulled once a summarization slot
+        is free, so at most DOC_ANALYSIS_CONCURRENCY chunks are held at a time.
+        Returns the summaries and the number of chunks.
+        """
+        semaphore = asyncio.Semaphore(DOC_ANALYSIS_CONCURRENCY)
+        tasks: List[asyncio.Task] = []
+
+        async def summarize(index: int, chunk: str) -> Optional[str]:
+            try:
+                return await self._summarize(
+                    f"""Summarize part {index} of a document. Keep the key points, arguments, names, facts and figures.
+Use concise bullet points.
+
+{chunk}""", limiter)
+            finally:
+                semaphore.release()
+
+        try:
+            while True:
+                await semaphore.acquire()
+                chunk = chunks.pop(0) if chunks else await next_chunk()
+                if chunk is None:
+                    semaphore.release()
+                    break
+                tasks.append(asyncio.create_task(summarize(len(tasks) + 1, chunk)))
+            summaries = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        failed = sum(1 for summary in summaries if summary is None)
+        if failed == len(summaries):
+            raise Exception("All chunk summaries failed")
+        if failed:
+            logger.warning(f"[{self.name}] {failed} of {len(summaries)} chunk summaries failed and were skipped")
+        return [summary for summary in summaries if summary], len(summaries)
+
+    async def _reduce_summaries(self, summaries: List[str], limiter: Optional[asyncio.Semaphore]) -> List[str]:
+        """Merge groups of summaries until they fit in one reduce prompt"""
+        while self.chunker.count_tokens("\n\n".join(summaries)) > DOC_ANALYSIS_REDUCE_TOKENS and len(summaries) > 1:
+            groups: List[List[str]] = [[]]
+            group_tokens = 0
+            for summary in summaries:
+                tokens = self.chunker.count_tokens(summary)
+                if groups[-1] and group_tokens + tokens > DOC_ANALYSIS_REDUCE_TOKENS:
+                    groups.append([])
+                    group_tokens = 0
+                groups[-1].append(summary)
+                group_tokens += tokens
+            if len(groups) == len(summaries):
+                # Every summary is already as large as the budget; merge pairwise
+                groups = [summaries[i:i + 2] for i in range(0, len(summaries), 2)]
+
+            logger.info(f"[{self.name}] Reducing {len(summaries)} summaries in {len(groups)} groups")
+            prompts = [
+                "Combine these consecutive section summaries into one concise bullet-point summary, keeping all key facts:\n\n"
+                + "\n\n".join(group)
+                for group in groups
+            ]
+            merged = await self._summarize_all(prompts, limiter)
+            # Keep a group's original summaries if merging it failed
+            summaries = [
+                summary if summary else "\n\n".join(group)
+                for summary, group in zip(merged, groups)
+            ]
+            if all(summary is None for summary in merged):
+                break
+        return summaries
@@ -1,10 +1,53 @@
 import base64
+import codecs
 import io
-import re
-from typing import Dict, Any
+import mmap
+import os
+from contextlib import closing
+from typing import Dict, Any, Iterator, Optional, Union
 from .base_agent import BaseAgent
+from ..cpu_executor import CPUExecutorBusyError, CPUJobCancelled, check_cancelled, get_cpu_executor
+from ..document_cache import document_key, get_document_cache
+from ..lifecycle import lazy_import
+from ..pdf_extraction import PageRange, iter_pdf_pages
+from ..simhash import MIN_DOCUMENT_SHINGLES, SimHashBuilder
+from ..summarizer import rank_sentences, top_sentences
+from ..text_stats import TextStats, TextStatsBuilder
 from ..utils import logger
 
+# Plain text is decoded and analyzed in blocks of this size
+DECODE_BLOCK_BYTES = 1024 * 1024
+# Sentences extracted for the executive summary and the main points
+SUMMARY_SENTENCES = 4
+KEY_POINT_SENTENCES = 12
+
+class _MappedFile(io.RawIOBase):
+    """Seekable read-only file over a memory map (mmap has no seekable() before Python 3.13)"""
+    
+    def __init__(self, buffer: mmap.mmap):
+        self._buffer = buffer
+        self._position = 0
+    
+    def readable(self) -> bool:
+        return True
+    
+    def seekable(self) -> bool:
+        return True
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: len(self._buffer)}[whence]
+        self._position = max(base + offset, 0)
+        return self._position
+    
+    def readinto(self, target) -> int:
+        data = self._buffer[self._position:self._position + len(target)]
+        target[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+
 class LocalDocumentAnalyzerAgent(BaseAgent):
     """Agent responsible for analyzing documents locally without external APIs"""
     
@@ -14,16 +57,20 @@ class LocalDocumentAnalyzerAgent(BaseAgent):
     async def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze document locally using open-source libraries"""
         file_base64 = state.get("file_base64", "")
+        file_path = state.get("file_path")
         mime_type = state.get("mime_type", "text/plain")
         
         logger.info(f"[{self.name}] Analyzing document locally with MIME type: {mime_type}")
         
-        if not file_base64:
+        if not file_base64 and not file_path:
             raise Exception("No document content provided")
         
         try:
-            # Analyze document locally
-            analysis_result = self._analyze_document_locally(file_base64, mime_type)
+            # Analyze document locally, on the CPU executor rather than the event loop
+            analysis_result = await get_cpu_executor().run(
+                self._analyze_document_locally, file_base64, mime_type, file_path, state.get("content_sha256"),
+                state.get("pages"), name="local document analysis"
+            )
             
             logger.info(f"[{self.name}] Local document analysis completed")
             
@@ -33,6 +80,9 @@ class LocalDocumentAnalyzerAgent(BaseAgent):
             state["images"] = []
             
             return state
+        except (CPUExecutorBusyError, CPUJobCancelled):
+            # Overload and cancellation are not analysis failures
+            raise
         except Exception as e:
             logger.error(f"[{self.name}] Local document analysis failed: {str(e)}")
             # Provide a minimal fallback report even if local analysis fails
@@ -56,130 +106,172 @@ We're committed to providing analysis capabilities even when external services a
             # Return the state with the fallback report instead of re-raising the exception
             return state
     
-    def _analyze_document_locally(self, file_base64: str, mime_type: str) -> str:
+    def _analyze_document_locally(self, file_base64: str, mime_type: str, file_path: Optional[str] = None,
+                                  content_sha256: Optional[str] = None, pages: Optional[PageRange] = None) -> str:
         """Analyze document locally using open-source libraries"""
         try:
             # Validate input
-            if not file_base64:
+            if not file_base64 and not file_path:
                 raise ValueError("No document content provided")
             
-            # Decode base64 content
-            file_bytes = base64.b64decode(file_base64)
-            
-            # Extract text based on file type
-            text_content = self._extract_text(file_bytes, mime_type)
+            # Statistics are gathered as the text is extracted, so the whole text is never held at once
+            builder = TextStatsBuilder()
+            with closing(self.iter_text(file_base64, mime_type, file_path, content_sha256, pages)) as pieces:
+                for piece in pieces:
+                    check_cancelled()
+                    builder.feed(piece)
+            stats = builder.finish()
             
             # Validate extracted text
-            if not text_content or len(text_content.strip()) == 0:
-                text_content = "No readable content found in the document. This might be an image-based PDF or a document with unsupported formatting."
+            if not stats.word_count:
+                stats = TextStatsBuilder().feed("No readable content found in the document. This might be an image-based PDF or a document with unsupported formatting.").finish()
             
             # Perform local analysis
-            analysis_report = self._generate_local_analysis(text_content)
+            analysis_report = self._generate_local_analysis(stats)
             
             return analysis_report
             
+        except CPUJobCancelled:
+            raise
         except Exception as e:
             logger.error(f"[{self.name}] Local document analysis failed: {str(e)}")
             # Re-raise to be handled by the caller
             raise Exception(f"Local document analysis failed: {str(e)}")
     
-    def _extract_text(self, file_bytes: bytes, mime_type: str) -> str:
-        """Extract text from document based on MIME type"""
-        try:
-            if mime_type == "application/pdf":
-                # PDF extraction using pdfplumber
-                try:
-                    import pdfplumber
-                    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-                        text = ""
-                        for page in pdf.pages:
-                            page_text = page.extract_text()
-                            if page_text:
-                                text += page_text + "\n"
-                        return text
-                except ImportError:
-                    logger.warning(f"[{self.name}] pdfplumber not available, trying PyPDF2")
-                    # Fallback to PyPDF2 if pdfplumber is not available
-                    try:
-                        import PyPDF2
-                        pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_bytes))
-                        text = ""
-                        for page in pdf_reader.pages:
-                            page_text = page.extract_text()
-                            if page_text:
-                                text += page_text + "\n"
-                        return text
-                    except ImportError:
-                        logger.warning(f"[{self.name}] PyPDF2 not available, falling back to text decoding")
-                        # Final fallback - decode as text
-                        return file_bytes.decode('utf-8', errors='ignore')
-                except Exception as e:
-                    logger.warning(f"[{self.name}] PDF extraction failed with pdfplumber: {str(e)}, trying PyPDF2")
-                    # Try PyPDF2 as fallback
-                    try:
-                        import PyPDF2
-                        pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_bytes))
-                        text = ""
-                        for page in pdf_reader.pages:
-                            page_text = page.extract_text()
-                            if page_text:
-                                text += page_text + "\n"
-                        return text
-                    except Exception as e2:
-                        logger.warning(f"[{self.name}] PDF extraction failed with PyPDF2: {str(e2)}, falling back to text decoding")
-                        # Final fallback - decode as text
-                        return file_bytes.decode('utf-8', errors='ignore')
-            
-            elif mime_type in ["application/vnd.openxmlformats-officedocument.wordprocessingml.document", 
-                              "application/msword"]:
-                # Word document extraction
-                try:
-                    from docx import Document
-                    doc = Document(io.BytesIO(file_bytes))
-                    text = ""
-                    for paragraph in doc.paragraphs:
-                        text += paragraph.text + "\n"
-                    return text
-                except ImportError:
-                    logger.warning(f"[{self.name}] python-docx not available, falling back to text decoding")
-                    # Fallback - decode as text
-                    return file_bytes.decode('utf-8', errors='ignore')
-                except Exception as e:
-                    logger.warning(f"[{self.name}] Word document extraction failed: {str(e)}, falling back to text decoding")
-                    # Fallback - decode as text
-                    return file_bytes.decode('utf-8', errors='ignore')
-            
-            elif mime_type.startswith("text/"):
-                # Plain text files
-                return file_bytes.decode('utf-8', errors='ignore')
-            
-            else:
-                # For other file types, try to decode as text
-                logger.info(f"[{self.name}] Unknown MIME type {mime_type}, attempting text decoding")
-                return file_bytes.decode('utf-8', errors='ignore')
-                
-        except Exception as e:
-            logger.warning(f"[{self.name}] Text extraction failed, using raw content: {str(e)}")
-            return file_bytes.decode('utf-8', errors='ignore')
+    def iter_text(self, file_base64: Optional[str], mime_type: str, file_path: Optional[str] = None,
+                  content_sha256: Optional[str] = None, pages: Optional[PageRange] = None) -> Iterator[str]:
+        """
+        Yield the text of a document (base64 content or a file on disk) piece by
+        piece: PDF pages, Word paragraphs or blocks of plain text. pages limits
+        a PDF to a (first, last) page range. Cached text is reused by content hash.
+        """
+        cache = get_document_cache()
+        key = document_key(content_sha256, mime_type, pages) if content_sha256 and cache.enabled else None
+        if key:
+            cached = cache.iter_text(key)
+            if cached is not None:
+                logger.info(f"[{self.name}] Reusing extracted text from the document cache")
+                yield from cached
+                return
+        
+        writer = cache.text_writer(key) if key else None
+        for piece in self._iter_extracted(file_base64, mime_type, file_path, pages):
+            if writer:
+                writer.write(piece)
+            yield piece
+        if writer:
+            writer.commit()
+    
+    def fingerprint(self, file_base64: Optional[str], mime_type: str, file_path: Optional[str] = None,
+                    content_sha256: Optional[str] = None, pages: Optional[PageRange] = None) -> Optional[int]:
+        """SimHash of the document's text, or None if it is too short to compare"""
+        builder = SimHashBuilder()
+        with closing(self.iter_text(file_base64, mime_type, file_path, content_sha256, pages)) as pieces:
+            for piece in pieces:
+                check_cancelled()
+                builder.feed(piece)
+        fingerprint = builder.finish()
+        return fingerprint if builder.shingles >= MIN_DOCUMENT_SHINGLES else None
+    
+    def extract_text(self, file_base64: Optional[str], mime_type: str, file_path: Optional[str] = None,
+                     content_sha256: Optional[str] = None, pages: Optional[PageRange] = None) -> str:
+        """Extract the text of a document given as base64 content or a file on disk, as one string"""
+        return "".join(self.iter_text(file_base64, mime_type, file_path, content_sha256, pages))
+    
+    def _iter_extracted(self, file_base64: Optional[str], mime_type: str, file_path: Optional[str],
+                        pages: Optional[PageRange]) -> Iterator[str]:
+        if file_path:
+            # Uploaded files are memory-mapped rather than read into memory
+            if os.path.getsize(file_path) == 0:
+                return
+            with open(file_path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    yield from self._iter_document(buffer, mime_type, file_path, pages)
+        else:
+            # Decode base64 content
+            file_bytes = base64.b64decode(file_base64)
+            yield from self._iter_document(file_bytes, mime_type, None, pages)
+    
+    def _stream(self, file_bytes: Union[bytes, mmap.mmap]):
+        """Seekable file-like view of the document without copying a memory map"""
+        if isinstance(file_bytes, mmap.mmap):
+            return io.BufferedReader(_MappedFile(file_bytes))
+        return io.BytesIO(file_bytes)
     
-    def _generate_local_analysis(self, text_content: str) -> str:
-        """Generate analysis report using local text processing"""
-        # Clean and preprocess text
-        cleaned_text = self._clean_text(text_content)
+    def _iter_decoded(self, file_bytes: Union[bytes, mmap.mmap]) -> Iterator[str]:
+        """Decode the document as UTF-8 text, a block at a time"""
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        for start in range(0, len(file_bytes), DECODE_BLOCK_BYTES):
+            yield decoder.decode(file_bytes[start:start + DECODE_BLOCK_BYTES])
+        yield decoder.decode(b"", final=True)
+    
+    def _iter_document(self, file_bytes: Union[bytes, mmap.mmap], mime_type: str, file_path: Optional[str] = None,
+                       pages: Optional[PageRange] = None) -> Iterator[str]:
+        """Yield text from document based on MIME type; file_path is the document's location on disk, if any"""
+        if pages and mime_type != "application/pdf":
+            logger.info(f"[{self.name}] Page ranges apply to PDFs only; reading the whole {mime_type} document")
+        
+        if mime_type == "application/pdf":
+            # Page-parallel extraction with pdfplumber, retrying unreadable pages with pypdf
+            first_page, last_page = pages or (1, None)
+            pdf_pages = iter_pdf_pages(file_path or file_bytes, first_page, last_page)
+            try:
+                first = next(pdf_pages, None)
+            except Exception as e:
+                logger.warning(f"[{self.name}] PDF extraction failed: {str(e)}, falling back to text decoding")
+                # Final fallback - decode as text
+                yield from self._iter_decoded(file_bytes)
+                return
+            if first is not None:
+                yield first
+                yield from pdf_pages
+        
+        elif mime_type in ["application/vnd.openxmlformats-officedocument.wordprocessingml.document", 
+                          "application/msword"]:
+            # Word document extraction
+            try:
+                Document = lazy_import("docx").Document
+                doc = Document(self._stream(file_bytes))
+            except ImportError:
+                logger.warning(f"[{self.name}] python-docx not available, falling back to text decoding")
+                # Fallback - decode as text
+                yield from self._iter_decoded(file_bytes)
+                return
+            except Exception as e:
+                logger.warning(f"[{self.name}] Word document extraction failed: {str(e)}, falling back to text decoding")
+                # Fallback - decode as text
+                yield from self._iter_decoded(file_bytes)
+                return
+            for paragraph in doc.paragraphs:
+                yield paragraph.text + "\n"
         
+        elif mime_type.startswith("text/"):
+            # Plain text files
+            yield from self._iter_decoded(file_bytes)
+        
+        else:
+            # For other file types, try to decode as text
+            logger.info(f"[{self.name}] Unknown MIME type {mime_type}, attempting text decoding")
+            yield from self._iter_decoded(file_bytes)
+    
+    def _generate_local_analysis(self, stats: TextStats) -> str:
+        """Generate analysis report from the document's text statistics"""
         # Get basic statistics
-        word_count = len(cleaned_text.split())
-        char_count = len(cleaned_text)
-        sentence_count = len(re.split(r'[.!?]+', cleaned_text))
+        word_count = stats.word_count
+        char_count = stats.char_count
+        sentence_count = stats.sentence_count
+        
+        # Rank sentences by centrality (LexRank) for the summary and the key points
+        ranking = rank_sentences(stats.sentences)
         
         # Extract key information
-        key_points = self._extract_key_points(cleaned_text)
-        entities = self._extract_entities(cleaned_text)
-        topics = self._get_topics(cleaned_text)
-        sentiment = self._analyze_sentiment(cleaned_text)
+        key_points = self._extract_key_points(stats, ranking)
+        entities = self._extract_entities(stats)
+        topics = self._get_topics(stats)
+        sentiment = self._analyze_sentiment(stats)
         
         # Generate meaningful summary
-        summary = self._generate_meaningful_summary(cleaned_text, key_points, topics)
+        summary = self._generate_meaningful_summary(stats, ranking, topics)
         
         # Generate report
         report = f"""# Document Analysis Report
@@ -194,7 +286,7 @@ We're committed to providing analysis capabilities even when external services a
 
 ## Main Points and Arguments
 
-{chr(10).join([f"- {point}" for point in key_points[:12]]) if key_points else "No key points identified"}
+{chr(10).join([f"- {point}" for point in key_points]) if key_points else "No key points identified"}
 
 ## Document Statistics
 
@@ -213,7 +305,7 @@ We're committed to providing analysis capabilities even when external services a
 
 ## Analysis Methodology
 
-This analysis was conducted entirely locally using open-source text processing techniques. No external APIs or cloud services were utilized, ensuring complete data privacy and offline capability.
+This analysis was conducted entirely locally using open-source text processing techniques. The summary and main points are the document's own most central sentences, ranked with LexRank over TF-IDF sentence similarity. No external APIs or cloud services were utilized, ensuring complete data privacy and offline capability.
 
 ## Conclusion
 
@@ -221,87 +313,40 @@ The document has been successfully analyzed using local processing techniques. T
 
         return report
     
-    def _clean_text(self, text: str) -> str:
-        """Clean and normalize text"""
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        # Remove special characters but keep punctuation
-        text = re.sub(r'[^\w\s.,!?;:-]', ' ', text)
-        return text.strip()
-    
-    def _extract_key_points(self, text: str) -> list:
-        """Extract key points from text"""
-        # Simple approach: extract sentences that seem important
-        sentences = re.split(r'[.!?]+', text)
-        key_points = []
-        
-        # Look for sentences with certain characteristics
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if len(sentence) > 20 and len(sentence) < 300:  # Reasonable length
-                # Look for sentences with numbers, capitalized words, or key terms
-                if (re.search(r'\d+', sentence) or 
-                    len(re.findall(r'\b[A-Z]{2,}\b', sentence)) > 1 or
-                    any(term in sentence.lower() for term in ['important', 'significant', 'critical', 'key', 'main', 'primary'])):
-                    key_points.append(sentence)
+    def _extract_key_points(self, stats: TextStats, ranking: list) -> list:
+        """Extract key points from text: the most central sentences, in document order"""
+        key_points = top_sentences(stats.sentences, ranking, KEY_POINT_SENTENCES)
         
-        # If we didn't find enough key points, just take the first few sentences
-        if len(key_points) < 3:
-            key_points = [s.strip() for s in sentences[:5] if len(s.strip()) > 20]
+        # Documents without sentences of a reportable length: take the first few sentences
+        if not key_points:
+            key_points = [s for s in stats.opening_sentences if len(s) > 20]
         
         return key_points if key_points else ["Document content analysis completed."]
     
-    def _extract_entities(self, text: str) -> list:
+    def _extract_entities(self, stats: TextStats) -> list:
         """Extract named entities from text"""
-        # Simple entity extraction without spaCy
-        entities = []
+        # Simple entity extraction without spaCy: the most frequent capitalized names
+        entities = stats.top_names(10)
         
-        # Extract potential names (capitalized words)
-        names = re.findall(r'\b[A-Z][a-z]+(?:\s[A-Z][a-z]+)*\b', text)
-        # Filter out common words
-        common_words = {'The', 'This', 'That', 'These', 'Those', 'With', 'From', 'They', 'Will', 'Would', 'There', 'What', 'When', 'Where', 'Which', 'While', 'These', 'Those', 'Than', 'Been', 'Were', 'Could', 'Should', 'Might', 'Must', 'About', 'After', 'Before', 'Under'}
-        entities.extend([name for name in names if name not in common_words and len(name) > 2])
+        # Potential emails
+        entities.extend([f"Email: {email}" for email in stats.emails])
         
-        # Extract potential numbers/dates
-        numbers = re.findall(r'\b\d+(?:\.\d+)?\b', text)
-        entities.extend([f"Number: {num}" for num in numbers[:5]])
+        # Potential numbers/dates
+        entities.extend([f"Number: {num}" for num in stats.numbers])
         
-        # Extract potential emails
-        emails = re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text)
-        entities.extend([f"Email: {email}" for email in emails])
-        
-        return list(set(entities))  # Remove duplicates
+        # Each entity once, in order
+        return list(dict.fromkeys(entities))
     
-    def _get_topics(self, text: str) -> list:
+    def _get_topics(self, stats: TextStats) -> list:
         """Extract key topics from the document"""
-        # Simple word frequency analysis
-        words = re.findall(r'\b[a-zA-Z]{4,}\b', text.lower())
-        word_freq = {}
-        for word in words:
-            word_freq[word] = word_freq.get(word, 0) + 1
-        
-        # Sort by frequency and filter for meaningful topics
-        sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-        topics = []
-        
-        # Common stop words to exclude
-        stop_words = {'that', 'have', 'with', 'this', 'from', 'they', 'will', 'would', 'there', 'what', 'when', 'where', 'which', 'while', 'these', 'those', 'than', 'been', 'were', 'could', 'should', 'might', 'must', 'about', 'into', 'over', 'after', 'before', 'under', 'above', 'below', 'between', 'among', 'through', 'during', 'without', 'within', 'along', 'across', 'behind', 'beyond', 'toward', 'around', 'amongst', 'throughout'}
-        
-        for word, freq in sorted_words[:20]:
-            if word not in stop_words and freq > 1:
-                topics.append(f"{word.title()} (mentioned {freq} times)")
-        
-        return topics[:10]  # Return top 10 topics
+        # Simple word frequency analysis, excluding stop words
+        return [f"{word.title()} (mentioned {freq} times)" for word, freq in stats.top_words(10)]
     
-    def _analyze_sentiment(self, text: str) -> str:
+    def _analyze_sentiment(self, stats: TextStats) -> str:
         """Perform basic sentiment analysis"""
-        # Simple sentiment keywords
-        positive_words = {'good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic', 'brilliant', 'outstanding', 'superb', 'remarkable', 'positive', 'successful', 'beneficial', 'advantageous', 'favorable', 'promising', 'encouraging', 'impressive', 'valuable', 'effective'}
-        negative_words = {'bad', 'terrible', 'awful', 'horrible', 'dreadful', 'abysmal', 'poor', 'negative', 'disappointing', 'frustrating', 'problematic', 'difficult', 'challenging', 'concerning', 'worrying', 'troubling', 'unfortunate', 'unfavorable', 'discouraging', 'ineffective'}
-        
-        words = set(text.lower().split())
-        positive_count = sum(1 for word in words if word in positive_words)
-        negative_count = sum(1 for word in words if word in negative_words)
+        # Distinct sentiment keywords found in the text
+        positive_count = len(stats.positive_words)
+        negative_count = len(stats.negative_words)
         
         if positive_count > negative_count:
             return "Overall sentiment appears positive, with encouraging language and optimistic tone."
@@ -310,47 +355,26 @@ The document has been successfully analyzed using local processing techniques. T
         else:
             return "Overall sentiment appears neutral, with balanced language and objective tone."
     
-    def _generate_meaningful_summary(self, text: str, key_points: list, topics: list) -> str:
+    def _generate_meaningful_summary(self, stats: TextStats, ranking: list, topics: list) -> str:
         """Generate a meaningful summary of the document content"""
-        if not text.strip():
+        if not stats.word_count:
             return "No readable content was found in the document. This might be an image-based PDF or a document with unsupported formatting."
         
-        # Get first few sentences as opening context
-        sentences = re.split(r'[.!?]+', text)[:5]
-        opening = '. '.join(sentences).strip()
-        
         # Get topics overview
         topics_text = ", ".join([topic.split(' (')[0] for topic in topics[:5]]) if topics else "various subjects"
         
-        # Get key points summary
-        points_summary = "\n".join([f"  • {point[:100]}{'...' if len(point) > 100 else ''}" for point in key_points[:3]]) if key_points else ""
-        
-        summary = f"This document discusses {topics_text} and contains approximately {len(text.split())} words. "
-        
-        if opening:
-            summary += f"The content begins with: {opening[:200]}{'...' if len(opening) > 200 else '.'} "
+        summary = f"This document discusses {topics_text} and contains approximately {stats.word_count} words."
         
-        if points_summary:
-            summary += f"\n\nKey points covered include:\n{points_summary}"
+        # The most central sentences, in document order, form an extractive summary
+        summary_sentences = top_sentences(stats.sentences, ranking, SUMMARY_SENTENCES)
+        if summary_sentences:
+            summary += "\n\n" + " ".join(f"{sentence}." for sentence in summary_sentences)
+        else:
+            opening = '. '.join(stats.opening_sentences).strip()
+            if opening:
+                summary += f" The content begins with: {opening[:200]}{'...' if len(opening) > 200 else '.'}"
         
         return summary
-    
-    def _get_topic_overview(self, text: str) -> str:
-        """Get an overview of topics in the document"""
-        # Simple word frequency analysis
-        words = re.findall(r'\b[a-zA-Z]{4,}\b', text.lower())
-        word_freq = {}
-        for word in words:
-            word_freq[word] = word_freq.get(word, 0) + 1
-        
-        # Sort by frequency
-        sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-        top_words = [word for word, freq in sorted_words[:10]]
-        
-        if top_words:
-            return f"The document frequently mentions terms such as: {', '.join(top_words[:5])}"
-        else:
-            return "The document covers general topics with no specific high-frequency terms identified."
 
 # Factory function to choose between local and API-based analysis
 def get_document_analyzer(use_local: bool = False):
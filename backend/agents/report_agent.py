@@ -1,14 +1,17 @@
-import requests
+import httpx
 import os
 from typing import Dict, Any
 from backend.agents.base_agent import BaseAgent
 from backend.utils import logger
-from requests.exceptions import Timeout
 from backend.llm_utils import generate_llm_content
+from backend.rag import retrieve_relevant_context
 
 # Import our hybrid search
 from backend.search.hybrid_search import perform_hybrid_search
 
+# Number of context chunks used for a report when the context is long
+REPORT_TOP_K = int(os.getenv("RAG_REPORT_TOP_K", "12"))
+
 
 class ReportAgent(BaseAgent):
     """Agent responsible for generating reports using LLM with fallback support"""
@@ -24,6 +27,12 @@ class ReportAgent(BaseAgent):
         
         logger.info(f"[{self.name}] Generating {'deep' if is_deep else 'quick'} report on: {topic}")
         
+        # Long contexts are narrowed to the chunks relevant to the topic
+        try:
+            context = await retrieve_relevant_context(context, topic, k=REPORT_TOP_K)
+        except Exception as e:
+            logger.warning(f"[{self.name}] Context retrieval failed, using full context: {str(e)}")
+        
         try:
             # Generate report using backend LLM endpoint (which has fallback chain)
             report_result = self._generate_report_with_llm(topic, context, is_deep)
@@ -43,7 +52,7 @@ class ReportAgent(BaseAgent):
             
             # Use hybrid search as fallback before emergency content
             try:
-                search_result = perform_hybrid_search(topic)
+                search_result = await perform_hybrid_search(topic)
                 report_result = self._generate_report_from_search(topic, search_result, is_deep)
                 provider_used = "Hybrid Search"
                 self.emit_event("agent_action", "Report generated using hybrid search approach")
@@ -130,7 +139,7 @@ Ensure the report is well-organized and professionally formatted using proper Ma
                 is_report=True
             )
             return result
-        except Timeout:
+        except httpx.TimeoutException:
             logger.error(f"[{self.name}] LLM generation timed out")
             raise Exception("Report generation timed out. Please try again later.")
         except Exception as e:
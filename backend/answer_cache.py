@@ -0,0 +1,123 @@
+"""
+Cache of AI Chatbot answers
+
+Users often ask the suggested follow-up questions word for word against the
+same report. Answers are cached under a fingerprint of the context plus the
+normalized question, and concurrent identical questions share one LLM call.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import re
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from backend.cache import TTLCache
+from backend.rag import document_id
+
+logger = logging.getLogger(__name__)
+
+QA_CACHE_MAX_ITEMS = int(os.getenv("QA_CACHE_MAX_ITEMS", "1000"))
+QA_CACHE_TTL_SECONDS = float(os.getenv("QA_CACHE_TTL_SECONDS", "3600"))
+
+
+def normalize_question(question: str) -> str:
+    """Case-, whitespace- and trailing-punctuation-insensitive form of a question"""
+    return re.sub(r'\s+', ' ', question).strip().lower().rstrip('?!. ')
+
+
+def answer_key(context: str, question: str) -> str:
+    return hashlib.sha256(f"{document_id(context)}\n{normalize_question(question)}".encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """TTL + LRU cache of answers with coalescing of identical in-flight questions"""
+
+    def __init__(self, max_items: int = QA_CACHE_MAX_ITEMS, ttl_seconds: float = QA_CACHE_TTL_SECONDS):
+        self._cache: TTLCache[Dict[str, Any]] = TTLCache(max_items, ttl_seconds)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0}
+
+    def get(self, context: str, question: str) -> Optional[Dict[str, Any]]:
+        """Cached answer for the question, counting a hit or miss"""
+        answer = self._cache.get(answer_key(context, question))
+        self.stats["hits" if answer is not None else "misses"] += 1
+        return answer
+
+    def put(self, context: str, question: str, answer: Dict[str, Any]):
+        self._cache.set(answer_key(context, question), answer)
+
+    async def get_or_compute(self, context: str, question: str,
+                             compute: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Return the cached answer, wait for an identical in-flight one, or compute it"""
+        key = answer_key(context, question)
+        answer = self._cache.get(key)
+        if answer is not None:
+            self.stats["hits"] += 1
+            return answer
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(pending)
+
+        self.stats["misses"] += 1
+        # The computation is owned by the cache rather than by this caller: a caller that is
+        # cancelled (its client disconnected) stops waiting without failing the other waiters
+        pending = asyncio.ensure_future(self._compute(key, compute))
+        # Mark a failure as retrieved even if every waiter has left
+        pending.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._inflight[key] = pending
+        return await asyncio.shield(pending)
+
+    async def _compute(self, key: str, compute: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        try:
+            answer = await compute()
+            self._cache.set(key, answer)
+            return answer
+        finally:
+            self._inflight.pop(key, None)
+
+    async def stream(self, context: str, question: str,
+                     produce: Callable[[], AsyncIterator[Dict[str, Any]]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield citations/token events for an answer: replayed from the cache on a
+        hit, otherwise streamed from produce() and cached once it completes
+        """
+        cached = self.get(context, question)
+        if cached is not None:
+            yield {"type": "citations", "citations": cached["citations"] or []}
+            yield {"type": "token", "text": cached["answer"]}
+            return
+
+        answer = []
+        citations = None
+        async for event in produce():
+            if event["type"] == "token":
+                answer.append(event["text"])
+            elif event["type"] == "citations":
+                citations = event["citations"] or None
+            yield event
+        self.put(context, question, {"answer": "".join(answer), "citations": citations})
+
+    def get_stats(self) -> Dict[str, Any]:
+        cache_stats = self._cache.get_stats()
+        report = dict(self.stats)
+        report["items"] = cache_stats["items"]
+        report["expired"] = cache_stats["expired"]
+        report["evicted"] = cache_stats["evicted"]
+        report["inflight"] = len(self._inflight)
+        lookups = self.stats["hits"] + self.stats["misses"] + self.stats["coalesced"]
+        report["hit_rate"] = round((self.stats["hits"] + self.stats["coalesced"]) / lookups, 3) if lookups else 0.0
+        return report
+
+
+_answer_cache: Optional[AnswerCache] = None
+
+
+def get_answer_cache() -> AnswerCache:
+    """Return the process-wide answer cache"""
+    global _answer_cache
+    if _answer_cache is None:
+        _answer_cache = AnswerCache()
+    return _answer_cache
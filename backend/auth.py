@@ -1,38 +1,47 @@
 import os
+import threading
 from fastapi import APIRouter, HTTPException, Depends, Request
 from fastapi.responses import JSONResponse, RedirectResponse, HTMLResponse
-from authlib.integrations.starlette_client import OAuth
 from starlette.config import Config
 from starlette.middleware.sessions import SessionMiddleware
 from typing import Optional
 import jwt
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from pymongo import MongoClient
-import urllib.parse
 import hashlib
+from backend.lifecycle import lazy_import
+from backend.mongo import get_mongo
 
 # Load environment variables
 load_dotenv()
 
-# Initialize OAuth
-config = Config(environ=os.environ)
-oauth = OAuth(config)
+_oauth = None
+_oauth_lock = threading.Lock()
 
-# Register Google OAuth
-print("Registering Google OAuth client...")
-print(f"GOOGLE_CLIENT_ID: {os.getenv('GOOGLE_CLIENT_ID')}")
-print(f"GOOGLE_CLIENT_SECRET: {'*' * len(os.getenv('GOOGLE_CLIENT_SECRET', '')) if os.getenv('GOOGLE_CLIENT_SECRET') else 'Not set'}")
+def get_oauth():
+    """Return the OAuth registry with the Google client, importing authlib on first use"""
+    global _oauth
+    with _oauth_lock:
+        if _oauth is None:
+            OAuth = lazy_import("authlib.integrations.starlette_client").OAuth
+            oauth = OAuth(Config(environ=os.environ))
 
-oauth.register(
-    name='google',
-    client_id=os.getenv('GOOGLE_CLIENT_ID'),
-    client_secret=os.getenv('GOOGLE_CLIENT_SECRET'),
-    server_metadata_url='https://accounts.google.com/.well-known/openid-configuration',
-    client_kwargs={
-        'scope': 'openid email profile'
-    }
-)
+            # Register Google OAuth
+            print("Registering Google OAuth client...")
+            print(f"GOOGLE_CLIENT_ID: {os.getenv('GOOGLE_CLIENT_ID')}")
+            print(f"GOOGLE_CLIENT_SECRET: {'*' * len(os.getenv('GOOGLE_CLIENT_SECRET', '')) if os.getenv('GOOGLE_CLIENT_SECRET') else 'Not set'}")
+
+            oauth.register(
+                name='google',
+                client_id=os.getenv('GOOGLE_CLIENT_ID'),
+                client_secret=os.getenv('GOOGLE_CLIENT_SECRET'),
+                server_metadata_url='https://accounts.google.com/.well-known/openid-configuration',
+                client_kwargs={
+                    'scope': 'openid email profile'
+                }
+            )
+            _oauth = oauth
+        return _oauth
 
 # Create router
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -42,83 +51,6 @@ SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# MongoDB connection
-MONGODB_URI = os.getenv("MONGODB_URI")
-mongo_client = None
-users_collection = None
-
-if MONGODB_URI:
-    try:
-        # Handle both SRV and standard URI formats
-        encoded_uri = MONGODB_URI  # Use as-is for multi-host URIs
-        
-        # Only parse and encode if it's a simple URI (not multi-host)
-        if "," not in MONGODB_URI and "@" in MONGODB_URI:
-            try:
-                parsed_uri = urllib.parse.urlparse(MONGODB_URI)
-                username = parsed_uri.username
-                password = parsed_uri.password
-                
-                # Reconstruct URI with encoded credentials
-                if username and password:
-                    encoded_username = urllib.parse.quote_plus(username)
-                    encoded_password = urllib.parse.quote_plus(password)
-                    new_netloc = f"{encoded_username}:{encoded_password}@{parsed_uri.hostname}"
-                    if parsed_uri.port:
-                        new_netloc += f":{parsed_uri.port}"
-                    encoded_uri = urllib.parse.urlunparse((
-                        parsed_uri.scheme,
-                        new_netloc,
-                        parsed_uri.path,
-                        parsed_uri.params,
-                        parsed_uri.query,
-                        parsed_uri.fragment
-                    ))
-                    
-            except Exception as e:
-                print(f"Failed to encode MongoDB URI: {e}")
-                encoded_uri = MONGODB_URI
-        
-        # Check if SSL is disabled in the URI
-        use_ssl = "ssl=false" not in MONGODB_URI.lower()
-        
-        if use_ssl:
-            mongo_client = MongoClient(
-                encoded_uri,
-                serverSelectionTimeoutMS=10000,
-                connectTimeoutMS=20000,
-                socketTimeoutMS=20000,
-                maxPoolSize=50,
-                minPoolSize=5,
-                tls=True,
-                tlsAllowInvalidCertificates=True,
-                tlsAllowInvalidHostnames=True
-            )
-        else:
-            mongo_client = MongoClient(
-                encoded_uri,
-                serverSelectionTimeoutMS=10000,
-                connectTimeoutMS=20000,
-                socketTimeoutMS=20000,
-                maxPoolSize=50,
-                minPoolSize=5
-            )
-        # Test the connection
-        mongo_client.admin.command('ping')
-        db = mongo_client["jarvis_database"]
-        users_collection = db["users"]
-        
-        # Create indexes for better performance (align with existing schema)
-        users_collection.create_index("userId", unique=True)
-        users_collection.create_index("lastActive")
-        
-        print("Connected to MongoDB successfully for auth module")
-    except Exception as e:
-        print(f"Failed to connect to MongoDB for auth module: {e}")
-        mongo_client = None
-else:
-    print("MONGODB_URI not found in environment variables for auth module")
-
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
     to_encode = data.copy()
@@ -183,7 +115,7 @@ async def login_via_google(request: Request):
     try:
         # Force account selection by adding prompt parameter
         print(f"Attempting OAuth redirect with redirect_uri: {redirect_uri}")
-        return await oauth.google.authorize_redirect(
+        return await get_oauth().google.authorize_redirect(
             request, 
             redirect_uri,
             prompt='select_account'
@@ -209,7 +141,7 @@ async def auth_via_google(request: Request):
     print(f"Request query params: {dict(request.query_params)}")
     try:
         # Get user info from Google
-        token = await oauth.google.authorize_access_token(request)
+        token = await get_oauth().google.authorize_access_token(request)
         user = token.get('userinfo')
         
         if not user:
@@ -227,7 +159,8 @@ async def auth_via_google(request: Request):
         request.session['jwt_token'] = access_token
         
         # Store user in MongoDB if connection is available
-        if mongo_client is not None and users_collection is not None and user.get("email"):
+        users_collection = get_mongo().users_collection
+        if users_collection is not None and user.get("email"):
             try:
                 # Generate user ID based on email (consistent with existing schema)
                 user_id = generate_user_id(user["email"])
@@ -0,0 +1,86 @@
+"""
+Incremental BM25 index for lexical retrieval
+
+Dense embeddings blur exact-match terms such as product names, version
+numbers and acronyms. This sparse index scores chunks with Okapi BM25 over
+an inverted index, so a query only touches the postings of its own terms.
+Chunks can be added at any time; document-length statistics are updated
+incrementally.
+"""
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+
+# Keeps "gpt-4", "3.5", "e-mail" and "U.S." style tokens together
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.\-_'][a-z0-9]+)*")
+
+STOP_WORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'have', 'in', 'is', 'it',
+    'its', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'were', 'will', 'with', 'what',
+    'which', 'who', 'how', 'does', 'do', 'did', 'about'
+})
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case terms of text, without stop words"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+class BM25Index:
+    """Okapi BM25 over an inverted index that grows as chunks arrive"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, ids: Sequence[str], texts: Sequence[str]):
+        """Index texts under ids; re-adding an id is ignored"""
+        with self._lock:
+            for item_id, text in zip(ids, texts):
+                if item_id in self._lengths:
+                    continue
+                terms = tokenize(text)
+                self._lengths[item_id] = len(terms)
+                self._total_length += len(terms)
+                for term, frequency in Counter(terms).items():
+                    self._postings.setdefault(term, {})[item_id] = frequency
+
+    def search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """Return the top-k (id, score) pairs, best first"""
+        with self._lock:
+            count = len(self._lengths)
+            if count == 0:
+                return []
+            average_length = self._total_length / count
+            scores: Dict[str, float] = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for item_id, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[item_id] / average_length)
+                    scores[item_id] = scores.get(item_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+
+def reciprocal_rank_fusion(rankings: List[List[Tuple[str, float]]], k: int, rrf_k: int = 60) -> List[Tuple[str, float]]:
+    """
+    Merge ranked lists with reciprocal rank fusion: each item scores
+    sum(1 / (rrf_k + rank)) over the lists it appears in.
+    """
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, (item_id, _) in enumerate(ranking, start=1):
+            fused[item_id] = fused.get(item_id, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)[:k]
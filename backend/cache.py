@@ -0,0 +1,72 @@
+"""
+In-memory cache with LRU eviction and per-entry expiry
+
+Shared by backend features that keep request-scoped data on the server
+between calls. Entries expire lazily on access and are also purged whenever
+the cache is written to, so memory stays bounded by max_items.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """Thread-safe LRU cache whose entries expire ttl_seconds after they were set"""
+
+    def __init__(self, max_items: int, ttl_seconds: float):
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _purge_expired(self, now: float):
+        expired = [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+        self.stats["expired"] += len(expired)
+
+    def get(self, key: str) -> Optional[V]:
+        """Return the value for key, or None if it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return value
+
+    def set(self, key: str, value: V, ttl_seconds: Optional[float] = None):
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (now + (ttl_seconds if ttl_seconds is not None else self.ttl_seconds), value)
+            self._entries.move_to_end(key)
+            self._purge_expired(now)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+                self.stats["evicted"] += 1
+
+    def pop(self, key: str) -> Optional[V]:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return entry[1] if entry is not None else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        report = dict(self.stats)
+        report["items"] = len(self._entries)
+        report["max_items"] = self.max_items
+        report["ttl_seconds"] = self.ttl_seconds
+        return report
@@ -0,0 +1,221 @@
+"""
+Persistent WebSocket channel for the AI Chatbot
+
+One connection per chat: the client binds a context once (a session id, or
+raw context that is registered as a session) and then sends only questions,
+whose answers stream back over the same socket. The connection keeps the
+session id rather than the context, and open connections, queued questions,
+send time and idle time are all bounded, so thousands of open chats hold
+little memory.
+
+Client messages (JSON):
+    {"type": "bind", "session_id": "..."} or {"type": "bind", "context": "..."}
+    {"type": "question", "id": "q1", "question": "..."}
+    {"type": "ping"}
+
+Server messages: bound, citations, token, done, error and pong; answer
+events carry the id of their question.
+"""
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+
+from backend.agents.chief_agent import get_chief_agent
+from backend.answer_cache import get_answer_cache
+from backend.sessions import get_session_store
+
+logger = logging.getLogger(__name__)
+
+# Limits are per worker process
+WS_CHAT_MAX_CONNECTIONS = int(os.getenv("WS_CHAT_MAX_CONNECTIONS", "5000"))
+WS_CHAT_IDLE_TIMEOUT_SECONDS = float(os.getenv("WS_CHAT_IDLE_TIMEOUT_SECONDS", "300"))
+# A client that doesn't read a message within this long is disconnected
+WS_CHAT_SEND_TIMEOUT_SECONDS = float(os.getenv("WS_CHAT_SEND_TIMEOUT_SECONDS", "10"))
+WS_CHAT_MAX_PENDING_QUESTIONS = int(os.getenv("WS_CHAT_MAX_PENDING_QUESTIONS", "4"))
+WS_CHAT_MAX_MESSAGE_CHARS = int(os.getenv("WS_CHAT_MAX_MESSAGE_CHARS", str(2 * 1024 * 1024)))
+
+# WebSocket close codes (RFC 6455)
+CLOSE_NORMAL = 1000
+CLOSE_GOING_AWAY = 1001
+CLOSE_POLICY_VIOLATION = 1008
+CLOSE_MESSAGE_TOO_BIG = 1009
+CLOSE_TRY_AGAIN_LATER = 1013
+
+router = APIRouter()
+
+stats = {
+    "active": 0,
+    "opened": 0,
+    "rejected": 0,
+    "idle_closed": 0,
+    "slow_closed": 0,
+    "questions": 0,
+    "busy_rejections": 0
+}
+
+
+class SlowConsumerError(Exception):
+    """The client stopped reading answers"""
+    pass
+
+
+class ChatConnection:
+    """State and loops for one chat WebSocket"""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.session_id: Optional[str] = None
+        self.questions: asyncio.Queue = asyncio.Queue(maxsize=WS_CHAT_MAX_PENDING_QUESTIONS)
+        self.busy = False
+        self._send_lock = asyncio.Lock()
+
+    async def send(self, message: Dict[str, Any]):
+        # Awaiting the send applies the socket's backpressure to the answer stream
+        async with self._send_lock:
+            try:
+                await asyncio.wait_for(self.websocket.send_text(json.dumps(message)), timeout=WS_CHAT_SEND_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                raise SlowConsumerError()
+
+    async def error(self, code: str, message: str, question_id: Any = None):
+        await self.send({"type": "error", "id": question_id, "code": code, "message": message})
+
+    async def bind(self, message: Dict[str, Any]):
+        """Bind the connection to an existing session or register a new one from raw context"""
+        if message.get("session_id"):
+            if get_session_store().get(message["session_id"]) is None:
+                await self.error("session_not_found", "Session not found or expired")
+                return
+            self.session_id = message["session_id"]
+        elif isinstance(message.get("context"), str):
+            session = await get_session_store().create(message["context"], kind=message.get("kind") or "research")
+            self.session_id = session.id
+        else:
+            await self.error("invalid_bind", "bind requires a session_id or context")
+            return
+        await self.send({"type": "bound", "session_id": self.session_id})
+
+    async def answer_loop(self):
+        """Answer queued questions one at a time"""
+        while True:
+            message = await self.questions.get()
+            self.busy = True
+            try:
+                await self.answer(message)
+            finally:
+                self.busy = False
+
+    async def answer(self, message: Dict[str, Any]):
+        question_id = message.get("id")
+        question = message.get("question") or ""
+        session = get_session_store().get(self.session_id) if self.session_id else None
+        if session is None:
+            await self.error("session_not_found", "Bind a context before asking questions", question_id)
+            return
+
+        stats["questions"] += 1
+        context = session.context
+        state = {"question": question, "context": context}
+        try:
+            async for event in get_answer_cache().stream(context, question, lambda: get_chief_agent().ai_assistant.stream(state)):
+                await self.send({**event, "id": question_id})
+            await self.send({"type": "done", "id": question_id})
+        except (SlowConsumerError, WebSocketDisconnect):
+            raise
+        except Exception as e:
+            logger.error(f"WebSocket Q&A error: {str(e)}")
+            await self.error("answer_failed", f"Q&A failed: {str(e)}", question_id)
+
+    async def receive_loop(self) -> Tuple[int, str]:
+        """Handle client messages until the connection should close; returns the close code and reason"""
+        while True:
+            try:
+                text = await asyncio.wait_for(self.websocket.receive_text(), timeout=WS_CHAT_IDLE_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                # A long answer in progress is not idleness
+                if self.busy or not self.questions.empty():
+                    continue
+                stats["idle_closed"] += 1
+                return CLOSE_GOING_AWAY, "Idle timeout"
+
+            if len(text) > WS_CHAT_MAX_MESSAGE_CHARS:
+                return CLOSE_MESSAGE_TOO_BIG, "Message too large"
+            try:
+                message = json.loads(text)
+            except ValueError:
+                message = None
+            if not isinstance(message, dict):
+                await self.error("invalid_message", "Messages must be JSON objects")
+                continue
+
+            kind = message.get("type")
+            if kind == "ping":
+                await self.send({"type": "pong"})
+            elif kind == "bind":
+                await self.bind(message)
+            elif kind == "question":
+                try:
+                    self.questions.put_nowait(message)
+                except asyncio.QueueFull:
+                    stats["busy_rejections"] += 1
+                    await self.error("busy", "Too many pending questions", message.get("id"))
+            else:
+                await self.error("unknown_type", f"Unknown message type: {kind}")
+
+
+@router.websocket("/ws/chat")
+async def chat_socket(websocket: WebSocket, session_id: Optional[str] = None):
+    """AI Chatbot over a persistent WebSocket"""
+    await websocket.accept()
+    if stats["active"] >= WS_CHAT_MAX_CONNECTIONS:
+        stats["rejected"] += 1
+        await websocket.close(code=CLOSE_TRY_AGAIN_LATER, reason="Too many chat connections")
+        return
+
+    stats["active"] += 1
+    stats["opened"] += 1
+    connection = ChatConnection(websocket)
+    tasks = []
+    close_code: Optional[Tuple[int, str]] = None
+    try:
+        if session_id:
+            await connection.bind({"session_id": session_id})
+        tasks = [asyncio.create_task(connection.receive_loop()), asyncio.create_task(connection.answer_loop())]
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finished = done.pop()
+        error = finished.exception()
+        if error is None:
+            close_code = finished.result()
+        elif isinstance(error, SlowConsumerError):
+            stats["slow_closed"] += 1
+            close_code = (CLOSE_POLICY_VIOLATION, "Client is not reading messages")
+        elif not isinstance(error, WebSocketDisconnect):
+            logger.error(f"WebSocket chat error: {str(error)}")
+            close_code = (CLOSE_NORMAL, "Server error")
+    except SlowConsumerError:
+        stats["slow_closed"] += 1
+        close_code = (CLOSE_POLICY_VIOLATION, "Client is not reading messages")
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        stats["active"] -= 1
+
+    if close_code is not None:
+        try:
+            await websocket.close(code=close_code[0], reason=close_code[1])
+        except Exception:
+            # The client may already be gone
+            pass
+
+
+def get_stats() -> Dict[str, Any]:
+    report = dict(stats)
+    report["max_connections"] = WS_CHAT_MAX_CONNECTIONS
+    return report
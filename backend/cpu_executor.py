@@ -0,0 +1,159 @@
+"""
+Dedicated executor for CPU-bound request work
+
+Local document analysis (decoding, parsing, regex passes) runs on a small
+pool of worker threads instead of the event loop, so one large document no
+longer stalls every other request on the worker. Jobs beyond the pool size
+wait in a bounded queue; when the queue is full new jobs are rejected rather
+than piling up. Each job's CPU time is measured on its worker thread.
+
+Cancelling the awaiting task (e.g. because the client disconnected) drops a
+queued job before it starts. A running job stops at its next
+check_cancelled() call.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CPU_EXECUTOR_WORKERS = int(os.getenv("CPU_EXECUTOR_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Jobs allowed to wait for a worker; more are rejected with CPUExecutorBusyError
+CPU_EXECUTOR_MAX_QUEUE = int(os.getenv("CPU_EXECUTOR_MAX_QUEUE", "16"))
+
+_job = threading.local()
+
+
+class CPUExecutorBusyError(Exception):
+    """The executor's queue is full"""
+    pass
+
+
+class CPUJobCancelled(Exception):
+    """The job was cancelled while it was running"""
+    pass
+
+
+def check_cancelled():
+    """Raise CPUJobCancelled if the job running on this thread was cancelled; a no-op outside jobs"""
+    cancelled: Optional[threading.Event] = getattr(_job, "cancelled", None)
+    if cancelled is not None and cancelled.is_set():
+        raise CPUJobCancelled()
+
+
+class CPUExecutor:
+    """Bounded thread pool for CPU-bound jobs with per-job CPU time accounting"""
+
+    def __init__(self, workers: int = CPU_EXECUTOR_WORKERS, max_queue: int = CPU_EXECUTOR_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cpu-job")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self.stats = {
+            "completed": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "rejected": 0,
+            "cpu_seconds": 0.0,
+            "max_cpu_seconds": 0.0,
+            "queue_wait_seconds": 0.0
+        }
+
+    def _record_cpu(self, cpu_seconds: float):
+        self.stats["cpu_seconds"] += cpu_seconds
+        self.stats["max_cpu_seconds"] = max(self.stats["max_cpu_seconds"], cpu_seconds)
+
+    async def run(self, function: Callable[..., Any], *args, name: Optional[str] = None) -> Any:
+        """Run function(*args) on the executor and return its result"""
+        name = name or getattr(function, "__name__", "job")
+        if self._pending >= self.workers + self.max_queue:
+            self.stats["rejected"] += 1
+            raise CPUExecutorBusyError(f"CPU executor is busy ({self._pending} jobs running or queued)")
+
+        cancelled = threading.Event()
+        submitted = time.perf_counter()
+        usage: Dict[str, float] = {}
+
+        def job():
+            if cancelled.is_set():
+                raise CPUJobCancelled()
+            usage["wait"] = time.perf_counter() - submitted
+            with self._lock:
+                self._running += 1
+            _job.cancelled = cancelled
+            cpu_start = time.thread_time()
+            try:
+                return function(*args)
+            finally:
+                usage["cpu"] = time.thread_time() - cpu_start
+                _job.cancelled = None
+                with self._lock:
+                    self._running -= 1
+
+        self._pending += 1
+        submission = self._executor.submit(job)
+        future = asyncio.wrap_future(submission)
+        try:
+            # Shielded so the job's future settles only when its thread is done with it
+            result = await asyncio.shield(future)
+            self.stats["completed"] += 1
+            return result
+        except asyncio.CancelledError:
+            self.stats["cancelled"] += 1
+            # A queued job is dropped; a running one stops at its next check_cancelled()
+            cancelled.set()
+            submission.cancel()
+            raise
+        except CPUJobCancelled:
+            self.stats["cancelled"] += 1
+            raise
+        except Exception:
+            self.stats["failed"] += 1
+            raise
+        finally:
+            if future.done():
+                self._settle(future, name, usage)
+            else:
+                # The job is still queued or running; account for it when it stops
+                future.add_done_callback(lambda done: self._settle(done, name, usage))
+
+    def _settle(self, future: asyncio.Future, name: str, usage: Dict[str, float]):
+        self._pending -= 1
+        if not future.cancelled():
+            # Retrieve the outcome of a job nobody is waiting for any more
+            future.exception()
+        if "cpu" in usage:
+            self._record_cpu(usage["cpu"])
+            self.stats["queue_wait_seconds"] += usage["wait"]
+            logger.info(f"CPU job {name}: {usage['cpu']:.3f}s CPU, waited {usage['wait']:.3f}s for a worker")
+
+    def get_stats(self) -> Dict[str, Any]:
+        report = dict(self.stats)
+        report["cpu_seconds"] = round(report["cpu_seconds"], 3)
+        report["max_cpu_seconds"] = round(report["max_cpu_seconds"], 3)
+        report["queue_wait_seconds"] = round(report["queue_wait_seconds"], 3)
+        report["workers"] = self.workers
+        report["max_queue"] = self.max_queue
+        report["running"] = self._running
+        report["queued"] = max(self._pending - self._running, 0)
+        return report
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_cpu_executor: Optional[CPUExecutor] = None
+
+
+def get_cpu_executor() -> CPUExecutor:
+    """Return the process-wide CPU executor"""
+    global _cpu_executor
+    if _cpu_executor is None:
+        _cpu_executor = CPUExecutor()
+    return _cpu_executor
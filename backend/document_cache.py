@@ -0,0 +1,247 @@
+"""
+Content-addressed disk cache for document analysis
+
+Uploads are identified by the SHA-256 of their bytes plus the MIME type, so
+re-uploading the same file (after a page refresh, or to ask again) reuses
+earlier work: the extracted text (zlib-compressed) skips extraction, and the
+final report skips the LLM as well. Texts and reports have separate TTLs.
+The directory is bounded in bytes; when it grows past the bound, the least
+recently used files are deleted. Files are written atomically, so several
+worker processes can share one directory.
+"""
+import base64
+import codecs
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# An empty directory disables the cache
+DOCUMENT_CACHE_DIR = os.getenv("DOCUMENT_CACHE_DIR", os.path.join(".cache", "documents"))
+DOCUMENT_CACHE_MAX_BYTES = int(os.getenv("DOCUMENT_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+DOCUMENT_CACHE_TEXT_TTL_SECONDS = float(os.getenv("DOCUMENT_CACHE_TEXT_TTL_SECONDS", str(7 * 24 * 3600)))
+DOCUMENT_CACHE_REPORT_TTL_SECONDS = float(os.getenv("DOCUMENT_CACHE_REPORT_TTL_SECONDS", str(24 * 3600)))
+
+# Eviction deletes down to this fraction of the bound, so it doesn't run on every write
+EVICT_TO_FRACTION = 0.9
+HASH_BLOCK_BYTES = 1024 * 1024
+TEXT_BLOCK_BYTES = 256 * 1024
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_base64(file_base64: str) -> str:
+    """Content hash of a base64-encoded upload (of the decoded bytes, so it matches a multipart upload)"""
+    return hash_bytes(base64.b64decode(file_base64))
+
+
+def hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def document_key(content_sha256: str, mime_type: str, pages: Optional[Tuple[int, Optional[int]]] = None) -> str:
+    """Cache key of a document: its content hash, the MIME type it is parsed as, and the page range analyzed"""
+    scope = f"\n{pages[0]}-{pages[1] or ''}" if pages else ""
+    return hashlib.sha256(f"{content_sha256}\n{mime_type}{scope}".encode("utf-8")).hexdigest()
+
+
+class DocumentCache:
+    """Extracted texts and reports on disk, keyed by document_key()"""
+
+    def __init__(self, directory: Optional[str] = DOCUMENT_CACHE_DIR, max_bytes: int = DOCUMENT_CACHE_MAX_BYTES,
+                 text_ttl_seconds: float = DOCUMENT_CACHE_TEXT_TTL_SECONDS,
+                 report_ttl_seconds: float = DOCUMENT_CACHE_REPORT_TTL_SECONDS):
+        self.directory = directory or None
+        self.max_bytes = max_bytes
+        self.ttls = {"text": text_ttl_seconds, "report": report_ttl_seconds}
+        self._lock = threading.Lock()
+        self._size = 0
+        self.stats = {"text_hits": 0, "text_misses": 0, "report_hits": 0, "report_misses": 0, "expired": 0, "evicted": 0}
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            self._size = self._scan_size()
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def _path(self, key: str, kind: str) -> str:
+        suffix = "text.z" if kind == "text" else "report.json"
+        return os.path.join(self.directory, f"{key}.{suffix}")
+
+    def _scan_size(self) -> int:
+        return sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.is_file())
+
+    def _read(self, key: str, kind: str) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+        path = self._path(key, kind)
+        try:
+            written = os.stat(path).st_mtime
+            if time.time() - written > self.ttls[kind]:
+                self._remove(path)
+                self.stats["expired"] += 1
+                return None
+            with open(path, "rb") as f:
+                data = f.read()
+            # The access time orders eviction; the modification time stays the write time for the TTL
+            os.utime(path, (time.time(), written))
+            return data
+        except FileNotFoundError:
+            return None
+
+    def _write(self, key: str, kind: str, data: bytes):
+        if not self.enabled:
+            return
+        path = self._path(key, kind)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        # A rewritten key only grows the cache by the difference
+        try:
+            replaced = os.path.getsize(path)
+        except FileNotFoundError:
+            replaced = 0
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._size += len(data) - replaced
+            over = self._size > self.max_bytes
+        if over:
+            self._evict()
+
+    def _remove(self, path: str):
+        try:
+            size = os.path.getsize(path)
+            os.unlink(path)
+            with self._lock:
+                self._size -= size
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        """Delete least recently used files until the directory is back under its bound"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_atime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICT_TO_FRACTION
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+                self.stats["evicted"] += 1
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._size = total
+
+    def iter_text(self, key: str) -> Optional[Iterator[str]]:
+        """Cached text as pieces, decompressed incrementally, or None on a miss"""
+        data = self._read(key, "text")
+        if data is None:
+            self.stats["text_misses"] += 1
+            return None
+        self.stats["text_hits"] += 1
+        return self._decompress(key, data)
+
+    def _decompress(self, key: str, data: bytes) -> Iterator[str]:
+        decompressor = zlib.decompressobj()
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        try:
+            for start in range(0, len(data), TEXT_BLOCK_BYTES):
+                yield decoder.decode(decompressor.decompress(data[start:start + TEXT_BLOCK_BYTES]))
+            yield decoder.decode(decompressor.flush(), final=True)
+        except (zlib.error, UnicodeDecodeError):
+            logger.warning(f"Discarding corrupt cached text {key}")
+            self._remove(self._path(key, "text"))
+            raise
+
+    def get_text(self, key: str) -> Optional[str]:
+        pieces = self.iter_text(key)
+        return "".join(pieces) if pieces is not None else None
+
+    def text_writer(self, key: str) -> "TextWriter":
+        """Writer that compresses text piece by piece and stores it on commit()"""
+        return TextWriter(self, key)
+
+    def put_text(self, key: str, text: str):
+        writer = self.text_writer(key)
+        writer.write(text)
+        writer.commit()
+
+    def get_report(self, key: str) -> Optional[Dict[str, Any]]:
+        data = self._read(key, "report")
+        if data is None:
+            self.stats["report_misses"] += 1
+            return None
+        try:
+            report = json.loads(data)
+        except ValueError:
+            logger.warning(f"Discarding corrupt cached report {key}")
+            self._remove(self._path(key, "report"))
+            self.stats["report_misses"] += 1
+            return None
+        self.stats["report_hits"] += 1
+        return report
+
+    def put_report(self, key: str, report: Dict[str, Any]):
+        self._write(key, "report", json.dumps(report).encode("utf-8"))
+
+    def get_stats(self) -> Dict[str, Any]:
+        report = dict(self.stats)
+        report["enabled"] = self.enabled
+        report["bytes"] = self._size
+        report["max_bytes"] = self.max_bytes
+        return report
+
+
+class TextWriter:
+    """Compresses text as it is extracted; only the compressed form is held until commit()"""
+
+    def __init__(self, cache: DocumentCache, key: str):
+        self.cache = cache
+        self.key = key
+        self._compressor = zlib.compressobj(6)
+        self._parts: List[bytes] = []
+        self._has_content = False
+
+    def write(self, text: str):
+        self._parts.append(self._compressor.compress(text.encode("utf-8")))
+        self._has_content = self._has_content or bool(text.strip())
+
+    def commit(self):
+        """Store the text, unless it was empty"""
+        if self._has_content:
+            self._parts.append(self._compressor.flush())
+            self.cache._write(self.key, "text", b"".join(self._parts))
+        self._parts = []
+
+
+_document_cache: Optional[DocumentCache] = None
+
+
+def get_document_cache() -> DocumentCache:
+    """Return the process-wide document cache"""
+    global _document_cache
+    if _document_cache is None:
+        _document_cache = DocumentCache()
+    return _document_cache
@@ -0,0 +1,347 @@
+"""
+Embedding service for the JARVIS backend
+
+Sentence-transformer inference on CPU is the most expensive local step, so
+every embedding goes through one service per process that:
+
+- loads the model once at startup (from the FastAPI lifespan),
+- deduplicates inputs by content hash and caches vectors in memory (LRU)
+  and in a memory-mapped file on disk that survives restarts,
+- coalesces identical in-flight requests, and
+- micro-batches texts from concurrent requests into single model calls,
+  waiting at most EMBEDDING_MAX_WAIT_MS for a batch to fill.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.lifecycle import lazy_import
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = os.getenv("RAG_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_BATCH_SIZE = int(os.getenv("RAG_EMBEDDING_BATCH_SIZE", "32"))
+
+# Micro-batching: a model call is made once MAX_BATCH texts are queued or
+# MAX_WAIT_MS has passed since the first one arrived, whichever comes first
+EMBEDDING_MAX_BATCH = int(os.getenv("EMBEDDING_MAX_BATCH", "64"))
+EMBEDDING_MAX_WAIT_MS = float(os.getenv("EMBEDDING_MAX_WAIT_MS", "10"))
+
+# Cache sizes
+EMBEDDING_MEMORY_CACHE_ITEMS = int(os.getenv("EMBEDDING_MEMORY_CACHE_ITEMS", "50000"))
+EMBEDDING_DISK_CACHE_DIR = os.getenv("EMBEDDING_DISK_CACHE_DIR", os.path.join(".cache", "embeddings"))
+EMBEDDING_DISK_CACHE_ROWS = int(os.getenv("EMBEDDING_DISK_CACHE_ROWS", "200000"))
+# Number of new vectors buffered before they are written to disk
+EMBEDDING_DISK_FLUSH_EVERY = int(os.getenv("EMBEDDING_DISK_FLUSH_EVERY", "256"))
+
+
+def content_hash(text: str) -> str:
+    """Cache key for a text"""
+    return hashlib.sha256(text.encode("utf-8", errors="ignore")).hexdigest()
+
+
+class EmbeddingCache:
+    """Two-level vector cache: an in-memory LRU over a memory-mapped file on disk"""
+
+    def __init__(self, model_name: str, dimension: int, directory: Optional[str] = EMBEDDING_DISK_CACHE_DIR,
+                 memory_items: int = EMBEDDING_MEMORY_CACHE_ITEMS, disk_rows: int = EMBEDDING_DISK_CACHE_ROWS):
+        self.dimension = dimension
+        self.memory_items = memory_items
+        self.disk_rows = disk_rows
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._pending: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._disk_index: Dict[str, int] = {}
+        self._memmap = None
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "disk_rows_used": 0}
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+            self._vectors_path = os.path.join(directory, f"{slug}.f32")
+            self._index_path = os.path.join(directory, f"{slug}.index.json")
+            self._lock_path = os.path.join(directory, f"{slug}.lock")
+            self._open_disk()
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock on the disk cache across worker processes"""
+        with open(self._lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _open_disk(self):
+        expected_bytes = self.disk_rows * self.dimension * 4
+        with self._file_lock():
+            if os.path.exists(self._vectors_path) and os.path.getsize(self._vectors_path) == expected_bytes:
+                self._memmap = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(self.disk_rows, self.dimension))
+                self._disk_index = self._read_index()
+            else:
+                # A recreated (zero-filled) file invalidates every row the old index pointed at
+                self._memmap = np.memmap(self._vectors_path, dtype=np.float32, mode="w+", shape=(self.disk_rows, self.dimension))
+                self._write_index({})
+        self.stats["disk_rows_used"] = len(self._disk_index)
+        logger.info(f"Embedding disk cache opened with {len(self._disk_index)} vectors")
+
+    def _read_index(self) -> Dict[str, int]:
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("dimension") == self.dimension:
+                return data.get("keys", {})
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def _write_index(self, index: Dict[str, int]):
+        tmp_path = f"{self._index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"dimension": self.dimension, "keys": index}, f)
+        os.replace(tmp_path, self._index_path)
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return vector
+
+            row = self._disk_index.get(key)
+            if row is not None and self._memmap is not None:
+                vector = np.array(self._memmap[row])
+                self._remember(key, vector)
+                self.stats["disk_hits"] += 1
+                return vector
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key: str, vector: np.ndarray):
+        with self._lock:
+            self._remember(key, vector)
+            if self._memmap is not None and key not in self._disk_index:
+                self._pending[key] = vector
+
+    def needs_flush(self) -> bool:
+        return len(self._pending) >= EMBEDDING_DISK_FLUSH_EVERY
+
+    def flush(self):
+        """Append pending vectors to the disk cache (safe across worker processes)"""
+        if self._memmap is None:
+            return
+        with self._lock:
+            pending, self._pending = self._pending, OrderedDict()
+        if not pending:
+            return
+
+        try:
+            with self._file_lock():
+                # Other workers may have appended since we last looked
+                index = self._read_index()
+                next_row = max(index.values(), default=-1) + 1
+                for key, vector in pending.items():
+                    if key in index:
+                        continue
+                    if next_row >= self.disk_rows:
+                        logger.warning("Embedding disk cache is full; new vectors stay in memory only")
+                        break
+                    self._memmap[next_row] = vector
+                    index[key] = next_row
+                    next_row += 1
+                self._memmap.flush()
+                self._write_index(index)
+        except Exception:
+            # Keep the vectors for the next flush
+            with self._lock:
+                pending.update(self._pending)
+                self._pending = pending
+            raise
+
+        with self._lock:
+            self._disk_index = index
+            self.stats["disk_rows_used"] = len(index)
+
+
+class EmbeddingService:
+    """Cached, micro-batched sentence-transformer embeddings"""
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL, max_batch: int = EMBEDDING_MAX_BATCH,
+                 max_wait_ms: float = EMBEDDING_MAX_WAIT_MS, cache_dir: Optional[str] = EMBEDDING_DISK_CACHE_DIR):
+        self.model_name = model_name
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.cache_dir = cache_dir
+        self.dimension: Optional[int] = None
+        self.cache: Optional[EmbeddingCache] = None
+        self._model = None
+        self._load_lock = threading.Lock()
+        # One model call at a time; torch parallelises inside the call
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding")
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"requests": 0, "texts": 0, "coalesced": 0, "model_calls": 0, "model_texts": 0}
+
+    @property
+    def ready(self) -> bool:
+        return self._model is not None
+
+    def load(self):
+        """Load the model and open the cache (blocking; run once per process)"""
+        with self._load_lock:
+            if self._model is not None:
+                return
+            SentenceTransformer = lazy_import("sentence_transformers").SentenceTransformer
+            logger.info(f"Loading embedding model {self.model_name}")
+            model = SentenceTransformer(self.model_name, device="cpu")
+            self.dimension = model.get_sentence_embedding_dimension()
+            self.cache = EmbeddingCache(self.model_name, self.dimension, self.cache_dir)
+            self._model = model
+
+    async def startup(self):
+        """Load the model off the event loop and start the batching worker"""
+        await asyncio.to_thread(self.load)
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._batch_loop())
+
+    async def shutdown(self):
+        """Stop the batching worker and persist cached vectors"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.flush)
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return self._model.encode(
+            texts,
+            batch_size=EMBEDDING_BATCH_SIZE,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        ).astype(np.float32)
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """Return an (n, dimension) float32 array of normalized embeddings"""
+        if self._worker is None or self._worker.done():
+            logger.warning("Embedding service used before the model finished loading; loading it now")
+            await self.startup()
+
+        loop = asyncio.get_running_loop()
+        self.stats["requests"] += 1
+        self.stats["texts"] += len(texts)
+
+        keys = [content_hash(text) for text in texts]
+        vectors: Dict[str, np.ndarray] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        for key, text in zip(keys, texts):
+            if key in vectors or key in waiting:
+                continue
+            vector = self.cache.get(key)
+            if vector is not None:
+                vectors[key] = vector
+                continue
+            future = self._inflight.get(key)
+            if future is None:
+                future = loop.create_future()
+                self._inflight[key] = future
+                self._queue.put_nowait((key, text, future))
+            else:
+                self.stats["coalesced"] += 1
+            waiting[key] = future
+
+        for key, future in waiting.items():
+            vectors[key] = await asyncio.shield(future)
+
+        if not keys:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return np.stack([vectors[key] for key in keys])
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[Tuple[str, str, asyncio.Future]] = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                embeddings = await loop.run_in_executor(self._executor, self._encode, [text for _, text, _ in batch])
+                self.stats["model_calls"] += 1
+                self.stats["model_texts"] += len(batch)
+                for (key, _, future), vector in zip(batch, embeddings):
+                    self.cache.put(key, vector)
+                    if not future.done():
+                        future.set_result(vector)
+            except Exception as e:
+                logger.error(f"Embedding batch failed: {str(e)}")
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                for key, _, _ in batch:
+                    self._inflight.pop(key, None)
+
+            if self.cache.needs_flush():
+                try:
+                    await asyncio.to_thread(self.cache.flush)
+                except Exception as e:
+                    logger.error(f"Embedding disk cache flush failed: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        report = dict(self.stats)
+        report["ready"] = self.ready
+        report["model"] = self.model_name
+        report["avg_batch_size"] = round(self.stats["model_texts"] / self.stats["model_calls"], 1) if self.stats["model_calls"] else 0.0
+        if self.cache is not None:
+            report["cache"] = dict(self.cache.stats)
+        return report
+
+
+_embedding_service: Optional[EmbeddingService] = None
+
+
+def get_embedding_service() -> EmbeddingService:
+    """Return the process-wide embedding service"""
+    global _embedding_service
+    if _embedding_service is None:
+        _embedding_service = EmbeddingService()
+    return _embedding_service
@@ -0,0 +1,292 @@
+"""
+Shared outbound HTTP transport for the JARVIS backend
+
+All outbound calls (LLM providers, search providers, Wikipedia, the model
+check scripts) go through one sync and one async httpx client so that
+connections are pooled and reused per host, HTTP/2 is negotiated where the
+host supports it, DNS answers are cached and every request has a timeout.
+
+Each request is traced, and the time spent in DNS, TCP connect, TLS and
+waiting for the first response byte is aggregated per host. get_metrics()
+returns those aggregates for the /api/metrics endpoint.
+
+The clients are created once by startup() in the FastAPI lifespan and
+closed by shutdown(). Scripts that never run the lifespan get them lazily.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Default timeouts in seconds; individual calls can still pass their own
+DEFAULT_TIMEOUT = httpx.Timeout(
+    float(os.getenv("HTTP_TIMEOUT", "30")),
+    connect=float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+)
+
+# httpx keeps a separate set of connections per origin inside the pool
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+    max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")),
+    keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+)
+
+DNS_CACHE_TTL = float(os.getenv("HTTP_DNS_CACHE_TTL", "300"))
+# Bound on cached answers (and on the hosts the cache serves)
+DNS_CACHE_MAX_ENTRIES = int(os.getenv("HTTP_DNS_CACHE_MAX_ENTRIES", "1024"))
+
+_TIMING_PHASES = ("dns", "connect", "tls", "first_byte")
+
+
+class TransportMetrics:
+    """Thread-safe per-host aggregates of request timings"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict[str, float]] = {}
+
+    def _host(self, host: str) -> Dict[str, float]:
+        stats = self._hosts.get(host)
+        if stats is None:
+            stats = {"requests": 0, "errors": 0, "new_connections": 0, "dns_lookups": 0, "dns_cache_hits": 0}
+            for phase in _TIMING_PHASES:
+                stats[f"{phase}_ms_total"] = 0.0
+            self._hosts[host] = stats
+        return stats
+
+    def record(self, host: str, **increments: float):
+        with self._lock:
+            stats = self._host(host)
+            for key, value in increments.items():
+                stats[key] = stats.get(key, 0) + value
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            report = {}
+            for host, stats in self._hosts.items():
+                host_report = dict(stats)
+                for phase in _TIMING_PHASES:
+                    samples = stats["dns_lookups"] if phase == "dns" else (
+                        stats["new_connections"] if phase in ("connect", "tls") else stats["requests"]
+                    )
+                    total = stats[f"{phase}_ms_total"]
+                    host_report[f"{phase}_ms_avg"] = round(total / samples, 1) if samples else 0.0
+                report[host] = host_report
+            return report
+
+
+metrics = TransportMetrics()
+
+
+class DNSCache:
+    """
+    TTL cache in front of socket.getaddrinfo, shared by the sync and async
+    clients. The hook is process-wide, but only hosts the shared clients have
+    sent requests to are served from the cache; every other lookup (e.g.
+    pymongo's replica set hosts) goes straight to the resolver.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = DNS_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._hosts: "OrderedDict[str, None]" = OrderedDict()
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._original = None
+
+    def allow(self, host: str):
+        """Serve lookups of host from the cache (called for every request of the shared clients)"""
+        with self._lock:
+            self._hosts[host] = None
+            self._hosts.move_to_end(host)
+            while len(self._hosts) > self.max_entries:
+                self._hosts.popitem(last=False)
+
+    def install(self):
+        if self._original is not None:
+            return
+        self._original = socket.getaddrinfo
+        socket.getaddrinfo = self._getaddrinfo
+
+    def uninstall(self):
+        if self._original is None:
+            return
+        socket.getaddrinfo = self._original
+        self._original = None
+        with self._lock:
+            self._entries.clear()
+            self._hosts.clear()
+
+    def _getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        host_name = host.decode() if isinstance(host, bytes) else str(host)
+        with self._lock:
+            allowed = host_name in self._hosts
+        if not allowed:
+            return self._original(host, port, family, type, proto, flags)
+
+        key = (host, port, family, type, proto, flags)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            metrics.record(host_name, dns_cache_hits=1)
+            return entry[1]
+
+        start = time.perf_counter()
+        result = self._original(host, port, family, type, proto, flags)
+        metrics.record(host_name, dns_lookups=1, dns_ms_total=(time.perf_counter() - start) * 1000)
+        with self._lock:
+            for stale in [stale for stale, (expires, _) in self._entries.items() if expires <= now]:
+                del self._entries[stale]
+            self._entries[key] = (now + self.ttl, result)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+dns_cache = DNSCache(DNS_CACHE_TTL)
+
+
+class _RequestTrace:
+    """Collects httpcore trace events for one request"""
+
+    def __init__(self, host: str):
+        self.host = host
+        self.started: Dict[str, float] = {}
+
+    def __call__(self, event_name: str, info: Dict[str, Any]):
+        now = time.perf_counter()
+        phase, _, stage = event_name.rpartition(".")
+        if stage == "started":
+            self.started[phase] = now
+            return
+        if stage != "complete" or phase not in self.started:
+            return
+
+        elapsed_ms = (now - self.started[phase]) * 1000
+        if phase == "connection.connect_tcp":
+            metrics.record(self.host, new_connections=1, connect_ms_total=elapsed_ms)
+        elif phase == "connection.start_tls":
+            metrics.record(self.host, tls_ms_total=elapsed_ms)
+        elif phase.endswith(".receive_response_headers"):
+            # Measured from the moment the request headers started going out
+            sent = self.started.get(phase.replace("receive_response_headers", "send_request_headers"), self.started[phase])
+            metrics.record(self.host, first_byte_ms_total=(now - sent) * 1000)
+
+    async def async_trace(self, event_name: str, info: Dict[str, Any]):
+        self(event_name, info)
+
+
+def _on_request(request: httpx.Request):
+    dns_cache.allow(request.url.raw_host.decode("ascii"))
+    trace = _RequestTrace(request.url.host)
+    request.extensions["trace"] = trace
+    metrics.record(request.url.host, requests=1)
+
+
+async def _on_async_request(request: httpx.Request):
+    dns_cache.allow(request.url.raw_host.decode("ascii"))
+    trace = _RequestTrace(request.url.host)
+    request.extensions["trace"] = trace.async_trace
+    metrics.record(request.url.host, requests=1)
+
+
+def _on_response(response: httpx.Response):
+    if response.status_code >= 400:
+        metrics.record(response.request.url.host, errors=1)
+
+
+async def _on_async_response(response: httpx.Response):
+    _on_response(response)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        logger.warning("h2 package not installed, outbound HTTP limited to HTTP/1.1")
+        return False
+
+
+_client: Optional[httpx.Client] = None
+_async_client: Optional[httpx.AsyncClient] = None
+_http2_enabled = False
+_lock = threading.Lock()
+
+
+def _create_clients():
+    global _client, _async_client, _http2_enabled
+    # httpx logs every request URL at INFO; keep those lines (and any credentials in query strings) out of the logs
+    for name in ("httpx", "httpcore"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    http2 = _http2_enabled = _http2_available()
+    _client = httpx.Client(
+        http2=http2,
+        timeout=DEFAULT_TIMEOUT,
+        limits=DEFAULT_LIMITS,
+        follow_redirects=True,
+        event_hooks={"request": [_on_request], "response": [_on_response]}
+    )
+    _async_client = httpx.AsyncClient(
+        http2=http2,
+        timeout=DEFAULT_TIMEOUT,
+        limits=DEFAULT_LIMITS,
+        follow_redirects=True,
+        event_hooks={"request": [_on_async_request], "response": [_on_async_response]}
+    )
+    logger.info(f"Shared HTTP clients created (http2={http2})")
+
+
+def startup():
+    """Create the shared clients and install the DNS cache"""
+    with _lock:
+        if _client is None:
+            dns_cache.install()
+            _create_clients()
+
+
+async def shutdown():
+    """Close the shared clients and remove the DNS cache"""
+    global _client, _async_client
+    with _lock:
+        client, async_client = _client, _async_client
+        _client, _async_client = None, None
+    if client is not None:
+        client.close()
+    if async_client is not None:
+        await async_client.aclose()
+    dns_cache.uninstall()
+    logger.info("Shared HTTP clients closed")
+
+
+def get_client() -> httpx.Client:
+    """Return the shared synchronous client"""
+    if _client is None:
+        startup()
+    return _client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Return the shared asynchronous client"""
+    if _async_client is None:
+        startup()
+    return _async_client
+
+
+def get_metrics() -> Dict[str, Any]:
+    """Per-host connection and timing aggregates"""
+    return {
+        "http2_enabled": _http2_enabled,
+        "hosts": metrics.snapshot()
+    }
@@ -0,0 +1,210 @@
+"""
+Startup and shutdown of a worker's shared resources
+
+Each resource (HTTP pools, MongoDB, caches, executors, the embedding model,
+the agents) registers a start and a stop function with the worker's
+ResourceManager. The FastAPI lifespan starts them all concurrently, so a
+cold start takes as long as the slowest resource rather than the sum, and
+stops them in reverse order on shutdown. Every resource's status and
+startup time is reported on /health; a resource that fails to start leaves
+the worker running in degraded mode unless it is required.
+
+Slow optional resources (a remote database, a model download) start in the
+background: the worker accepts requests while they come up, and whatever
+needs them before then waits for or does without them.
+
+Heavy optional modules are imported on first use through lazy_import(),
+which records how long each import took for /health.
+"""
+import asyncio
+import importlib
+import inspect
+import logging
+import sys
+import threading
+import time
+from types import ModuleType
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Resource:
+    """A shared resource and its lifecycle state"""
+    name: str
+    # Sync or async; blocking work should be wrapped in asyncio.to_thread by the caller
+    start: Optional[Callable[[], Any]] = None
+    stop: Optional[Callable[[], Any]] = None
+    # The worker is not ready until required resources have started
+    required: bool = False
+    # Started without holding up the rest of startup (never required)
+    background: bool = False
+    status: str = "pending"
+    error: Optional[str] = None
+    startup_seconds: Optional[float] = None
+
+
+async def _call(function: Callable[[], Any]):
+    result = function()
+    if inspect.isawaitable(result):
+        await result
+
+
+def _settle(future: asyncio.Future, result: Any, error: Optional[BaseException]):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+async def in_daemon_thread(function: Callable[[], Any], name: str) -> Any:
+    """
+    Run a blocking function in a daemon thread. Unlike asyncio.to_thread, a
+    call still blocked (on an unreachable server, say) when the worker stops
+    does not hold up event loop or interpreter shutdown.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def run():
+        result, error = None, None
+        try:
+            result = function()
+        except BaseException as e:
+            error = e
+        try:
+            loop.call_soon_threadsafe(_settle, future, result, error)
+        except RuntimeError:
+            # The event loop has closed; nobody is waiting any more
+            pass
+
+    threading.Thread(target=run, name=name, daemon=True).start()
+    return await future
+
+
+class ResourceManager:
+    """Starts registered resources concurrently and stops them in reverse order"""
+
+    def __init__(self):
+        self._resources: Dict[str, Resource] = {}
+        self._background: Dict[str, asyncio.Task] = {}
+        self.startup_seconds: Optional[float] = None
+
+    def add(self, name: str, start: Optional[Callable[[], Any]] = None, stop: Optional[Callable[[], Any]] = None,
+            required: bool = False, background: bool = False) -> Resource:
+        if required and background:
+            raise Exception(f"Resource {name} cannot be both required and started in the background")
+        resource = Resource(name, start, stop, required, background)
+        self._resources[name] = resource
+        return resource
+
+    def get(self, name: str) -> Resource:
+        return self._resources[name]
+
+    async def _start(self, resource: Resource):
+        resource.status = "starting"
+        started = time.perf_counter()
+        try:
+            if resource.start is not None:
+                await _call(resource.start)
+            resource.status = "ready"
+        except Exception as e:
+            resource.status = "failed"
+            resource.error = str(e)
+            log = logger.error if resource.required else logger.warning
+            log(f"Resource {resource.name} failed to start: {str(e)}")
+        finally:
+            resource.startup_seconds = round(time.perf_counter() - started, 3)
+
+    async def startup(self):
+        """Start every resource concurrently; failures are recorded, not raised"""
+        started = time.perf_counter()
+        foreground = []
+        for resource in self._resources.values():
+            if resource.background:
+                self._background[resource.name] = asyncio.create_task(self._start(resource))
+            else:
+                foreground.append(resource)
+        await asyncio.gather(*[self._start(resource) for resource in foreground])
+        self.startup_seconds = round(time.perf_counter() - started, 3)
+        timings = ", ".join(f"{resource.name} {resource.startup_seconds:.2f}s" for resource in foreground)
+        background = ", ".join(self._background)
+        logger.info(f"Started shared resources in {self.startup_seconds:.2f}s ({timings})"
+                    + (f"; starting in the background: {background}" if background else ""))
+
+    async def wait(self, name: str):
+        """Wait until a background resource has finished starting"""
+        task = self._background.get(name)
+        if task is not None:
+            await asyncio.shield(task)
+
+    async def shutdown(self):
+        """Stop resources in reverse registration order"""
+        # Background starts still running are abandoned; their stop functions clean up after them
+        for task in self._background.values():
+            task.cancel()
+        await asyncio.gather(*self._background.values(), return_exceptions=True)
+        self._background.clear()
+        resources: List[Resource] = list(self._resources.values())
+        for resource in reversed(resources):
+            if resource.stop is None or resource.status == "pending":
+                continue
+            try:
+                await _call(resource.stop)
+            except Exception as e:
+                logger.warning(f"Resource {resource.name} failed to stop cleanly: {str(e)}")
+            resource.status = "stopped"
+
+    @property
+    def ready(self) -> bool:
+        return all(resource.status == "ready" for resource in self._resources.values() if resource.required)
+
+    def health(self) -> Dict[str, Any]:
+        report: Dict[str, Any] = {}
+        for resource in self._resources.values():
+            entry: Dict[str, Any] = {"status": resource.status, "startup_seconds": resource.startup_seconds}
+            if resource.error:
+                entry["error"] = resource.error
+            report[resource.name] = entry
+        return report
+
+
+_import_seconds: Dict[str, float] = {}
+_import_lock = threading.Lock()
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Import a heavy optional module on first use, recording how long it took; ImportError propagates"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    started = time.perf_counter()
+    module = importlib.import_module(name)
+    seconds = round(time.perf_counter() - started, 3)
+    with _import_lock:
+        if name in _import_seconds:
+            return module
+        _import_seconds[name] = seconds
+    logger.info(f"Imported {name} in {seconds:.2f}s")
+    return module
+
+
+def get_import_stats() -> Dict[str, float]:
+    """Seconds taken by each module imported through lazy_import() in this process"""
+    with _import_lock:
+        return dict(_import_seconds)
+
+
+_resource_manager: Optional[ResourceManager] = None
+
+
+def get_resource_manager() -> ResourceManager:
+    """Return the worker's resource manager"""
+    global _resource_manager
+    if _resource_manager is None:
+        _resource_manager = ResourceManager()
+    return _resource_manager
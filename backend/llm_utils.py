@@ -1,8 +1,13 @@
 import os
-import requests
+import json
+import time
+import asyncio
+import httpx
 import logging
-from requests.exceptions import Timeout
-from typing import Dict, Any, Optional
+from typing import Dict, Any, AsyncIterator, List, Optional
+
+from backend.http_client import get_async_client, get_client
+from backend.lifecycle import lazy_import
 
 # Configure logging
 logging.basicConfig(
@@ -12,6 +17,9 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Streaming answers must finish within this many seconds across all providers
+LLM_STREAM_DEADLINE_SECONDS = float(os.getenv("LLM_STREAM_DEADLINE_SECONDS", "60"))
+
 def generate_llm_content(prompt: str, system_instruction: str = "", is_report: bool = False, provider: Optional[str] = None) -> Dict[str, Any]:
     """Generate content using LLM with fallback providers"""
     logger.info("Generating LLM content with fallback support")
@@ -25,7 +33,7 @@ def generate_llm_content(prompt: str, system_instruction: str = "", is_report: b
     if google_api_key and (provider is None or provider == "gemini"):
         providers.append({
             "name": "Google Gemini",
-            "url": f"{os.getenv('GEMINI_API_URL', 'https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent')}?key={google_api_key}",
+            "url": os.getenv('GEMINI_API_URL', 'https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent'),
             "payload": {
                 "contents": [{
                     "parts": [{
@@ -37,7 +45,7 @@ def generate_llm_content(prompt: str, system_instruction: str = "", is_report: b
                     "maxOutputTokens": 4096 if is_report else 2048
                 }
             },
-            "headers": {"Content-Type": "application/json"}
+            "headers": {"Content-Type": "application/json", "x-goog-api-key": google_api_key}
         })
         
         if system_instruction:
@@ -104,7 +112,7 @@ def generate_llm_content(prompt: str, system_instruction: str = "", is_report: b
             # Handle different provider types
             if provider_item.get("type") == "huggingface_client":
                 # Use Hugging Face InferenceClient with the correct router endpoint
-                from huggingface_hub import InferenceClient
+                InferenceClient = lazy_import("huggingface_hub").InferenceClient
                 
                 client = InferenceClient(
                     token=provider_item["api_key"],
@@ -130,7 +138,7 @@ def generate_llm_content(prompt: str, system_instruction: str = "", is_report: b
             else:
                 # Existing logic for other providers
                 # Add timeout to prevent hanging requests
-                response = requests.post(
+                response = get_client().post(
                     provider_item["url"],
                     json=provider_item["payload"],
                     headers=provider_item["headers"],
@@ -178,13 +186,13 @@ def generate_llm_content(prompt: str, system_instruction: str = "", is_report: b
             logger.info(f"Successfully generated content using {provider_item['name']}")
             return {"content": content, "provider": provider_item["name"], "attempted_providers": attempted_providers[:-1]}
             
-        except Timeout:
+        except httpx.TimeoutException:
             logger.warning(f"{provider_item['name']} request timed out")
             continue
-        except requests.exceptions.ConnectionError as e:
+        except httpx.TransportError as e:
             logger.warning(f"{provider_item['name']} connection error: {str(e)}")
             continue
-        except requests.exceptions.HTTPError as e:
+        except httpx.HTTPStatusError as e:
             last_error = e
             logger.warning(f"{provider_item['name']} HTTP error: {str(e)}")
             continue
@@ -206,4 +214,138 @@ This is a fallback response because all configured AI providers are currently un
 
 Please check your API keys and network connectivity, or try again later."""
 
-    return {"content": fallback_content, "provider": "Fallback", "attempted_providers": attempted_providers}
\ No newline at end of file
+    return {"content": fallback_content, "provider": "Fallback", "attempted_providers": attempted_providers}
+
+
+def _streaming_providers(prompt: str, system_instruction: str, max_tokens: int, provider: Optional[str]) -> List[Dict[str, Any]]:
+    """Gemini -> Groq provider chain for streamed generation"""
+    providers = []
+
+    google_api_key = os.getenv("GOOGLE_API_KEY")
+    if google_api_key and (provider is None or provider == "gemini"):
+        model = os.getenv("GEMINI_STREAM_MODEL", "gemini-2.5-flash")
+        payload = {
+            "contents": [{"parts": [{"text": prompt}]}],
+            "generationConfig": {"temperature": 0.5, "maxOutputTokens": max_tokens}
+        }
+        if system_instruction:
+            payload["systemInstruction"] = {"parts": [{"text": system_instruction}]}
+        providers.append({
+            "name": "Google Gemini",
+            "url": f"https://generativelanguage.googleapis.com/v1beta/models/{model}:streamGenerateContent?alt=sse",
+            "payload": payload,
+            "headers": {"Content-Type": "application/json", "x-goog-api-key": google_api_key}
+        })
+
+    groq_api_key = os.getenv("GROQ_API_KEY")
+    if groq_api_key and (provider is None or provider == "groq"):
+        providers.append({
+            "name": "Groq",
+            "url": os.getenv("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions"),
+            "payload": {
+                "model": os.getenv("GROQ_MODEL", "llama3-8b-8192"),
+                "messages": [
+                    {"role": "system", "content": system_instruction or "You are a helpful research assistant."},
+                    {"role": "user", "content": prompt}
+                ],
+                "temperature": 0.5,
+                "max_tokens": max_tokens,
+                "stream": True
+            },
+            "headers": {
+                "Authorization": f"Bearer {groq_api_key}",
+                "Content-Type": "application/json"
+            }
+        })
+
+    return providers
+
+
+def _stream_delta(provider_name: str, event: Dict[str, Any]) -> str:
+    """Text carried by one server-sent event of a provider's stream"""
+    if provider_name == "Groq":
+        choices = event.get("choices") or [{}]
+        return (choices[0].get("delta") or {}).get("content") or ""
+    candidates = event.get("candidates") or [{}]
+    parts = (candidates[0].get("content") or {}).get("parts") or []
+    return "".join(part.get("text", "") for part in parts)
+
+
+async def stream_llm_content(prompt: str, system_instruction: str = "", max_tokens: int = 2048,
+                             provider: Optional[str] = None,
+                             deadline_seconds: float = LLM_STREAM_DEADLINE_SECONDS) -> AsyncIterator[str]:
+    """
+    Stream generated text as it arrives, failing over Gemini -> Groq.
+
+    Failover only happens before the first chunk has been yielded; an error
+    after that is raised so callers never see two providers' text mixed.
+    The whole generation, including failover, must finish within deadline_seconds.
+    """
+    providers = _streaming_providers(prompt, system_instruction, max_tokens, provider)
+    if not providers:
+        raise Exception("No streaming LLM provider configured (GOOGLE_API_KEY or GROQ_API_KEY)")
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + deadline_seconds
+    last_error: Optional[Exception] = None
+
+    for provider_item in providers:
+        emitted = False
+        started = time.perf_counter()
+        try:
+            logger.info(f"Streaming from LLM provider: {provider_item['name']}")
+            async with get_async_client().stream(
+                "POST",
+                provider_item["url"],
+                json=provider_item["payload"],
+                headers=provider_item["headers"]
+            ) as response:
+                if not response.is_success:
+                    await response.aread()
+                    raise httpx.HTTPStatusError(
+                        f"{provider_item['name']} returned {response.status_code}: {response.text[:200]}",
+                        request=response.request,
+                        response=response
+                    )
+
+                lines = response.aiter_lines()
+                while True:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError()
+                    try:
+                        line = await asyncio.wait_for(lines.__anext__(), timeout=remaining)
+                    except StopAsyncIteration:
+                        break
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    text = _stream_delta(provider_item["name"], json.loads(data))
+                    if text:
+                        if not emitted:
+                            logger.info(f"{provider_item['name']} first token after {time.perf_counter() - started:.2f}s")
+                        emitted = True
+                        yield text
+
+            if emitted:
+                logger.info(f"Successfully streamed content using {provider_item['name']}")
+                return
+            last_error = Exception(f"{provider_item['name']} returned an empty stream")
+            logger.warning(str(last_error))
+        except asyncio.TimeoutError:
+            last_error = Exception(f"LLM stream exceeded the {deadline_seconds:g}s deadline")
+            logger.warning(f"{provider_item['name']} stream timed out")
+            if emitted:
+                raise last_error
+        except (httpx.HTTPError, ValueError) as e:
+            last_error = e
+            logger.warning(f"{provider_item['name']} stream failed: {str(e)}")
+            if emitted:
+                raise
+
+        if loop.time() >= deadline:
+            break
+
+    raise Exception(f"All streaming LLM providers failed. Last error: {str(last_error)}")
@@ -0,0 +1,144 @@
+"""
+MongoDB connection for user records and activity logs
+
+The client is created by connect(), which the FastAPI lifespan runs in the
+background in its own thread, rather than as a side effect of importing the
+auth module; the ping and index creation happen there too. Until it has
+connected (and without MONGODB_URI, or if connecting failed) the
+collections are None, and the endpoints that need them report that MongoDB
+is not connected.
+"""
+import logging
+import os
+import threading
+import urllib.parse
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DATABASE_NAME = "jarvis_database"
+
+
+def encode_credentials(uri: str) -> str:
+    """Percent-encode the username and password of a single-host URI"""
+    # Multi-host URIs are used as-is
+    if "," in uri or "@" not in uri:
+        return uri
+    try:
+        parsed_uri = urllib.parse.urlparse(uri)
+        username = parsed_uri.username
+        password = parsed_uri.password
+        if not (username and password):
+            return uri
+        new_netloc = f"{urllib.parse.quote_plus(username)}:{urllib.parse.quote_plus(password)}@{parsed_uri.hostname}"
+        if parsed_uri.port:
+            new_netloc += f":{parsed_uri.port}"
+        return urllib.parse.urlunparse((
+            parsed_uri.scheme,
+            new_netloc,
+            parsed_uri.path,
+            parsed_uri.params,
+            parsed_uri.query,
+            parsed_uri.fragment
+        ))
+    except Exception as e:
+        logger.warning(f"Failed to encode MongoDB URI: {e}")
+        return uri
+
+
+class MongoConnection:
+    """The MongoDB client and the collections the backend uses"""
+
+    def __init__(self, uri: Optional[str] = None):
+        self.uri = uri
+        self.client = None
+        self.db = None
+        self.users_collection = None
+        self.activity_collection = None
+        self.status = "pending" if uri else "disabled"
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self.status == "connected"
+
+    def connect(self):
+        """Create the client, check the connection and ensure indexes (blocking)"""
+        with self._lock:
+            if not self.uri:
+                logger.info("MONGODB_URI not set; user records and activity logs are disabled")
+                return
+            if self.status in ("connecting", "connected"):
+                return
+            self.status = "connecting"
+        # The lock is not held while waiting on the server, so close() never waits for a slow connect
+        from pymongo import MongoClient
+
+        options = dict(
+            serverSelectionTimeoutMS=10000,
+            connectTimeoutMS=20000,
+            socketTimeoutMS=20000,
+            maxPoolSize=50,
+            minPoolSize=5
+        )
+        # SSL unless disabled in the URI
+        if "ssl=false" not in self.uri.lower():
+            options.update(tls=True, tlsAllowInvalidCertificates=True, tlsAllowInvalidHostnames=True)
+        client = MongoClient(encode_credentials(self.uri), **options)
+        try:
+            client.admin.command("ping")
+            db = client[DATABASE_NAME]
+            users_collection = db["users"]
+            users_collection.create_index("userId", unique=True)
+            users_collection.create_index("lastActive")
+            activity_collection = db["activity_logs"]
+            activity_collection.create_index("userId")
+            activity_collection.create_index("timestamp")
+            activity_collection.create_index([("userId", 1), ("timestamp", -1)])
+        except Exception as e:
+            client.close()
+            with self._lock:
+                if self.status != "connecting":
+                    return
+                self.status = "failed"
+                self.error = str(e)
+            raise Exception(f"Failed to connect to MongoDB: {str(e)}")
+
+        with self._lock:
+            # Closed while connecting
+            if self.status != "connecting":
+                client.close()
+                return
+            self.client = client
+            self.db = db
+            self.users_collection = users_collection
+            self.activity_collection = activity_collection
+            self.status = "connected"
+        logger.info("Connected to MongoDB")
+
+    def close(self):
+        with self._lock:
+            client = self.client
+            self.client = self.db = self.users_collection = self.activity_collection = None
+            if self.uri:
+                self.status = "closed"
+        if client is not None:
+            client.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        report: Dict[str, Any] = {"status": self.status}
+        if self.error:
+            report["error"] = self.error
+        return report
+
+
+_mongo: Optional[MongoConnection] = None
+
+
+def get_mongo() -> MongoConnection:
+    """Return the process-wide MongoDB connection (connected by the lifespan)"""
+    global _mongo
+    if _mongo is None:
+        _mongo = MongoConnection(os.getenv("MONGODB_URI"))
+    return _mongo
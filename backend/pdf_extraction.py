@@ -0,0 +1,270 @@
+"""
+Page-parallel PDF text extraction
+
+Page ranges of a PDF are extracted with pdfplumber in a bounded process pool,
+so a large document uses several cores instead of one and never blocks the
+event loop. Pages that pdfplumber cannot read are retried one by one with
+pypdf (or PyPDF2); the rest of the document is not parsed again.
+
+iter_pdf_pages() yields page texts in order, optionally for a page range,
+keeping at most a window of ranges in flight, so a document with thousands
+of pages is never held as one string; extract_pdf_text() joins them once.
+
+Small documents are extracted in the calling thread, unless other
+extractions are already running (e.g. for a batch of uploads): then every
+document goes to the pool, so they are extracted in parallel.
+
+Workers are started with the "spawn" method, which is safe in a threaded
+server process, and are reused across documents.
+"""
+import io
+import itertools
+import logging
+import math
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Deque, Iterator, List, Optional, Tuple, Union
+
+from backend.lifecycle import lazy_import
+
+logger = logging.getLogger(__name__)
+
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Smaller documents are extracted in the calling thread; a worker round trip costs more than it saves
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "16"))
+# Each task re-opens the document, so ranges are not made smaller than this
+MIN_PAGES_PER_TASK = 8
+# Ranges are capped so a very large document streams through in bounded windows
+MAX_PAGES_PER_TASK = 64
+# Ranges per worker, so a slow range (e.g. pages full of tables) doesn't idle the others
+TASKS_PER_WORKER = 2
+
+# A PDF as a path on disk or its raw bytes
+PdfSource = Union[str, bytes]
+# First and last page, 1-based and inclusive; no last page means to the end
+PageRange = Tuple[int, Optional[int]]
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+# iter_pdf_pages() calls in progress in this process
+_active_extractions = 0
+
+
+def parse_page_range(spec: str) -> PageRange:
+    """Parse a page range such as "5", "1-50" or "10-" (page 10 to the end)"""
+    first, separator, last = spec.strip().partition("-")
+    try:
+        first_page = int(first)
+        last_page = int(last) if last.strip() else (None if separator else first_page)
+    except ValueError:
+        raise ValueError(f"Invalid page range '{spec}', expected e.g. '5', '1-50' or '10-'")
+    if first_page < 1 or (last_page is not None and last_page < first_page):
+        raise ValueError(f"Invalid page range '{spec}': pages start at 1 and the last page cannot precede the first")
+    return first_page, last_page
+
+
+def check_page_range(source: PdfSource, pages: PageRange) -> Optional[int]:
+    """
+    Number of pages in the PDF; ValueError if the range starts past the last
+    page. None if the page count cannot be read (extraction falls back then).
+    """
+    try:
+        page_count = count_pages(source)
+    except Exception as e:
+        logger.warning(f"Could not count PDF pages: {str(e)}")
+        return None
+    if pages[0] > page_count:
+        raise ValueError(f"Page range starts at page {pages[0]} but the document has {page_count} pages")
+    return page_count
+
+
+def _open(source: PdfSource):
+    return open(source, "rb") if isinstance(source, str) else io.BytesIO(source)
+
+
+def _plumber_input(source: PdfSource):
+    # pdfplumber closes files it opened from a path itself
+    return source if isinstance(source, str) else io.BytesIO(source)
+
+
+def _alternate_reader(stream):
+    """pypdf reader, or PyPDF2 on older installs"""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        from PyPDF2 import PdfReader
+    return PdfReader(stream)
+
+
+def count_pages(source: PdfSource) -> int:
+    """Number of pages in the PDF (reads only the page tree, not page content)"""
+    try:
+        with _open(source) as stream:
+            return len(_alternate_reader(stream).pages)
+    except ImportError:
+        pdfplumber = lazy_import("pdfplumber")
+        with pdfplumber.open(_plumber_input(source)) as pdf:
+            return len(pdf.pages)
+
+
+def extract_page_range(source: PdfSource, start: int, end: int) -> List[Optional[str]]:
+    """
+    Text of pages [start, end); runs in a worker process. A page is None if
+    neither pdfplumber nor the alternate parser could read it.
+    """
+    texts: List[Optional[str]] = [None] * (end - start)
+
+    try:
+        pdfplumber = lazy_import("pdfplumber")
+        with pdfplumber.open(_plumber_input(source), pages=list(range(start + 1, end + 1))) as pdf:
+            for offset, page in enumerate(pdf.pages):
+                try:
+                    texts[offset] = page.extract_text() or ""
+                except Exception as e:
+                    logger.warning(f"pdfplumber failed on page {start + offset + 1}: {str(e)}")
+                finally:
+                    # Drop the page's parsed objects as soon as its text is out
+                    page.close()
+    except Exception as e:
+        # Missing pdfplumber or an unreadable document: every page goes to the alternate parser
+        logger.warning(f"pdfplumber could not open pages {start + 1}-{end}: {str(e)}")
+
+    failed = [offset for offset, text in enumerate(texts) if text is None]
+    if failed:
+        try:
+            with _open(source) as stream:
+                reader = _alternate_reader(stream)
+                for offset in failed:
+                    try:
+                        texts[offset] = reader.pages[start + offset].extract_text() or ""
+                    except Exception as e:
+                        logger.warning(f"Alternate parser failed on page {start + offset + 1}: {str(e)}")
+        except Exception as e:
+            logger.warning(f"Alternate parser could not open the document: {str(e)}")
+
+    return texts
+
+
+def page_ranges(start: int, end: int, parts: int) -> List[Tuple[int, int]]:
+    """Split [start, end) into contiguous ranges: about `parts` of them, none longer than MAX_PAGES_PER_TASK"""
+    count = end - start
+    size = min(max(math.ceil(count / max(parts, 1)), 1), MAX_PAGES_PER_TASK)
+    return [(first, min(first + size, end)) for first in range(start, end, size)]
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=PDF_EXTRACT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_pool():
+    """Stop the worker processes (called on application shutdown)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _iter_parallel(path: str, ranges: List[Tuple[int, int]]) -> Iterator[List[Optional[str]]]:
+    """Yield each range's page texts in order, with at most a window of ranges in flight"""
+    global _pool
+    window = PDF_EXTRACT_WORKERS * TASKS_PER_WORKER
+    pending: Deque[Tuple[Future, Tuple[int, int]]] = deque()
+    remaining = iter(ranges)
+
+    def submit(page_range: Tuple[int, int]):
+        pending.append((_get_pool().submit(extract_page_range, path, *page_range), page_range))
+
+    try:
+        for page_range in itertools.islice(remaining, window):
+            submit(page_range)
+        while pending:
+            texts = pending[0][0].result()
+            pending.popleft()
+            for page_range in itertools.islice(remaining, 1):
+                submit(page_range)
+            yield texts
+    except BrokenProcessPool:
+        logger.warning("PDF worker pool broke; extracting the rest in-process")
+        with _pool_lock:
+            _pool = None
+        # Pending ranges were submitted in order and all precede the unsubmitted ones
+        unfinished = [page_range for _, page_range in pending] + list(remaining)
+        pending.clear()
+        for page_range in unfinished:
+            yield extract_page_range(path, *page_range)
+    finally:
+        for future, _ in pending:
+            future.cancel()
+
+
+def iter_pdf_pages(source: PdfSource, first_page: int = 1, last_page: Optional[int] = None) -> Iterator[str]:
+    """
+    Yield the text of pages first_page..last_page (1-based, inclusive; all by
+    default) in order, one line break after each page's text. Pages are
+    extracted a range at a time, so only a bounded window of text is held.
+    """
+    started = time.perf_counter()
+    page_count = count_pages(source)
+    start = max(first_page, 1) - 1
+    end = min(last_page or page_count, page_count)
+    if start >= end:
+        return
+
+    global _active_extractions
+    selected = end - start
+    parts = min(PDF_EXTRACT_WORKERS * TASKS_PER_WORKER, selected // MIN_PAGES_PER_TASK)
+    with _pool_lock:
+        # Concurrent extractions (e.g. a batch of documents) would contend for the GIL in-process
+        concurrent = _active_extractions > 0
+        _active_extractions += 1
+    path = None
+    read = failed = 0
+    try:
+        small = selected < PDF_PARALLEL_MIN_PAGES or parts <= 1
+        if PDF_EXTRACT_WORKERS <= 1 or (small and not concurrent):
+            batches = (extract_page_range(source, first, last) for first, last in page_ranges(start, end, 1))
+        else:
+            if isinstance(source, str):
+                path = source
+            else:
+                # Workers open a spooled copy rather than each receiving the whole document
+                fd, path = tempfile.mkstemp(prefix="pdf-", suffix=".pdf")
+                with os.fdopen(fd, "wb") as out:
+                    out.write(source)
+            batches = _iter_parallel(path, page_ranges(start, end, max(parts, 1)))
+
+        for texts in batches:
+            for text in texts:
+                if text is None:
+                    failed += 1
+                    continue
+                read += 1
+                if text:
+                    yield text + "\n"
+    finally:
+        with _pool_lock:
+            _active_extractions -= 1
+        if path is not None and path is not source:
+            os.unlink(path)
+
+    if read == 0:
+        raise Exception("No page of the PDF could be read")
+    if failed:
+        logger.warning(f"{failed} of {selected} PDF pages could not be read")
+    logger.info(f"Extracted {selected} PDF pages in {time.perf_counter() - started:.2f}s")
+
+
+def extract_pdf_text(source: PdfSource, first_page: int = 1, last_page: Optional[int] = None) -> str:
+    """Extract the text of a PDF (or a page range of it), one line break after each page's text"""
+    return "".join(iter_pdf_pages(source, first_page, last_page))
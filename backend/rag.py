@@ -0,0 +1,395 @@
+"""
+Retrieval helpers for the JARVIS backend
+
+Research contexts and extracted document text are split into token-bounded,
+overlapping chunks, embedded on CPU by the shared embedding service and
+stored in one vector index per document (see backend/vector_index.py).
+Agents can then send the LLM only the top-k chunks relevant to a
+question instead of the whole text, which matters most for long documents.
+
+Every chunk is also added to a BM25 index (backend/bm25.py). The default
+hybrid mode queries both indexes in parallel and merges the rankings with
+reciprocal rank fusion, so exact terms such as names, version numbers and
+acronyms that embeddings blur still surface.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from backend.bm25 import BM25Index, reciprocal_rank_fusion, tokenize
+from backend.embeddings import get_embedding_service
+from backend.vector_index import VectorIndex, create_index, merge_results
+
+logger = logging.getLogger(__name__)
+
+# Chunking
+CHUNK_TOKENS = int(os.getenv("RAG_CHUNK_TOKENS", "400"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("RAG_CHUNK_OVERLAP_TOKENS", "60"))
+TOKENIZER_ENCODING = os.getenv("RAG_TOKENIZER_ENCODING", "cl100k_base")
+
+# Least recently used documents are dropped beyond this many
+MAX_DOCUMENTS = int(os.getenv("RAG_MAX_DOCUMENTS", "256"))
+
+# Retrieval: "hybrid" (BM25 + vectors), "vector" or "lexical"
+RETRIEVAL_MODE = os.getenv("RAG_RETRIEVAL_MODE", "hybrid")
+RRF_K = int(os.getenv("RAG_RRF_K", "60"))
+# Hybrid searches use whichever rankings are ready when the budget runs out
+HYBRID_BUDGET_MS = float(os.getenv("RAG_HYBRID_BUDGET_MS", "250"))
+# Each ranking contributes this many candidates per requested chunk before fusion
+HYBRID_CANDIDATE_FACTOR = 3
+
+# Contexts shorter than this are sent to the LLM as-is
+MIN_CONTEXT_TOKENS = int(os.getenv("RAG_MIN_CONTEXT_TOKENS", "3000"))
+
+# Question answering: prompt context budget, retrieval mode and the confidence
+# (query-term coverage or best cosine similarity) below which the full context is used
+QA_TOKEN_BUDGET = int(os.getenv("RAG_QA_TOKEN_BUDGET", "2400"))
+QA_RETRIEVAL_MODE = os.getenv("RAG_QA_RETRIEVAL_MODE", RETRIEVAL_MODE)
+QA_MIN_CONFIDENCE = float(os.getenv("RAG_QA_MIN_CONFIDENCE", "0.3"))
+
+
+@dataclass
+class Chunk:
+    """A token-bounded slice of a source text"""
+    id: str
+    doc_id: str
+    index: int
+    text: str
+    token_count: int
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class RetrievedChunk:
+    """A chunk returned for a query with its cosine, BM25 or fused (RRF) score"""
+    chunk: Chunk
+    score: float
+
+
+@dataclass
+class ContextSelection:
+    """Context chosen for a prompt, with the chunks it cites"""
+    text: str
+    chunks: List[RetrievedChunk]
+    tokens_before: int
+    tokens_after: int
+    confidence: float
+    full_context: bool
+
+    def citations(self) -> List[Dict[str, Any]]:
+        """Citation entries matching the [n] markers in text"""
+        return [
+            {"id": number, "chunk_index": item.chunk.index, "score": round(item.score, 4), "excerpt": item.chunk.text[:200]}
+            for number, item in enumerate(self.chunks, start=1)
+        ]
+
+
+class TextChunker:
+    """Split text into overlapping windows of at most max_tokens tokens"""
+
+    def __init__(self, max_tokens: int = CHUNK_TOKENS, overlap_tokens: int = CHUNK_OVERLAP_TOKENS):
+        if overlap_tokens >= max_tokens:
+            raise ValueError("Chunk overlap must be smaller than the chunk size")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self._encoding = None
+        try:
+            import tiktoken
+            self._encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+        except Exception as e:
+            # Whitespace-delimited words are a close enough proxy for tokens
+            logger.warning(f"tiktoken unavailable, chunking by words instead: {str(e)}")
+
+    def count_tokens(self, text: str) -> int:
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return len(text.split())
+
+    def _window_starts(self, length: int, step: int) -> range:
+        # Stop before a final window that would contain only overlap
+        return range(0, max(length - self.overlap_tokens, 1), step)
+
+    def split(self, text: str) -> List[str]:
+        """Return the chunk texts for text, in document order"""
+        step = self.max_tokens - self.overlap_tokens
+        if self._encoding is not None:
+            tokens = self._encoding.encode(text, disallowed_special=())
+            windows = [tokens[start:start + self.max_tokens] for start in self._window_starts(len(tokens), step)]
+            chunks = [self._encoding.decode(window) for window in windows]
+        else:
+            words = re.findall(r'\S+', text)
+            chunks = [" ".join(words[start:start + self.max_tokens]) for start in self._window_starts(len(words), step)]
+        return [chunk.strip() for chunk in chunks if chunk.strip()]
+
+    def split_stream(self, pieces: Iterable[str]) -> Iterator[str]:
+        """Chunk text that arrives in pieces (pages, blocks), holding about one chunk of tokens at a time"""
+        step = self.max_tokens - self.overlap_tokens
+        buffer: list = []
+        emitted = False
+
+        def window_text(window: list) -> str:
+            if self._encoding is not None:
+                return self._encoding.decode(window).strip()
+            return " ".join(window).strip()
+
+        for piece in pieces:
+            if self._encoding is not None:
+                buffer.extend(self._encoding.encode(piece, disallowed_special=()))
+            else:
+                buffer.extend(re.findall(r'\S+', piece))
+            while len(buffer) >= self.max_tokens:
+                chunk = window_text(buffer[:self.max_tokens])
+                if chunk:
+                    yield chunk
+                del buffer[:step]
+                emitted = True
+
+        # The same final windows split() would produce for the whole text
+        if emitted and len(buffer) <= self.overlap_tokens:
+            return
+        for start in self._window_starts(len(buffer), step):
+            chunk = window_text(buffer[start:start + self.max_tokens])
+            if chunk:
+                yield chunk
+
+    def chunk(self, doc_id: str, text: str, metadata: Optional[Dict[str, Any]] = None) -> List[Chunk]:
+        """Split text into Chunk objects belonging to doc_id"""
+        return [
+            Chunk(
+                id=f"{doc_id}:{index}",
+                doc_id=doc_id,
+                index=index,
+                text=chunk_text,
+                token_count=self.count_tokens(chunk_text),
+                metadata=dict(metadata or {})
+            )
+            for index, chunk_text in enumerate(self.split(text))
+        ]
+
+
+def document_id(text: str) -> str:
+    """Stable identifier for a text, derived from its content"""
+    return hashlib.sha256(text.encode("utf-8", errors="ignore")).hexdigest()[:32]
+
+
+class RAGStore:
+    """Chunk store with per-document vector and BM25 indexes"""
+
+    def __init__(self):
+        self.chunker = TextChunker()
+        self.embedder = get_embedding_service()
+        self._indexes: Dict[str, VectorIndex] = {}
+        # Insertion order doubles as the LRU order for eviction
+        self._lexical: "OrderedDict[str, BM25Index]" = OrderedDict()
+        self._chunks: Dict[str, Chunk] = {}
+        self._doc_chunks: Dict[str, List[str]] = {}
+        self._indexed_docs = set()
+        self._indexing: Dict[str, asyncio.Future] = {}
+        self.stats = {"queries": 0, "degraded_queries": 0}
+
+    def _add(self, doc_id: str, chunks: List[Chunk], embeddings):
+        index = self._indexes.get(doc_id)
+        if index is None:
+            index = self._indexes[doc_id] = create_index(embeddings.shape[1], expected_size=len(chunks))
+        index.add([chunk.id for chunk in chunks], embeddings)
+
+    def _store(self, doc_id: str, chunks: List[Chunk]):
+        for chunk in chunks:
+            self._chunks[chunk.id] = chunk
+        self._doc_chunks[doc_id] = [chunk.id for chunk in chunks]
+        self._indexed_docs.add(doc_id)
+        while len(self._indexed_docs) > MAX_DOCUMENTS and self._lexical:
+            self.remove(next(iter(self._lexical)))
+
+    def remove(self, doc_id: str):
+        """Drop a document's chunks and index"""
+        self._indexes.pop(doc_id, None)
+        self._lexical.pop(doc_id, None)
+        for chunk_id in self._doc_chunks.pop(doc_id, []):
+            self._chunks.pop(chunk_id, None)
+        self._indexed_docs.discard(doc_id)
+
+    def _add_lexical(self, doc_id: str, chunks: List[Chunk]):
+        index = self._lexical.get(doc_id)
+        if index is None:
+            index = self._lexical[doc_id] = BM25Index()
+        index.add([chunk.id for chunk in chunks], [chunk.text for chunk in chunks])
+
+    def _search(self, embedding, k: int, doc_id: Optional[str]):
+        if doc_id is not None:
+            index = self._indexes.get(doc_id)
+            return index.search(embedding, k)[0] if index is not None else []
+        return merge_results([index.search(embedding, k)[0] for index in list(self._indexes.values())], k)
+
+    def _search_lexical(self, query: str, k: int, doc_id: Optional[str]):
+        if doc_id is not None:
+            index = self._lexical.get(doc_id)
+            return index.search(query, k) if index is not None else []
+        return merge_results([index.search(query, k) for index in list(self._lexical.values())], k)
+
+    async def index_text(self, doc_id: str, text: str, metadata: Optional[Dict[str, Any]] = None) -> int:
+        """Chunk, embed and store text under doc_id; returns the number of new chunks"""
+        if doc_id in self._indexed_docs:
+            if doc_id in self._lexical:
+                self._lexical.move_to_end(doc_id)
+            return 0
+        # Concurrent requests for the same document wait for the first one
+        pending = self._indexing.get(doc_id)
+        if pending is not None:
+            await asyncio.shield(pending)
+            return 0
+
+        pending = asyncio.get_running_loop().create_future()
+        self._indexing[doc_id] = pending
+        try:
+            chunks = await asyncio.to_thread(self.chunker.chunk, doc_id, text, metadata)
+            if chunks:
+                await asyncio.to_thread(self._add_lexical, doc_id, chunks)
+                try:
+                    embeddings = await self.embedder.embed([chunk.text for chunk in chunks])
+                    await asyncio.to_thread(self._add, doc_id, chunks, embeddings)
+                except Exception as e:
+                    # Lexical retrieval still works without the embedding model
+                    logger.warning(f"Embedding failed for document {doc_id}, indexing lexically only: {str(e)}")
+            self._store(doc_id, chunks)
+            pending.set_result(len(chunks))
+            logger.info(f"Indexed {len(chunks)} chunks for document {doc_id}")
+            return len(chunks)
+        except Exception as e:
+            pending.set_exception(e)
+            # Mark the exception as retrieved so waiters are optional
+            pending.exception()
+            raise
+        finally:
+            self._indexing.pop(doc_id, None)
+
+    async def _vector_search(self, query: str, k: int, doc_id: Optional[str]):
+        embedding = await self.embedder.embed([query])
+        return await asyncio.to_thread(self._search, embedding, k, doc_id)
+
+    async def _hybrid_search(self, query: str, k: int, doc_id: Optional[str], budget_ms: float):
+        candidates = k * HYBRID_CANDIDATE_FACTOR
+        tasks = [
+            asyncio.ensure_future(self._vector_search(query, candidates, doc_id)),
+            asyncio.ensure_future(asyncio.to_thread(self._search_lexical, query, candidates, doc_id))
+        ]
+        done, pending = await asyncio.wait(tasks, timeout=budget_ms / 1000)
+        if not done:
+            # Nothing finished within budget; take whichever ranking is first
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+
+        rankings = [task.result() for task in done if task.exception() is None]
+        if not rankings:
+            raise next(iter(done)).exception()
+        if len(rankings) < len(tasks):
+            self.stats["degraded_queries"] += 1
+            logger.info(f"Hybrid retrieval degraded to {len(rankings)} of {len(tasks)} rankings")
+        return reciprocal_rank_fusion(rankings, k, RRF_K)
+
+    async def retrieve(self, query: str, k: int = 5, doc_id: Optional[str] = None,
+                       mode: str = RETRIEVAL_MODE, budget_ms: float = HYBRID_BUDGET_MS) -> List[RetrievedChunk]:
+        """Return the top-k chunks for query, best first, optionally limited to one document"""
+        self.stats["queries"] += 1
+        if mode == "vector":
+            results = await self._vector_search(query, k, doc_id)
+        elif mode == "lexical":
+            results = await asyncio.to_thread(self._search_lexical, query, k, doc_id)
+        else:
+            results = await self._hybrid_search(query, k, doc_id, budget_ms)
+        return [
+            RetrievedChunk(chunk=self._chunks[chunk_id], score=score)
+            for chunk_id, score in results
+            if chunk_id in self._chunks
+        ]
+
+    def is_indexed(self, doc_id: str) -> bool:
+        return doc_id in self._indexed_docs
+
+
+_rag_store: Optional[RAGStore] = None
+
+
+def get_rag_store() -> RAGStore:
+    """Return the process-wide RAG store"""
+    global _rag_store
+    if _rag_store is None:
+        _rag_store = RAGStore()
+    return _rag_store
+
+
+async def retrieve_relevant_context(text: str, query: str, k: int = 5) -> str:
+    """
+    Return only the chunks of text most relevant to query, joined in document
+    order. Short texts are returned unchanged.
+    """
+    store = get_rag_store()
+    if store.chunker.count_tokens(text) <= MIN_CONTEXT_TOKENS:
+        return text
+
+    doc_id = document_id(text)
+    await store.index_text(doc_id, text)
+    retrieved = await store.retrieve(query, k=k, doc_id=doc_id)
+    if not retrieved:
+        return text
+
+    ordered = sorted(retrieved, key=lambda item: item.chunk.index)
+    return "\n\n...\n\n".join(item.chunk.text for item in ordered)
+
+
+async def _selection_confidence(store: RAGStore, query: str, doc_id: str, selected_text: str) -> float:
+    terms = set(tokenize(query))
+    coverage = len(terms & set(tokenize(selected_text))) / len(terms) if terms else 0.0
+    similarity = 0.0
+    try:
+        best = await store.retrieve(query, k=1, doc_id=doc_id, mode="vector")
+        if best:
+            similarity = best[0].score
+    except Exception as e:
+        logger.debug(f"Vector confidence unavailable: {str(e)}")
+    return max(coverage, similarity)
+
+
+async def select_context(text: str, query: str, token_budget: int = QA_TOKEN_BUDGET,
+                         mode: str = QA_RETRIEVAL_MODE, min_confidence: float = QA_MIN_CONFIDENCE) -> ContextSelection:
+    """
+    Pick the chunks of text most relevant to query that fit in token_budget.
+    Selected chunks are numbered [1], [2], ... in document order for citation.
+    The full text is kept when it already fits or retrieval confidence is low.
+    """
+    store = get_rag_store()
+    tokens_before = store.chunker.count_tokens(text)
+
+    def full(confidence: float) -> ContextSelection:
+        return ContextSelection(text, [], tokens_before, tokens_before, confidence, True)
+
+    if tokens_before <= token_budget:
+        return full(1.0)
+
+    doc_id = document_id(text)
+    await store.index_text(doc_id, text)
+    # Enough candidates to fill the budget even if some are skipped as too large
+    k = max(1, 2 * token_budget // max(store.chunker.max_tokens - store.chunker.overlap_tokens, 1))
+    retrieved = await store.retrieve(query, k=k, doc_id=doc_id, mode=mode)
+
+    selected: List[RetrievedChunk] = []
+    used = 0
+    for item in retrieved:
+        if used + item.chunk.token_count <= token_budget:
+            selected.append(item)
+            used += item.chunk.token_count
+    if not selected:
+        return full(0.0)
+
+    selected.sort(key=lambda item: item.chunk.index)
+    selected_text = "\n\n".join(f"[{number}] {item.chunk.text}" for number, item in enumerate(selected, start=1))
+    confidence = await _selection_confidence(store, query, doc_id, selected_text)
+    if confidence < min_confidence:
+        return full(confidence)
+    return ContextSelection(selected_text, selected, tokens_before, store.chunker.count_tokens(selected_text), confidence, False)
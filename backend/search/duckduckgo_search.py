@@ -4,16 +4,22 @@ DuckDuckGo Search Provider for the JARVIS Research System
 import os
 import logging
 from typing import Dict, List, Any
-from ddgs import DDGS
+
+from backend.lifecycle import lazy_import
 
 logger = logging.getLogger(__name__)
 
-def perform_duckduckgo_search(query: str) -> Dict[str, Any]:
+def perform_duckduckgo_search(query: str, max_results: int = 10, max_images: int = 5,
+                              include_text: bool = True, include_images: bool = True) -> Dict[str, Any]:
     """
     Perform search using DuckDuckGo
     
     Args:
         query (str): Search query
+        max_results (int): Maximum number of text results
+        max_images (int): Maximum number of image results
+        include_text (bool): Whether to run the text search
+        include_images (bool): Whether to run the image search
         
     Returns:
         Dict containing search results in the same format as other providers
@@ -21,13 +27,18 @@ def perform_duckduckgo_search(query: str) -> Dict[str, Any]:
     try:
         logger.info(f"Performing DuckDuckGo search for: {query}")
         
+        text_results = []
+        image_results = []
+        
         # Use DDGS as context manager
-        with DDGS() as ddgs:
+        with lazy_import("ddgs").DDGS() as ddgs:
             # Perform text search
-            text_results = list(ddgs.text(query, max_results=10))
+            if include_text:
+                text_results = list(ddgs.text(query, max_results=max_results))
             
             # Perform image search
-            image_results = list(ddgs.images(query, max_results=5))
+            if include_images:
+                image_results = list(ddgs.images(query, max_results=max_images))
         
         # Format results to match Tavily format
         formatted_results = []
@@ -0,0 +1,267 @@
+"""
+Search providers for the JARVIS Research System
+
+Each provider wraps one search backend behind the async SearchProvider
+interface. HTTP APIs are called through the shared async client; synchronous
+client libraries are run in a worker thread so they never block the event loop.
+"""
+import logging
+import os
+import time
+from typing import Dict, Any
+
+from backend.http_client import get_async_client
+from backend.search.registry import SearchProvider, SearchProviderError, SearchProviderRegistry, env_quota
+
+logger = logging.getLogger(__name__)
+
+
+def _single_result(query: str, content: str) -> Dict[str, Any]:
+    """Wrap generated text in the common search result format"""
+    return {
+        "answer": content,
+        "results": [{"title": f"Search Result for {query}", "content": content, "url": "#"}],
+        "images": []
+    }
+
+
+# Tavily request settings per research mode. Basic depth costs one credit and
+# answers noticeably faster; advanced depth costs two and is kept for deep research.
+TAVILY_MODE_SETTINGS = {
+    "quick": {
+        "search_depth": "basic",
+        "max_results": int(os.getenv("TAVILY_QUICK_MAX_RESULTS", "5")),
+        "include_answer": "basic",
+        "include_images": True,
+        "credits": 1
+    },
+    "deep": {
+        "search_depth": "advanced",
+        "max_results": int(os.getenv("TAVILY_DEEP_MAX_RESULTS", "10")),
+        "include_answer": "advanced",
+        "include_images": True,
+        "credits": 2
+    }
+}
+
+# Minimum answer length for a Tavily response to count as adequate
+TAVILY_MIN_ANSWER_CHARS = 50
+
+
+class TavilySearchProvider(SearchProvider):
+    """Web search using the Tavily API with mode-aware depth and result size"""
+
+    name = "tavily"
+    timeout = 30.0
+    max_concurrency = 4
+    cost = TAVILY_MODE_SETTINGS["deep"]["credits"]
+
+    def __init__(self):
+        self.api_key = os.getenv("TAVILY_API_KEY")
+        self.daily_quota = env_quota("TAVILY_DAILY_QUOTA")
+        self.mode_stats = {
+            mode: {"calls": 0, "inadequate": 0, "errors": 0, "total_latency_ms": 0.0, "credits": 0}
+            for mode in TAVILY_MODE_SETTINGS
+        }
+
+    def is_available(self) -> bool:
+        return bool(self.api_key)
+
+    def _settings(self, mode: str) -> Dict[str, Any]:
+        return TAVILY_MODE_SETTINGS.get(mode, TAVILY_MODE_SETTINGS["deep"])
+
+    def estimate_cost(self, **options) -> float:
+        return self._settings(options.get("mode", "deep"))["credits"]
+
+    async def search(self, query: str, **options) -> Dict[str, Any]:
+        mode = options.get("mode", "deep")
+        if mode not in TAVILY_MODE_SETTINGS:
+            mode = "deep"
+        settings = self._settings(mode)
+        stats = self.mode_stats[mode]
+        url = "https://api.tavily.com/search"
+        payload = {
+            "api_key": self.api_key,
+            "query": query,
+            "search_depth": settings["search_depth"],
+            "include_images": settings["include_images"],
+            "include_answer": settings["include_answer"],
+            "max_results": settings["max_results"]
+        }
+
+        stats["calls"] += 1
+        start = time.perf_counter()
+        try:
+            response = await get_async_client().post(url, json=payload, timeout=self.timeout)
+        except Exception:
+            stats["errors"] += 1
+            raise
+        finally:
+            stats["total_latency_ms"] += (time.perf_counter() - start) * 1000
+
+        if response.status_code != 200:
+            stats["errors"] += 1
+            raise SearchProviderError(f"Tavily API error: {response.status_code}")
+
+        # Tavily bills every successful request, adequate or not
+        stats["credits"] += settings["credits"]
+        data = response.json()
+
+        # An inadequate response is a failure so the registry moves on to the next provider
+        if len(data.get("answer") or "") <= TAVILY_MIN_ANSWER_CHARS or not data.get("results"):
+            stats["inadequate"] += 1
+            raise SearchProviderError(f"Tavily returned inadequate results for {mode} search")
+
+        logger.info(f"Tavily {mode} search ({settings['search_depth']}) took {(time.perf_counter() - start) * 1000:.0f} ms")
+        return data
+
+    def extra_stats(self) -> Dict[str, Any]:
+        modes = {}
+        for mode, stats in self.mode_stats.items():
+            mode_report = dict(stats)
+            mode_report["avg_latency_ms"] = round(stats["total_latency_ms"] / stats["calls"], 1) if stats["calls"] else 0.0
+            mode_report["search_depth"] = TAVILY_MODE_SETTINGS[mode]["search_depth"]
+            mode_report["max_results"] = TAVILY_MODE_SETTINGS[mode]["max_results"]
+            modes[mode] = mode_report
+        return {"modes": modes}
+
+
+class DuckDuckGoSearchProvider(SearchProvider):
+    """Web and image search using DuckDuckGo (no API key required)"""
+
+    name = "duckduckgo"
+    timeout = 20.0
+    max_concurrency = 2  # DuckDuckGo rate-limits aggressive clients
+
+    def __init__(self):
+        self.daily_quota = env_quota("DUCKDUCKGO_DAILY_QUOTA")
+
+    async def search(self, query: str, **options) -> Dict[str, Any]:
+        # Import here to avoid dependency issues if not installed
+        from backend.search.duckduckgo_search import perform_duckduckgo_search
+        return await self.run_blocking(
+            perform_duckduckgo_search,
+            query,
+            options.get("max_results", 10),
+            options.get("max_images", 5),
+            options.get("include_text", True),
+            options.get("include_images", True)
+        )
+
+
+class WikipediaSearchProvider(SearchProvider):
+    """Encyclopedia lookup using the public Wikipedia API (no API key required)"""
+
+    name = "wikipedia"
+    timeout = 20.0
+    max_concurrency = 4
+
+    def __init__(self):
+        self.daily_quota = env_quota("WIKIPEDIA_DAILY_QUOTA")
+
+    async def search(self, query: str, **options) -> Dict[str, Any]:
+        from backend.search.wikipedia_search import perform_wikipedia_search
+        return await self.run_blocking(perform_wikipedia_search, query)
+
+
+class GoogleSearchProvider(SearchProvider):
+    """Placeholder for Google Search via Gemini grounding"""
+
+    name = "google"
+    timeout = 5.0
+
+    def is_available(self) -> bool:
+        return bool(os.getenv("GOOGLE_API_KEY"))
+
+    async def search(self, query: str, **options) -> Dict[str, Any]:
+        # Return a simple fallback response instead of calling the API
+        return _single_result(query, f"Google search is temporarily unavailable for '{query}'. This is a fallback response.")
+
+
+class GroqSearchProvider(SearchProvider):
+    """Fallback 'search' that asks a Groq-hosted LLM for an overview"""
+
+    name = "groq"
+    timeout = 30.0
+    max_concurrency = 4
+
+    def __init__(self):
+        self.api_key = os.getenv("GROQ_API_KEY")
+        self.daily_quota = env_quota("GROQ_SEARCH_DAILY_QUOTA")
+
+    def is_available(self) -> bool:
+        return bool(self.api_key)
+
+    async def search(self, query: str, **options) -> Dict[str, Any]:
+        url = "https://api.groq.com/openai/v1/chat/completions"
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+        payload = {
+            "model": "llama3-8b-8192",
+            "messages": [{
+                "role": "user",
+                "content": f"You are a search engine. Provide a brief overview of: {query}. Keep it under 200 words."
+            }],
+            "temperature": 0.7,
+            "max_tokens": 500
+        }
+
+        response = await get_async_client().post(url, json=payload, headers=headers, timeout=self.timeout)
+
+        if not response.is_success:
+            raise Exception(f"Groq API Error: {response.status_code} - {response.text}")
+
+        result = response.json()
+        return _single_result(query, result["choices"][0]["message"]["content"])
+
+
+class HuggingFaceSearchProvider(SearchProvider):
+    """Fallback 'search' that asks a Hugging Face hosted model for an overview"""
+
+    name = "huggingface"
+    timeout = 30.0
+    max_concurrency = 2
+
+    def __init__(self):
+        self.api_key = os.getenv("HUGGINGFACE_API_KEY")
+        self.daily_quota = env_quota("HUGGINGFACE_SEARCH_DAILY_QUOTA")
+
+    def is_available(self) -> bool:
+        return bool(self.api_key)
+
+    async def search(self, query: str, **options) -> Dict[str, Any]:
+        url = "https://api-inference.huggingface.co/models/google/gemma-2b"
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+        payload = {
+            "inputs": f"You are a search engine. Provide a brief overview of: {query}. Keep it under 200 words.",
+            "parameters": {
+                "max_new_tokens": 500,
+                "temperature": 0.7
+            }
+        }
+
+        response = await get_async_client().post(url, json=payload, headers=headers, timeout=self.timeout)
+
+        if not response.is_success:
+            raise Exception(f"Hugging Face API Error: {response.status_code} - {response.text}")
+
+        result = response.json()
+        content = result[0]["generated_text"] if isinstance(result, list) else result.get("generated_text", "")
+        return _single_result(query, content)
+
+
+def register_default_providers(registry: SearchProviderRegistry):
+    """Register every built-in search provider with the registry"""
+    registry.register(TavilySearchProvider())
+    registry.register(DuckDuckGoSearchProvider())
+    registry.register(WikipediaSearchProvider())
+    registry.register(GoogleSearchProvider())
+    registry.register(GroqSearchProvider())
+    registry.register(HuggingFaceSearchProvider())
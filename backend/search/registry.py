@@ -0,0 +1,239 @@
+"""
+Search provider registry for the JARVIS Research System
+
+Every search backend (Tavily, DuckDuckGo, Wikipedia, the LLM fallbacks) is an
+async SearchProvider that declares its own timeout, concurrency limit, daily
+quota and cost. Callers never invoke providers directly; they schedule them
+through the registry, which enforces those limits and records usage.
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Threads running the blocking clients of synchronous providers
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("SEARCH_THREADS", "16")), thread_name_prefix="search")
+# Thread futures started by the provider call in progress, so the registry can hold its slot until they finish
+_blocking_calls: contextvars.ContextVar[Optional[List[Future]]] = contextvars.ContextVar("blocking_calls", default=None)
+
+
+class SearchProviderError(Exception):
+    """Raised when a provider cannot serve a search request"""
+
+
+class QuotaExceededError(SearchProviderError):
+    """Raised when a provider has used up its daily quota"""
+
+
+class SearchProvider(ABC):
+    """Base class for all async search providers"""
+
+    name: str = ""
+    # Seconds before the registry abandons a call
+    timeout: float = 15.0
+    # Maximum number of in-flight calls to this provider per worker
+    max_concurrency: int = 4
+    # Maximum number of calls per day (None means unlimited)
+    daily_quota: Optional[int] = None
+    # Cost of a single call in provider credits
+    cost: float = 0.0
+
+    def is_available(self) -> bool:
+        """Whether the provider can be used (e.g. its API key is configured)"""
+        return True
+
+    def estimate_cost(self, **options) -> float:
+        """Cost of a call with the given options, in provider credits"""
+        return self.cost
+
+    def extra_stats(self) -> Dict[str, Any]:
+        """Provider-specific statistics merged into the registry report"""
+        return {}
+
+    async def run_blocking(self, function: Callable[..., Any], *args) -> Any:
+        """
+        Run a blocking client call in a search thread. A thread cannot be
+        interrupted, so if the call times out the registry keeps this
+        provider's concurrency slot until the thread actually finishes.
+        """
+        future = _executor.submit(function, *args)
+        calls = _blocking_calls.get()
+        if calls is not None:
+            calls.append(future)
+        return await asyncio.wrap_future(future)
+
+    @abstractmethod
+    async def search(self, query: str, **options) -> Dict[str, Any]:
+        """
+        Run a search and return results in the common format:
+        {"answer": str, "results": [{"title", "content", "url"}], "images": [str]}
+        """
+        pass
+
+
+class SearchProviderRegistry:
+    """Registry that schedules search providers under their declared limits"""
+
+    def __init__(self):
+        self._providers: Dict[str, SearchProvider] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._usage_day: Dict[str, date] = {}
+        self._usage_calls: Dict[str, int] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+        # Waits on threads left running by timed-out calls, releasing their slots when they finish
+        self._draining: Set[asyncio.Future] = set()
+
+    def register(self, provider: SearchProvider) -> SearchProvider:
+        """Register a provider under its name, replacing any previous one"""
+        if not provider.name:
+            raise ValueError("Search providers must declare a name")
+        self._providers[provider.name] = provider
+        self._semaphores.pop(provider.name, None)
+        self._stats.setdefault(provider.name, {
+            "calls": 0,
+            "successes": 0,
+            "failures": 0,
+            "timeouts": 0,
+            "abandoned_threads": 0,
+            "quota_rejections": 0,
+            "total_latency_ms": 0.0,
+            "total_cost": 0.0
+        })
+        logger.info(f"Registered search provider: {provider.name}")
+        return provider
+
+    def get(self, name: str) -> SearchProvider:
+        """Return the provider registered under name"""
+        if name not in self._providers:
+            raise SearchProviderError(f"Unknown search provider: {name}")
+        return self._providers[name]
+
+    def names(self) -> List[str]:
+        """Names of all registered providers"""
+        return list(self._providers)
+
+    def _semaphore(self, provider: SearchProvider) -> asyncio.Semaphore:
+        # Created lazily so the semaphore binds to the running event loop
+        semaphore = self._semaphores.get(provider.name)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(max(1, provider.max_concurrency))
+            self._semaphores[provider.name] = semaphore
+        return semaphore
+
+    def _reserve_quota(self, provider: SearchProvider):
+        today = date.today()
+        if self._usage_day.get(provider.name) != today:
+            self._usage_day[provider.name] = today
+            self._usage_calls[provider.name] = 0
+
+        if provider.daily_quota is not None and self._usage_calls[provider.name] >= provider.daily_quota:
+            self._stats[provider.name]["quota_rejections"] += 1
+            raise QuotaExceededError(f"{provider.name} daily quota of {provider.daily_quota} calls exhausted")
+
+        self._usage_calls[provider.name] += 1
+
+    async def search(self, name: str, query: str, **options) -> Dict[str, Any]:
+        """Run a single provider, enforcing its timeout, concurrency limit and quota"""
+        provider = self.get(name)
+        if not provider.is_available():
+            raise SearchProviderError(f"{provider.name} is not configured")
+
+        stats = self._stats[provider.name]
+        semaphore = self._semaphore(provider)
+        await semaphore.acquire()
+        threads: List[Future] = []
+        token = _blocking_calls.set(threads)
+        try:
+            self._reserve_quota(provider)
+            stats["calls"] += 1
+            stats["total_cost"] += provider.estimate_cost(**options)
+            start = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(provider.search(query, **options), timeout=provider.timeout)
+                stats["successes"] += 1
+                return result
+            except asyncio.TimeoutError:
+                stats["timeouts"] += 1
+                raise SearchProviderError(f"{provider.name} timed out after {provider.timeout}s")
+            except Exception:
+                stats["failures"] += 1
+                raise
+            finally:
+                stats["total_latency_ms"] += (time.perf_counter() - start) * 1000
+        finally:
+            _blocking_calls.reset(token)
+            self._release(provider, semaphore, threads)
+
+    def _release(self, provider: SearchProvider, semaphore: asyncio.Semaphore, threads: List[Future]):
+        """Free the provider's slot once every thread its call started has finished"""
+        running = [thread for thread in threads if not thread.done()]
+        if not running:
+            semaphore.release()
+            return
+        self._stats[provider.name]["abandoned_threads"] += len(running)
+        draining = asyncio.ensure_future(asyncio.wait([asyncio.wrap_future(thread) for thread in running]))
+        self._draining.add(draining)
+
+        def finished(future: asyncio.Future):
+            self._draining.discard(future)
+            semaphore.release()
+
+        draining.add_done_callback(finished)
+
+    async def search_with_fallback(self, names: List[str], query: str, **options) -> Tuple[str, Dict[str, Any]]:
+        """Try providers in order and return (provider_name, result) from the first that succeeds"""
+        last_error = None
+        for name in names:
+            try:
+                logger.info(f"Trying {name} search")
+                result = await self.search(name, query, **options)
+                logger.info(f"Successfully got results from {name}")
+                return name, result
+            except Exception as e:
+                last_error = e
+                logger.warning(f"{name} search failed: {str(e)}")
+                continue
+
+        raise SearchProviderError(f"All search providers failed. Last error: {str(last_error)}")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Usage statistics per provider"""
+        report = {}
+        for name, provider in self._providers.items():
+            stats = dict(self._stats[name])
+            stats["avg_latency_ms"] = round(stats["total_latency_ms"] / stats["calls"], 1) if stats["calls"] else 0.0
+            stats["calls_today"] = self._usage_calls.get(name, 0) if self._usage_day.get(name) == date.today() else 0
+            stats["daily_quota"] = provider.daily_quota
+            stats["timeout"] = provider.timeout
+            stats["max_concurrency"] = provider.max_concurrency
+            stats["available"] = provider.is_available()
+            stats.update(provider.extra_stats())
+            report[name] = stats
+        return report
+
+
+def env_quota(variable: str) -> Optional[int]:
+    """Read a daily quota from the environment (unset or empty means unlimited)"""
+    value = os.getenv(variable, "").strip()
+    return int(value) if value else None
+
+
+_search_registry: Optional[SearchProviderRegistry] = None
+
+
+def get_search_registry() -> SearchProviderRegistry:
+    """Return the process-wide registry with the default providers registered"""
+    global _search_registry
+    if _search_registry is None:
+        from backend.search.providers import register_default_providers
+        registry = SearchProviderRegistry()
+        register_default_providers(registry)
+        _search_registry = registry
+    return _search_registry
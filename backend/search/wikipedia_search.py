@@ -3,11 +3,13 @@
 Wikipedia search utility for fallback when LLM providers fail
 No API keys required - uses the public Wikipedia API
 """
-import requests
+import httpx
 import logging
 from typing import Dict, Any, List
 import re
 
+from backend.http_client import get_client
+
 logger = logging.getLogger(__name__)
 
 def perform_wikipedia_search(query: str) -> Dict[str, Any]:
@@ -39,7 +41,7 @@ def perform_wikipedia_search(query: str) -> Dict[str, Any]:
             "User-Agent": "JARVIS-Research-Assistant/1.0 (https://github.com/surajpanwar/Jarvis)"
         }
         
-        search_response = requests.get(search_url, params=search_params, headers=headers, timeout=10)
+        search_response = get_client().get(search_url, params=search_params, headers=headers, timeout=10)
         search_response.raise_for_status()
         search_data = search_response.json()
         
@@ -57,7 +59,7 @@ def perform_wikipedia_search(query: str) -> Dict[str, Any]:
         
         # Get the page content using the correct endpoint
         content_url = "https://en.wikipedia.org/api/rest_v1/page/summary/" + page_title.replace(" ", "_")
-        content_response = requests.get(content_url, headers=headers, timeout=10)
+        content_response = get_client().get(content_url, headers=headers, timeout=10)
         content_response.raise_for_status()
         content_data = content_response.json()
         
@@ -92,7 +94,7 @@ def perform_wikipedia_search(query: str) -> Dict[str, Any]:
             "images": images
         }
         
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Network error during Wikipedia search: {str(e)}")
         raise Exception(f"Wikipedia search failed due to network error: {str(e)}")
     except Exception as e:
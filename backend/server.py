@@ -1,15 +1,19 @@
 import os
 import logging
+import mimetypes
 from datetime import datetime
-from typing import List, Optional
-from fastapi import FastAPI, HTTPException
+from typing import Any, AsyncIterator, Dict, List, Optional
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware import Middleware
 from starlette.middleware.sessions import SessionMiddleware
 from pydantic import BaseModel
 import asyncio
-import requests
-from requests.exceptions import Timeout
+import base64
+import json
+from contextlib import asynccontextmanager
 
 # Load environment variables from .env file
 from dotenv import load_dotenv
@@ -23,8 +27,67 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+from backend import http_client, pdf_extraction
+from backend.pdf_extraction import PageRange, check_page_range, parse_page_range
+from backend.embeddings import get_embedding_service
+from backend.sessions import get_session_store
+from backend.answer_cache import get_answer_cache
+from backend.uploads import SpooledUpload, UploadError, UploadTooLargeError, receive_upload, receive_uploads
+from backend.cpu_executor import CPUExecutorBusyError, get_cpu_executor
+from backend.document_cache import document_key, get_document_cache, hash_base64, hash_file
+from backend.simhash import SIMHASH_MAX_DISTANCE, get_document_index
+from backend.lifecycle import ResourceManager, get_import_stats, get_resource_manager, in_daemon_thread
+from backend.mongo import get_mongo
+from backend.rag import get_rag_store
+from backend.search.registry import get_search_registry
+
+# How often long-running requests check that their client is still connected
+DISCONNECT_POLL_SECONDS = float(os.getenv("DISCONNECT_POLL_SECONDS", "1.0"))
+# Batch analysis: documents analyzed at once, and LLM calls in flight across the whole batch
+DOC_BATCH_CONCURRENCY = int(os.getenv("DOC_BATCH_CONCURRENCY", "4"))
+DOC_BATCH_LLM_CONCURRENCY = int(os.getenv("DOC_BATCH_LLM_CONCURRENCY", "8"))
+
+def register_resources(resources: ResourceManager):
+    """Shared resources of a worker, started concurrently by the lifespan"""
+    embedding_service = get_embedding_service()
+    # Shared outbound HTTP clients (connection pools, HTTP/2, DNS cache); building
+    # their SSL contexts takes long enough to be kept off the event loop
+    resources.add("http", lambda: asyncio.to_thread(http_client.startup), http_client.shutdown, required=True)
+    # Load the embedding model once per worker, in the background; an embedding request that
+    # arrives first waits for the load to finish
+    if os.getenv("EMBEDDING_PRELOAD", "true").lower() == "true":
+        resources.add("embeddings", embedding_service.startup, embedding_service.shutdown, background=True)
+    else:
+        resources.add("embeddings", stop=embedding_service.shutdown)
+    # MongoDB and the OAuth client come up in the background: a slow or unreachable
+    # database must not hold up a deploy, and authlib is only needed for logins
+    resources.add("mongodb", lambda: in_daemon_thread(get_mongo().connect, "mongodb-connect"),
+                  lambda: asyncio.to_thread(get_mongo().close), background=True)
+    resources.add("oauth", lambda: asyncio.to_thread(get_oauth), background=True)
+    resources.add("cpu_executor", get_cpu_executor, lambda: get_cpu_executor().shutdown(), required=True)
+    # Worker processes are spawned on the first large PDF
+    resources.add("pdf_pool", stop=pdf_extraction.shutdown_pool)
+    # Scans the cache directory to learn its size
+    resources.add("document_cache", lambda: asyncio.to_thread(get_document_cache))
+    resources.add("sessions", get_session_store, required=True)
+    resources.add("answer_cache", get_answer_cache)
+    resources.add("search_providers", get_search_registry, required=True)
+    resources.add("retrieval", get_rag_store)
+    resources.add("agents", get_chief_agent, required=True)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared resources once per worker, concurrently, and release them on shutdown"""
+    resources = get_resource_manager()
+    register_resources(resources)
+    await resources.startup()
+    
+    yield
+    
+    await resources.shutdown()
+
 # Initialize FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Add Session Middleware for OAuth
 app.add_middleware(SessionMiddleware, secret_key=os.getenv("SESSION_SECRET_KEY", "your-secret-key-change-in-production"))
@@ -73,39 +136,40 @@ else:
     )
 
 # Import agents
-from backend.agents.chief_agent import ChiefAgent
+from backend.agents.chief_agent import get_chief_agent
 
 # Import auth routes
-from backend.auth import router as auth_router, mongo_client, users_collection
-
-# Initialize MongoDB collections if client is available
-activity_collection = None
-if mongo_client is not None:
-    try:
-        db = mongo_client["jarvis_database"]
-        activity_collection = db["activity_logs"]
-        # Create indexes for better performance
-        activity_collection.create_index("userId")
-        activity_collection.create_index("timestamp")
-        activity_collection.create_index([("userId", 1), ("timestamp", -1)])
-        print("Initialized MongoDB activity collection successfully")
-    except Exception as e:
-        logger.error(f"Failed to initialize MongoDB activity collection: {e}")
-        activity_collection = None
+from backend.auth import get_oauth, router as auth_router
 
 app.include_router(auth_router, prefix="/api")
 
+# AI Chatbot over a persistent WebSocket
+from backend.chat_channel import router as chat_router, get_stats as get_chat_channel_stats
+app.include_router(chat_router)
+
 class ResearchRequest(BaseModel):
     topic: str
     is_deep: bool
 
 class QuestionRequest(BaseModel):
     question: str
+    # Either a session_id from a previous result or the full context
+    context: Optional[str] = None
+    session_id: Optional[str] = None
+
+class SessionRequest(BaseModel):
     context: str
+    kind: Optional[str] = "research"
+
+class SessionResult(BaseModel):
+    session_id: str
+    expires_in: int
 
 class DocumentAnalysisRequest(BaseModel):
     file_base64: str
     mime_type: str
+    # PDF page range such as "1-50", "5" or "10-"; the whole document by default
+    pages: Optional[str] = None
 
 class Source(BaseModel):
     title: Optional[str] = None
@@ -115,9 +179,17 @@ class ResearchResult(BaseModel):
     report: str
     sources: List[Source]
     images: Optional[List[str]] = None
+    session_id: Optional[str] = None
     
+class Citation(BaseModel):
+    id: int
+    chunk_index: int
+    score: float
+    excerpt: str
+
 class QuestionResult(BaseModel):
     answer: str
+    citations: Optional[List[Citation]] = None
 
 # Pydantic models for LLM
 class LLMRequest(BaseModel):
@@ -157,15 +229,31 @@ async def health_check():
     groq_key = bool(os.getenv("GROQ_API_KEY"))
     tavily_key = bool(os.getenv("TAVILY_API_KEY"))
     
-    return {
-        "status": "healthy" if all([google_key, groq_key, tavily_key]) else "degraded",
+    # Shared resources started by the lifespan; the worker is unready if a required one failed.
+    # Resources still starting in the background do not make it unhealthy
+    resources = get_resource_manager()
+    if not resources.ready:
+        status = "unavailable"
+    elif all([google_key, groq_key, tavily_key]) and not any(
+        resource["status"] == "failed" for resource in resources.health().values()
+    ):
+        status = "healthy"
+    else:
+        status = "degraded"
+    
+    return JSONResponse(status_code=200 if resources.ready else 503, content={
+        "status": status,
+        "ready": resources.ready,
         "api_keys": {
             "google": google_key,
             "groq": groq_key,
             "tavily": tavily_key
         },
-        "mongodb": mongo_client is not None
-    }
+        "mongodb": get_mongo().connected,
+        "startup_seconds": resources.startup_seconds,
+        "resources": resources.health(),
+        "imports": get_import_stats()
+    })
 
 async def perform_research(topic: str, is_deep: bool):
     """Perform research using the agent architecture"""
@@ -173,7 +261,7 @@ async def perform_research(topic: str, is_deep: bool):
         logger.info(f"Starting research on topic: {topic}, deep: {is_deep}")
         
         # Initialize chief agent
-        chief_agent = ChiefAgent()
+        chief_agent = get_chief_agent()
         
         # Create initial state
         state = {
@@ -188,73 +276,243 @@ async def perform_research(topic: str, is_deep: bool):
         # Execute the research workflow
         final_state = await chief_agent.execute(state)
         
+        # Keep the report server-side so follow-up questions only send its session id
+        session = await get_session_store().create(final_state["report"], kind="research", metadata={"topic": topic})
+        
         # Return result
         return ResearchResult(
             report=final_state["report"],
             sources=[Source(**source) for source in final_state["sources"]],
-            images=final_state["images"]
+            images=final_state["images"],
+            session_id=session.id
         )
         
     except Exception as e:
         logger.error(f"Research error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Research failed: {str(e)}")
 
+def resolve_question_context(request: QuestionRequest) -> str:
+    """Context for a question, from its session or the request body"""
+    if request.session_id:
+        session = get_session_store().get(request.session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Session not found or expired")
+        return session.context
+    if request.context is None:
+        raise HTTPException(status_code=400, detail="Either session_id or context is required")
+    return request.context
+
+async def run_until_disconnected(request: Request, awaitable):
+    """Await a request's work, cancelling it if the client disconnects first"""
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                logger.info("Client disconnected; cancelling its request")
+                raise HTTPException(status_code=499, detail="Client closed the request")
+    finally:
+        if not task.done():
+            task.cancel()
+
 async def answer_question(question: str, context: str):
     """Answer a question using the AI Assistant agent"""
     try:
         logger.info(f"Answering question: {question}")
         
-        # Initialize chief agent
-        chief_agent = ChiefAgent()
-        
-        # Create state for Q&A
-        state = {
-            "question": question,
-            "context": context,
-            "answer": ""
-        }
+        async def generate():
+            # Initialize chief agent
+            chief_agent = get_chief_agent()
+            
+            # Create state for Q&A
+            state = {
+                "question": question,
+                "context": context,
+                "answer": ""
+            }
+            
+            # Execute the Q&A workflow
+            final_state = await chief_agent.execute(state)
+            return {"answer": final_state["answer"], "citations": final_state.get("citations") or None}
         
-        # Execute the Q&A workflow
-        final_state = await chief_agent.execute(state)
+        # Repeated questions against the same context reuse the cached answer
+        result = await get_answer_cache().get_or_compute(context, question, generate)
         
         # Return result
-        return QuestionResult(answer=final_state["answer"])
+        return QuestionResult(**result)
         
     except Exception as e:
         logger.error(f"Q&A error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Q&A failed: {str(e)}")
 
-async def analyze_document(file_base64: str, mime_type: str):
-    """Analyze a document using the Document Analyzer agent"""
+async def check_pdf_pages(pages: Optional[PageRange], mime_type: str, file_base64: Optional[str] = None,
+                          file_path: Optional[str] = None):
+    """Reject (ValueError) a PDF page range that starts past the document's last page"""
+    if pages is None or mime_type != "application/pdf":
+        return
+    if file_path is None:
+        try:
+            source = base64.b64decode(file_base64)
+        except ValueError:
+            # Left to the analyzer, which reports undecodable content
+            return
+    else:
+        source = file_path
+    await asyncio.to_thread(check_page_range, source, pages)
+
+async def analyze_document(file_base64: Optional[str], mime_type: str, file_path: Optional[str] = None,
+                           content_sha256: Optional[str] = None, pages: Optional[PageRange] = None,
+                           llm_limiter: Optional[asyncio.Semaphore] = None):
+    """
+    Analyze a document (base64 content or a file on disk), or a page range of a PDF, using the Document Analyzer agent.
+    llm_limiter caps LLM calls shared with other documents analyzed alongside this one.
+    """
     try:
         logger.info(f"Analyzing document with MIME type: {mime_type}")
         
-        # Initialize chief agent
-        chief_agent = ChiefAgent()
+        # Identical uploads reuse the cached report (and extracted text) by content hash
+        document_cache = get_document_cache()
+        cache_key = None
+        fingerprint = None
+        if document_cache.enabled:
+            if content_sha256 is None:
+                if file_path:
+                    content_sha256 = await get_cpu_executor().run(hash_file, file_path)
+                else:
+                    content_sha256 = await get_cpu_executor().run(hash_base64, file_base64)
+            cache_key = document_key(content_sha256, mime_type, pages)
+            final_state = await asyncio.to_thread(document_cache.get_report, cache_key)
+            if final_state is not None:
+                logger.info("Reusing cached document analysis")
+            elif SIMHASH_MAX_DISTANCE >= 0:
+                # A revised version of an analyzed document reuses that document's report
+                fingerprint = await fingerprint_document(file_base64, mime_type, file_path, content_sha256, pages)
+                match = get_document_index().find(fingerprint) if fingerprint is not None else None
+                if match is not None:
+                    final_state = await asyncio.to_thread(document_cache.get_report, match[0])
+                    if final_state is not None:
+                        logger.info(f"Reusing the analysis of a near-duplicate document ({match[1]} bits apart)")
+                        await asyncio.to_thread(document_cache.put_report, cache_key, final_state)
         
-        # Create state for document analysis
-        state = {
-            "file_base64": file_base64,
-            "mime_type": mime_type,
-            "report": "",
-            "sources": [],
-            "images": []
-        }
+        if cache_key is None or final_state is None:
+            # Initialize chief agent
+            chief_agent = get_chief_agent()
+            
+            # Create state for document analysis
+            state = {
+                "file_base64": file_base64,
+                "file_path": file_path,
+                "content_sha256": content_sha256,
+                "mime_type": mime_type,
+                "pages": pages,
+                "llm_limiter": llm_limiter,
+                "report": "",
+                "sources": [],
+                "images": []
+            }
+            
+            # Execute the document analysis workflow
+            final_state = await chief_agent.execute(state)
+            
+            if cache_key and final_state.get("report_cacheable"):
+                report = {key: final_state[key] for key in ("report", "sources", "images")}
+                await asyncio.to_thread(document_cache.put_report, cache_key, report)
+                if fingerprint is not None:
+                    get_document_index().add(cache_key, fingerprint)
         
-        # Execute the document analysis workflow
-        final_state = await chief_agent.execute(state)
+        session = await get_session_store().create(final_state["report"], kind="document", metadata={"mime_type": mime_type})
         
         # Return result
         return ResearchResult(
             report=final_state["report"],
             sources=final_state["sources"],
-            images=final_state["images"]
+            images=final_state["images"],
+            session_id=session.id
         )
         
+    except CPUExecutorBusyError as e:
+        logger.warning(f"Document analysis rejected: {str(e)}")
+        raise HTTPException(status_code=503, detail="Document analysis is busy; retry shortly", headers={"Retry-After": "5"})
     except Exception as e:
         logger.error(f"Document analysis error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Document analysis failed: {str(e)}")
 
+async def fingerprint_document(file_base64: Optional[str], mime_type: str, file_path: Optional[str],
+                               content_sha256: Optional[str], pages: Optional[PageRange]) -> Optional[int]:
+    """SimHash of a document's text for near-duplicate lookup; None if it is too short or cannot be read"""
+    try:
+        return await get_cpu_executor().run(
+            get_chief_agent().local_document_analyzer.fingerprint, file_base64, mime_type, file_path, content_sha256, pages,
+            name="document fingerprint"
+        )
+    except Exception as e:
+        # Near-duplicate detection is an optimization; the analysis goes ahead without it
+        logger.warning(f"Document fingerprint failed: {str(e)}")
+        return None
+
+def upload_mime_type(upload: SpooledUpload) -> str:
+    """MIME type of an uploaded file: as sent, else guessed from its name"""
+    if upload.content_type and upload.content_type != "application/octet-stream":
+        return upload.content_type
+    guessed, _ = mimetypes.guess_type(upload.filename or "")
+    return guessed or "text/plain"
+
+async def analyze_batch(uploads: List[SpooledUpload], synthesize: bool) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Analyze uploaded documents concurrently, yielding each one's result as it finishes;
+    a document that fails yields an error and the rest carry on. Uploads are removed as they are analyzed.
+    """
+    document_slots = asyncio.Semaphore(DOC_BATCH_CONCURRENCY)
+    llm_limiter = asyncio.Semaphore(DOC_BATCH_LLM_CONCURRENCY)
+
+    async def analyze(index: int, upload: SpooledUpload):
+        async with document_slots:
+            try:
+                result = await analyze_document(
+                    None, upload_mime_type(upload), file_path=upload.path, content_sha256=upload.sha256,
+                    llm_limiter=llm_limiter
+                )
+                return index, result, None
+            except HTTPException as e:
+                return index, None, str(e.detail)
+            finally:
+                upload.cleanup()
+
+    tasks = [asyncio.create_task(analyze(index, upload)) for index, upload in enumerate(uploads)]
+    reports: Dict[int, str] = {}
+    try:
+        for finished in asyncio.as_completed(tasks):
+            index, result, error = await finished
+            filename = uploads[index].filename
+            if error is not None:
+                logger.warning(f"Batch document {index} ({filename}) failed: {error}")
+                yield {"type": "error", "index": index, "filename": filename, "message": error}
+                continue
+            reports[index] = result.report
+            yield {"type": "document", "index": index, "filename": filename, **result.dict()}
+    finally:
+        for task in tasks:
+            task.cancel()
+        for upload in uploads:
+            upload.cleanup()
+
+    if synthesize and len(reports) > 1:
+        try:
+            named_reports = [(uploads[index].filename or f"document {index + 1}", reports[index]) for index in sorted(reports)]
+            synthesis = await get_chief_agent().document_analyzer.synthesize(named_reports, llm_limiter)
+            session = await get_session_store().create(
+                synthesis.get("content", ""), kind="document",
+                metadata={"documents": [name for name, _ in named_reports]}
+            )
+            yield {"type": "synthesis", "report": synthesis.get("content", ""), "provider": synthesis.get("provider"), "session_id": session.id}
+        except Exception as e:
+            logger.error(f"Batch synthesis error: {str(e)}")
+            yield {"type": "error", "index": None, "filename": None, "message": f"Synthesis failed: {str(e)}"}
+
+    yield {"type": "done", "succeeded": len(reports), "failed": len(uploads) - len(reports)}
+
 @app.post("/api/research")
 async def start_research(request: ResearchRequest):
     """Endpoint to start research process"""
@@ -273,7 +531,8 @@ async def ask_question(request: QuestionRequest):
     """Endpoint to ask questions about research context"""
     try:
         logger.info(f"Received question: {request.question}")
-        result = await answer_question(request.question, request.context)
+        context = resolve_question_context(request)
+        result = await answer_question(request.question, context)
         return result
     except HTTPException:
         raise
@@ -281,19 +540,124 @@ async def ask_question(request: QuestionRequest):
         logger.error(f"Unexpected error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Q&A failed: {str(e)}")
 
+@app.post("/api/question/stream")
+async def ask_question_stream(request: QuestionRequest):
+    """Endpoint to stream an answer as server-sent events while it is generated"""
+    logger.info(f"Received streaming question: {request.question}")
+    context = resolve_question_context(request)
+    state = {"question": request.question, "context": context}
+
+    async def events():
+        try:
+            async for event in get_answer_cache().stream(context, request.question, lambda: get_chief_agent().ai_assistant.stream(state)):
+                yield f"data: {json.dumps(event)}\n\n"
+            yield f"data: {json.dumps({'type': 'done'})}\n\n"
+        except Exception as e:
+            logger.error(f"Streaming Q&A error: {str(e)}")
+            yield f"data: {json.dumps({'type': 'error', 'message': f'Q&A failed: {str(e)}'})}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/api/sessions")
+async def create_session(request: SessionRequest):
+    """Endpoint to register a context once for follow-up questions"""
+    session = await get_session_store().create(request.context, kind=request.kind or "research")
+    return SessionResult(session_id=session.id, expires_in=int(get_session_store().ttl_seconds))
+
+@app.delete("/api/sessions/{session_id}")
+async def delete_session(session_id: str):
+    """Endpoint to discard a session before it expires"""
+    if not get_session_store().delete(session_id):
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    return {"deleted": session_id}
+
 @app.post("/api/document-analysis")
-async def document_analysis(request: DocumentAnalysisRequest):
+async def document_analysis(request: DocumentAnalysisRequest, http_request: Request):
     """Endpoint to analyze documents"""
     try:
         logger.info(f"Received document analysis request with MIME type: {request.mime_type}")
-        result = await analyze_document(request.file_base64, request.mime_type)
+        pages = parse_page_range(request.pages) if request.pages else None
+        await check_pdf_pages(pages, request.mime_type, file_base64=request.file_base64)
+        result = await run_until_disconnected(
+            http_request, analyze_document(request.file_base64, request.mime_type, pages=pages)
+        )
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Document analysis failed: {str(e)}")
 
+@app.post("/api/document-analysis/upload")
+async def document_analysis_upload(request: Request):
+    """
+    Endpoint to analyze a document uploaded as multipart/form-data (field "file"), streamed to disk.
+    Optional fields: "mime_type", and "pages" to analyze a PDF page range such as "1-50".
+    """
+    upload = None
+    try:
+        upload = await receive_upload(request)
+        mime_type = upload.fields.get("mime_type") or upload.content_type or "text/plain"
+        logger.info(f"Received document upload {upload.filename} ({upload.size} bytes, {mime_type})")
+        pages = parse_page_range(upload.fields["pages"]) if upload.fields.get("pages") else None
+        await check_pdf_pages(pages, mime_type, file_path=upload.path)
+        result = await run_until_disconnected(
+            request, analyze_document(None, mime_type, file_path=upload.path, content_sha256=upload.sha256, pages=pages)
+        )
+        return result
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except (UploadError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Document analysis failed: {str(e)}")
+    finally:
+        if upload is not None:
+            upload.cleanup()
+
+@app.post("/api/document-analysis/batch")
+async def document_analysis_batch(request: Request):
+    """
+    Endpoint to analyze many documents uploaded together as multipart/form-data (repeated field "files").
+    Set the form field "synthesize" to "true" for a cross-document synthesis at the end.
+    Streams server-sent events: a "document" or "error" event per file as it finishes
+    (with the file's index in the upload), then "synthesis" if requested, then "done".
+    """
+    try:
+        uploads = await receive_uploads(request)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    synthesize = uploads[0].fields.get("synthesize", "").strip().lower() in ("1", "true", "yes", "on")
+    logger.info(f"Received batch of {len(uploads)} documents (synthesis: {synthesize})")
+
+    async def events():
+        async for event in analyze_batch(uploads, synthesize):
+            yield f"data: {json.dumps(event)}\n\n"
+
+    def cleanup():
+        # In case the client went away before the stream started
+        for upload in uploads:
+            upload.cleanup()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(cleanup)
+    )
+
 @app.post("/api/llm/generate")
 async def generate_llm_content_endpoint(request: LLMRequest):
     """Endpoint to generate content using LLM via backend with fallback providers"""
@@ -322,7 +686,9 @@ async def generate_llm_content_endpoint(request: LLMRequest):
 @app.post("/api/logs")
 async def log_activity(activity: ActivityLog):
     """Endpoint to log user activity to MongoDB"""
-    if mongo_client is None or db is None or users_collection is None or activity_collection is None:
+    mongo = get_mongo()
+    users_collection, activity_collection = mongo.users_collection, mongo.activity_collection
+    if users_collection is None or activity_collection is None:
         logger.warning("MongoDB client not initialized")
         return {"message": "MongoDB not connected"}
     
@@ -356,7 +722,8 @@ async def log_activity(activity: ActivityLog):
 @app.get("/api/user-history/{user_id}")
 async def get_user_history(user_id: str):
     """Endpoint to retrieve user activity history from MongoDB"""
-    if mongo_client is None or activity_collection is None:
+    activity_collection = get_mongo().activity_collection
+    if activity_collection is None:
         logger.warning("MongoDB client not initialized")
         raise HTTPException(status_code=500, detail="MongoDB not connected")
     
@@ -378,14 +745,35 @@ async def get_user_history(user_id: str):
 async def research_options():
     return {"message": "API endpoint for research requests"}
 
+@app.get("/api/metrics")
+async def get_metrics():
+    """Endpoint to inspect backend performance counters"""
+    return {
+        "http": http_client.get_metrics(),
+        "search": get_search_registry().stats(),
+        "embeddings": get_embedding_service().get_stats(),
+        "retrieval": dict(get_rag_store().stats),
+        "sessions": get_session_store().get_stats(),
+        "answer_cache": get_answer_cache().get_stats(),
+        "chat_websocket": get_chat_channel_stats(),
+        "cpu_executor": get_cpu_executor().get_stats(),
+        "document_cache": get_document_cache().get_stats(),
+        "mongodb": get_mongo().get_stats(),
+        "near_duplicates": get_document_index().get_stats()
+    }
+
+@app.get("/api/search/providers")
+async def search_provider_stats():
+    """Endpoint to inspect search provider limits and usage"""
+    return get_search_registry().stats()
+
 @app.get("/api/duckduckgo/search")
 async def duckduckgo_search(query: str, max_results: int = 10):
     """Endpoint to search for text results using DuckDuckGo"""
     try:
-        from backend.search.duckduckgo_search import perform_duckduckgo_search
         
-        # Perform DuckDuckGo search
-        result = perform_duckduckgo_search(query)
+        # Perform DuckDuckGo search through the provider registry
+        result = await get_search_registry().search("duckduckgo", query, max_results=max_results)
         
         # Limit results
         limited_results = result.get("results", [])[:max_results]
@@ -400,10 +788,11 @@ async def duckduckgo_search(query: str, max_results: int = 10):
 async def duckduckgo_image_search(query: str, max_results: int = 5):
     """Endpoint to search for images using DuckDuckGo"""
     try:
-        from backend.search.duckduckgo_search import perform_duckduckgo_search
         
-        # Perform DuckDuckGo search
-        result = perform_duckduckgo_search(query)
+        # Perform an image-only DuckDuckGo search through the provider registry
+        result = await get_search_registry().search(
+            "duckduckgo", query, include_text=False, max_images=max_results
+        )
         
         # Return only the images
         return {"images": result.get("images", [])[:max_results]}
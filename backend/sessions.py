@@ -0,0 +1,115 @@
+"""
+Server-side conversation sessions
+
+Research reports and document analyses are registered once and get a
+session id, so follow-up questions carry only the id and the question.
+Contexts are kept zlib-compressed in an LRU cache with a sliding TTL, and
+long ones are chunked and indexed for retrieval as soon as the session is
+created rather than on the first question.
+"""
+import asyncio
+import logging
+import os
+import secrets
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from backend.cache import TTLCache
+from backend.rag import MIN_CONTEXT_TOKENS, document_id, get_rag_store
+
+logger = logging.getLogger(__name__)
+
+SESSION_MAX_ITEMS = int(os.getenv("SESSION_MAX_ITEMS", "500"))
+# Idle sessions expire after this long; each question extends the session
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "3600"))
+
+
+@dataclass
+class Session:
+    """A registered context that follow-up questions refer to by id"""
+    id: str
+    kind: str
+    doc_id: str
+    compressed_context: bytes
+    context_chars: int
+    created_at: float
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def context(self) -> str:
+        return zlib.decompress(self.compressed_context).decode("utf-8")
+
+
+class SessionStore:
+    """LRU + TTL store of compressed session contexts"""
+
+    def __init__(self, max_items: int = SESSION_MAX_ITEMS, ttl_seconds: float = SESSION_TTL_SECONDS):
+        self._cache: TTLCache[Session] = TTLCache(max_items, ttl_seconds)
+        self._tasks = set()
+        self.stats = {"created": 0, "raw_bytes": 0, "compressed_bytes": 0}
+
+    @property
+    def ttl_seconds(self) -> float:
+        return self._cache.ttl_seconds
+
+    async def create(self, context: str, kind: str = "research", metadata: Optional[Dict[str, Any]] = None) -> Session:
+        """Register context and return its session"""
+        raw = context.encode("utf-8")
+        compressed = await asyncio.to_thread(zlib.compress, raw, 6)
+        session = Session(
+            id=secrets.token_urlsafe(16),
+            kind=kind,
+            doc_id=document_id(context),
+            compressed_context=compressed,
+            context_chars=len(context),
+            created_at=time.time(),
+            metadata=dict(metadata or {})
+        )
+        self._cache.set(session.id, session)
+        self.stats["created"] += 1
+        self.stats["raw_bytes"] += len(raw)
+        self.stats["compressed_bytes"] += len(compressed)
+
+        # Chunk and embed in the background so the first question doesn't wait for it
+        task = asyncio.create_task(self._prepare(session, context))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+        logger.info(f"Created {kind} session {session.id} ({len(raw)} bytes, {len(compressed)} compressed)")
+        return session
+
+    async def _prepare(self, session: Session, context: str):
+        store = get_rag_store()
+        try:
+            if await asyncio.to_thread(store.chunker.count_tokens, context) > MIN_CONTEXT_TOKENS:
+                await store.index_text(session.doc_id, context, {"session_id": session.id})
+        except Exception as e:
+            logger.warning(f"Indexing session {session.id} failed; it will be indexed on first use: {str(e)}")
+
+    def get(self, session_id: str) -> Optional[Session]:
+        """Return the session, extending its TTL, or None if it is unknown or expired"""
+        session = self._cache.get(session_id)
+        if session is not None:
+            self._cache.set(session_id, session)
+        return session
+
+    def delete(self, session_id: str) -> bool:
+        return self._cache.pop(session_id) is not None
+
+    def get_stats(self) -> Dict[str, Any]:
+        report = self._cache.get_stats()
+        report.update(self.stats)
+        return report
+
+
+_session_store: Optional[SessionStore] = None
+
+
+def get_session_store() -> SessionStore:
+    """Return the process-wide session store"""
+    global _session_store
+    if _session_store is None:
+        _session_store = SessionStore()
+    return _session_store
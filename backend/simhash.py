@@ -0,0 +1,220 @@
+"""
+Near-duplicate detection with SimHash
+
+A 64-bit SimHash fingerprint summarizes the overlapping word shingles of a
+text; texts that share most of their shingles (a revised upload, the same
+wire story under several URLs) get fingerprints a few bits apart. The
+index splits fingerprints into SIMHASH_MAX_DISTANCE + 1 bands: two
+fingerprints within that Hamming distance agree exactly on at least one
+band, so a lookup probes one bucket per band instead of scanning every
+fingerprint.
+
+Documents are fingerprinted as their text is extracted, piece by piece,
+and the process-wide document index maps fingerprints to document cache
+keys, so a near-duplicate upload can reuse the earlier report. Search
+results are collapsed per query.
+"""
+import hashlib
+import os
+import re
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple, TypeVar
+
+import numpy as np
+
+# Fingerprints at most this many bits apart (of 64) are near-duplicates;
+# 3 corresponds to about 95% similarity, -1 turns detection off
+SIMHASH_MAX_DISTANCE = int(os.getenv("SIMHASH_MAX_DISTANCE", "3"))
+# Documents remembered by the document index; the least recently used are forgotten
+SIMHASH_INDEX_MAX_ITEMS = int(os.getenv("SIMHASH_INDEX_MAX_ITEMS", "10000"))
+
+FINGERPRINT_BITS = 64
+SHINGLE_WORDS = 3
+# Documents with fewer shingles are not fingerprinted: too little text to judge
+MIN_DOCUMENT_SHINGLES = 20
+# Text without any whitespace is cut here rather than carried to the next piece
+MAX_TAIL_CHARS = 4096
+
+WORD = re.compile(r"\w+")
+
+T = TypeVar("T")
+
+
+# Odd multipliers that make a shingle's hash depend on word order, and the splitmix64 finalizer constants
+ORDER_MULTIPLIERS = (np.uint64(0x9E3779B97F4A7C15), np.uint64(0xC2B2AE3D27D4EB4F), np.uint64(0x165667B19E3779F9))
+MIX_MULTIPLIERS = (np.uint64(0xBF58476D1CE4E5B9), np.uint64(0x94D049BB133111EB))
+
+
+def _word_hash(word: str) -> int:
+    return int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _shingle_hashes(word_hashes: np.ndarray) -> np.ndarray:
+    """64-bit hashes of the SHINGLE_WORDS-word shingles, from the words' hashes (arithmetic wraps modulo 2^64)"""
+    count = len(word_hashes) - SHINGLE_WORDS + 1
+    hashes = np.zeros(count, dtype=np.uint64)
+    for offset, multiplier in enumerate(ORDER_MULTIPLIERS[:SHINGLE_WORDS]):
+        hashes ^= word_hashes[offset:offset + count] * multiplier
+    hashes ^= hashes >> np.uint64(30)
+    hashes *= MIX_MULTIPLIERS[0]
+    hashes ^= hashes >> np.uint64(27)
+    hashes *= MIX_MULTIPLIERS[1]
+    hashes ^= hashes >> np.uint64(31)
+    return hashes
+
+
+class SimHashBuilder:
+    """Accumulates the SimHash of text fed in any number of pieces"""
+
+    def __init__(self):
+        # Per bit, how many shingle hashes have it set
+        self._counts = np.zeros(FINGERPRINT_BITS, dtype=np.int64)
+        self.shingles = 0
+        # Hashes of the last words of the previous piece, which start its shingles
+        self._words = np.zeros(0, dtype=np.uint64)
+        self._tail = ""
+        # Each distinct word is hashed once
+        self._word_hashes: Dict[str, int] = {}
+
+    def feed(self, text: str) -> "SimHashBuilder":
+        """Add the next piece of text; a word cut at the end of the piece is completed by the next one"""
+        buffer = self._tail + text if self._tail else text
+        cut = len(buffer)
+        while cut > 0 and not buffer[cut - 1].isspace():
+            cut -= 1
+        if cut == 0 and len(buffer) <= MAX_TAIL_CHARS:
+            self._tail = buffer
+            return self
+        if cut == 0:
+            cut = len(buffer)
+        self._tail = buffer[cut:]
+        self._add_words(WORD.findall(buffer[:cut].lower()))
+        return self
+
+    def _add_words(self, words: List[str]):
+        known = self._word_hashes
+        hashes = np.fromiter(
+            (known[word] if word in known else known.setdefault(word, _word_hash(word)) for word in words),
+            dtype=np.uint64, count=len(words)
+        )
+        hashes = np.concatenate([self._words, hashes])
+        if len(hashes) >= SHINGLE_WORDS:
+            shingles = _shingle_hashes(hashes)
+            bits = np.unpackbits(shingles.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+            self._counts += bits.sum(axis=0, dtype=np.int64)
+            self.shingles += len(shingles)
+            hashes = hashes[len(hashes) - SHINGLE_WORDS + 1:]
+        self._words = hashes
+
+    def finish(self) -> Optional[int]:
+        """The fingerprint, or None for text without any words"""
+        if self._tail:
+            self._add_words(WORD.findall(self._tail.lower()))
+            self._tail = ""
+        if self.shingles == 0 and len(self._words):
+            # Shorter than one shingle: the words themselves are the only shingle
+            self._add_words([""] * (SHINGLE_WORDS - len(self._words)))
+        if self.shingles == 0:
+            return None
+        majority = self._counts * 2 > self.shingles
+        return int(np.packbits(majority, bitorder="little").view("<u8")[0])
+
+
+def simhash(text: str) -> Optional[int]:
+    """Fingerprint of a text held in one string; None if it has no words"""
+    return SimHashBuilder().feed(text).finish()
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class SimHashIndex:
+    """Fingerprints by key, with banded lookup of the nearest one within max_distance bits"""
+
+    def __init__(self, max_distance: int = SIMHASH_MAX_DISTANCE, max_items: Optional[int] = None):
+        self.max_distance = max_distance
+        self.max_items = max_items
+        bands = min(max(max_distance, 0) + 1, FINGERPRINT_BITS)
+        widths = [FINGERPRINT_BITS // bands + (1 if band < FINGERPRINT_BITS % bands else 0) for band in range(bands)]
+        shifts = [sum(widths[:band]) for band in range(bands)]
+        self._bands = [(shift, (1 << width) - 1) for shift, width in zip(shifts, widths)]
+        self._buckets: List[Dict[int, Set[Hashable]]] = [{} for _ in self._bands]
+        self._items: "OrderedDict[Hashable, int]" = OrderedDict()
+        self.stats = {"lookups": 0, "matches": 0, "evicted": 0}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _band_values(self, fingerprint: int) -> List[int]:
+        return [(fingerprint >> shift) & mask for shift, mask in self._bands]
+
+    def add(self, key: Hashable, fingerprint: int):
+        self.remove(key)
+        for buckets, value in zip(self._buckets, self._band_values(fingerprint)):
+            buckets.setdefault(value, set()).add(key)
+        self._items[key] = fingerprint
+        if self.max_items is not None and len(self._items) > self.max_items:
+            oldest = next(iter(self._items))
+            self.remove(oldest)
+            self.stats["evicted"] += 1
+
+    def remove(self, key: Hashable):
+        fingerprint = self._items.pop(key, None)
+        if fingerprint is None:
+            return
+        for buckets, value in zip(self._buckets, self._band_values(fingerprint)):
+            bucket = buckets.get(value)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del buckets[value]
+
+    def find(self, fingerprint: int) -> Optional[Tuple[Hashable, int]]:
+        """The key of the closest fingerprint within max_distance bits, and the distance"""
+        self.stats["lookups"] += 1
+        best: Optional[Tuple[Hashable, int]] = None
+        for buckets, value in zip(self._buckets, self._band_values(fingerprint)):
+            for key in buckets.get(value, ()):
+                distance = hamming_distance(fingerprint, self._items[key])
+                if distance <= self.max_distance and (best is None or distance < best[1]):
+                    best = (key, distance)
+        if best is not None:
+            self.stats["matches"] += 1
+            self._items.move_to_end(best[0])
+        return best
+
+    def get_stats(self) -> Dict[str, Any]:
+        report = dict(self.stats)
+        report["items"] = len(self._items)
+        report["max_items"] = self.max_items
+        report["max_distance"] = self.max_distance
+        return report
+
+
+def collapse_near_duplicates(items: List[T], text: Callable[[T], str],
+                             max_distance: int = SIMHASH_MAX_DISTANCE) -> List[T]:
+    """Keep the first of each group of near-duplicate items, in order; items without words are kept"""
+    if max_distance < 0:
+        return list(items)
+    index = SimHashIndex(max_distance)
+    kept = []
+    for position, item in enumerate(items):
+        fingerprint = simhash(text(item))
+        if fingerprint is not None:
+            if index.find(fingerprint) is not None:
+                continue
+            index.add(position, fingerprint)
+        kept.append(item)
+    return kept
+
+
+_document_index: Optional[SimHashIndex] = None
+
+
+def get_document_index() -> SimHashIndex:
+    """Return the process-wide index of analyzed documents' fingerprints"""
+    global _document_index
+    if _document_index is None:
+        _document_index = SimHashIndex(SIMHASH_MAX_DISTANCE, SIMHASH_INDEX_MAX_ITEMS)
+    return _document_index
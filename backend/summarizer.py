@@ -0,0 +1,104 @@
+"""
+Extractive summarization with LexRank
+
+Sentences become TF-IDF vectors (sublinear term frequency, smoothed IDF,
+L2-normalized rows) in a SciPy sparse matrix X, and are ranked by PageRank
+over their cosine-similarity graph S = X X^T without self-loops
+(continuous LexRank). S is never materialized: each power iteration
+multiplies by X^T and then X, so ranking costs time proportional to the
+number of words rather than to the square of the number of sentences.
+"""
+import re
+from collections import Counter
+from typing import Dict, List, Sequence
+
+import numpy as np
+from scipy import sparse
+
+from backend.text_stats import STOP_WORDS
+
+WORD = re.compile(r"[^\W\d_]{3,}")
+# STOP_WORDS only lists words of four or more letters
+IGNORED_WORDS = STOP_WORDS | {'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'any', 'can', 'had', 'has', 'her', 'his', 'him', 'its', 'our', 'out', 'was', 'who', 'how', 'may', 'she', 'did', 'too', 'also', 'such', 'some', 'more', 'most', 'other', 'only', 'very', 'each', 'them', 'their', 'then', 'your'}
+
+DAMPING = 0.85
+MAX_ITERATIONS = 100
+# Iteration stops once the scores change by less than this (L1 norm)
+TOLERANCE = 1e-6
+
+
+def tfidf_matrix(sentences: Sequence[str]) -> sparse.csr_matrix:
+    """Sentences x vocabulary matrix of L2-normalized TF-IDF weights"""
+    vocabulary: Dict[str, int] = {}
+    indices: List[int] = []
+    counts: List[int] = []
+    indptr = [0]
+    for sentence in sentences:
+        terms = Counter(word for word in WORD.findall(sentence.lower()) if word not in IGNORED_WORDS)
+        for term, count in terms.items():
+            indices.append(vocabulary.setdefault(term, len(vocabulary)))
+            counts.append(count)
+        indptr.append(len(indices))
+
+    matrix = sparse.csr_matrix(
+        (np.array(counts, dtype=np.float64), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int32)),
+        shape=(len(sentences), len(vocabulary))
+    )
+    document_freq = np.bincount(matrix.indices, minlength=len(vocabulary))
+    idf = np.log((1 + len(sentences)) / (1 + document_freq)) + 1.0
+    matrix.data = (1.0 + np.log(matrix.data)) * idf[matrix.indices]
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms) @ matrix
+
+
+def lexrank_scores(matrix: sparse.csr_matrix) -> np.ndarray:
+    """Stationary PageRank scores of the rows' cosine-similarity graph"""
+    count = matrix.shape[0]
+    transposed = matrix.T.tocsr()
+    # Each row's similarity with itself (1, or 0 for a sentence without terms) is left out of the graph
+    self_similarity = np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel()
+    degree = matrix @ (transposed @ np.ones(count)) - self_similarity
+    connected = degree > 1e-12
+    inverse_degree = np.zeros(count)
+    inverse_degree[connected] = 1.0 / degree[connected]
+
+    scores = np.full(count, 1.0 / count)
+    for _ in range(MAX_ITERATIONS):
+        share = scores * inverse_degree
+        spread = matrix @ (transposed @ share) - self_similarity * share
+        # Sentences sharing no term with any other pass their score to all sentences evenly
+        isolated = scores[~connected].sum()
+        updated = (1.0 - DAMPING) / count + DAMPING * (spread + isolated / count)
+        converged = np.abs(updated - scores).sum() < TOLERANCE
+        scores = updated
+        if converged:
+            break
+    return scores
+
+
+def rank_sentences(sentences: Sequence[str]) -> List[int]:
+    """Indices of the sentences from most to least central; repeated sentences are listed once"""
+    if not sentences:
+        return []
+    scores = lexrank_scores(tfidf_matrix(sentences))
+    ranking = []
+    seen = set()
+    for index in np.argsort(-scores, kind="stable"):
+        normalized = " ".join(WORD.findall(sentences[index].lower()))
+        if normalized in seen:
+            continue
+        seen.add(normalized)
+        ranking.append(int(index))
+    return ranking
+
+
+def top_sentences(sentences: Sequence[str], ranking: Sequence[int], count: int) -> List[str]:
+    """The count best-ranked sentences, in document order"""
+    return [sentences[index] for index in sorted(ranking[:count])]
+
+
+def summarize(sentences: Sequence[str], count: int) -> List[str]:
+    """The count most central sentences, in document order"""
+    return top_sentences(sentences, rank_sentences(sentences), count)
@@ -0,0 +1,53 @@
+"""Tests for coalescing in the answer cache"""
+import asyncio
+
+from backend.answer_cache import AnswerCache
+
+
+def test_cancelled_first_caller_does_not_fail_waiters():
+    async def scenario():
+        cache = AnswerCache()
+        release = asyncio.Event()
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return {"answer": "42", "citations": None}
+
+        first = asyncio.create_task(cache.get_or_compute("context", "What is it?", compute))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(cache.get_or_compute("context", "what is it", compute))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await second == {"answer": "42", "citations": None}
+        assert first.cancelled()
+        assert calls == 1
+        assert cache.get("context", "What is it?") == {"answer": "42", "citations": None}
+
+    asyncio.run(scenario())
+
+
+def test_failure_reaches_every_waiter():
+    async def scenario():
+        cache = AnswerCache()
+        release = asyncio.Event()
+
+        async def compute():
+            await release.wait()
+            raise RuntimeError("provider down")
+
+        waiters = [asyncio.create_task(cache.get_or_compute("context", "question", compute)) for _ in range(2)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert cache.get_stats()["inflight"] == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,19 @@
+"""Tests for the on-disk document cache"""
+from backend.document_cache import DocumentCache, document_key
+
+
+def report(size: int):
+    return {"report": "x" * size, "sources": [], "images": []}
+
+
+def test_rewritten_key_grows_size_by_difference(tmp_path):
+    cache = DocumentCache(str(tmp_path))
+    key = document_key("abc", "text/plain")
+
+    cache.put_report(key, report(1000))
+    cache.put_report(key, report(1000))
+    cache.put_report(key, report(200))
+
+    assert cache.get_stats()["bytes"] == cache._scan_size()
+    assert cache.get_report(key) == report(200)
+
@@ -0,0 +1,46 @@
+"""Tests for PDF page ranges"""
+import io
+
+import pytest
+
+from backend.pdf_extraction import check_page_range, parse_page_range
+
+
+def blank_pdf(pages: int) -> bytes:
+    from pypdf import PdfWriter
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=612, height=792)
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+@pytest.mark.parametrize("spec, expected", [("5", (5, 5)), ("1-50", (1, 50)), ("10-", (10, None)), (" 2 - 3 ", (2, 3))])
+def test_parse_page_range(spec, expected):
+    assert parse_page_range(spec) == expected
+
+
+@pytest.mark.parametrize("spec", ["", "a", "0", "5-2", "1-x"])
+def test_parse_page_range_rejects_invalid(spec):
+    with pytest.raises(ValueError):
+        parse_page_range(spec)
+
+
+def test_range_past_last_page_is_rejected():
+    pdf = blank_pdf(3)
+    with pytest.raises(ValueError, match="has 3 pages"):
+        check_page_range(pdf, (4, None))
+    with pytest.raises(ValueError, match="has 3 pages"):
+        check_page_range(pdf, (5, 9))
+
+
+def test_range_within_document_is_accepted():
+    pdf = blank_pdf(3)
+    assert check_page_range(pdf, (3, 3)) == 3
+    # A last page past the end is clamped during extraction, not rejected
+    assert check_page_range(pdf, (1, 50)) == 3
+
+
+def test_unreadable_pdf_is_left_to_extraction():
+    assert check_page_range(b"not a pdf", (2, None)) is None
@@ -0,0 +1,63 @@
+"""Tests for the search provider registry's limits"""
+import asyncio
+import threading
+
+import pytest
+
+from backend.search.registry import SearchProvider, SearchProviderError, SearchProviderRegistry
+
+
+class BlockingProvider(SearchProvider):
+    """A provider whose blocking client call runs until released"""
+
+    name = "blocking"
+    timeout = 0.05
+    max_concurrency = 1
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def _call(self, query: str):
+        self.started.set()
+        self.release.wait(5)
+        return {"answer": query, "results": [], "images": []}
+
+    async def search(self, query: str, **options):
+        return await self.run_blocking(self._call, query)
+
+
+def test_slot_is_held_until_timed_out_thread_finishes():
+    async def scenario():
+        registry = SearchProviderRegistry()
+        provider = registry.register(BlockingProvider())
+
+        with pytest.raises(SearchProviderError, match="timed out"):
+            await registry.search("blocking", "first")
+        semaphore = registry._semaphore(provider)
+        # The call gave up, but its thread is still running and keeps the slot
+        assert semaphore.locked()
+        assert registry.stats()["blocking"]["abandoned_threads"] == 1
+
+        provider.release.set()
+        await asyncio.wait_for(semaphore.acquire(), timeout=5)
+        semaphore.release()
+        assert not registry._draining
+
+    asyncio.run(scenario())
+
+
+def test_slot_is_released_after_a_completed_call():
+    async def scenario():
+        registry = SearchProviderRegistry()
+        provider = registry.register(BlockingProvider())
+        provider.timeout = 5
+        provider.release.set()
+
+        result = await registry.search("blocking", "query")
+
+        assert result["answer"] == "query"
+        assert not registry._semaphore(provider).locked()
+        assert registry.stats()["blocking"]["abandoned_threads"] == 0
+
+    asyncio.run(scenario())
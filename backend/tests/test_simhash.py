@@ -0,0 +1,72 @@
+"""Tests for SimHash fingerprints and the banded index"""
+import random
+
+import pytest
+
+from backend.simhash import (FINGERPRINT_BITS, SIMHASH_MAX_DISTANCE, SimHashBuilder, SimHashIndex,
+                             collapse_near_duplicates, hamming_distance, simhash)
+
+
+def flip_bits(fingerprint: int, count: int, rng: random.Random) -> int:
+    for bit in rng.sample(range(FINGERPRINT_BITS), count):
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+
+@pytest.mark.parametrize("max_distance", [0, 1, SIMHASH_MAX_DISTANCE, 6])
+def test_index_finds_every_fingerprint_within_max_distance(max_distance):
+    rng = random.Random(max_distance)
+    index = SimHashIndex(max_distance)
+    stored = {f"doc{i}": rng.getrandbits(FINGERPRINT_BITS) for i in range(200)}
+    for key, fingerprint in stored.items():
+        index.add(key, fingerprint)
+
+    for key, fingerprint in stored.items():
+        for distance in range(max_distance + 1):
+            match = index.find(flip_bits(fingerprint, distance, rng))
+            assert match is not None
+            # Random 64-bit fingerprints are far apart, so the closest match is the original
+            assert match == (key, distance)
+
+
+def test_index_ignores_fingerprints_beyond_max_distance():
+    rng = random.Random(7)
+    index = SimHashIndex(SIMHASH_MAX_DISTANCE)
+    fingerprint = rng.getrandbits(FINGERPRINT_BITS)
+    index.add("doc", fingerprint)
+
+    assert index.find(flip_bits(fingerprint, SIMHASH_MAX_DISTANCE + 1, rng)) is None
+
+
+def test_index_evicts_least_recently_used():
+    a, b, c = 0, (1 << 32) - 1, ((1 << 32) - 1) << 32
+    index = SimHashIndex(3, max_items=2)
+    index.add("a", a)
+    index.add("b", b)
+    index.find(a)
+    index.add("c", c)
+
+    assert index.find(b) is None
+    assert index.find(a) == ("a", 0)
+    assert index.get_stats()["evicted"] == 1
+    assert len(index) == 2
+
+
+def test_fingerprint_is_independent_of_how_text_is_fed():
+    text = " ".join(f"word{i % 37} term{i % 11}" for i in range(500))
+    builder = SimHashBuilder()
+    for start in range(0, len(text), 17):
+        builder.feed(text[start:start + 17])
+
+    assert builder.finish() == simhash(text)
+
+
+def test_near_duplicate_texts_are_close():
+    words = [f"token{i}" for i in range(400)]
+    original = " ".join(words)
+    revised = " ".join(words[:200] + ["inserted"] + words[200:])
+
+    assert hamming_distance(simhash(original), simhash(revised)) <= SIMHASH_MAX_DISTANCE
+    assert collapse_near_duplicates([original, revised, "something else entirely"], lambda text: text) == [
+        original, "something else entirely"
+    ]
@@ -0,0 +1,236 @@
+"""
+Single-pass text statistics for local document analysis
+
+One scan with a precompiled tokenizer produces everything the local report
+needs: word, sentence and character counts, word frequencies, capitalized
+name n-grams, numbers, emails, sentiment words, the opening sentences and
+the candidate sentences for extractive summarization. Text can be fed in
+pieces, so a document never has to be held as one string, and memory grows
+with the vocabulary rather than with the text: past MAX_SUMMARY_SENTENCES,
+every other candidate is dropped, keeping an even sample of the document.
+"""
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Set
+
+# Alternatives are tried in order at each position: emails and numbers first,
+# so their dots are not taken for sentence ends
+TOKEN_PATTERN = r"""
+    (?P<email>[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})
+  | (?P<number>\d+(?:[.,]\d+)*)
+  | (?P<word>[^\W\d_]+(?:['’][^\W\d_]+)?)
+  | (?P<end>[.!?]+)
+"""
+TOKEN = re.compile(TOKEN_PATTERN, re.VERBOSE)
+
+OPENING_SENTENCES = 5
+MAX_SUMMARY_SENTENCES = 8000
+MAX_NUMBERS = 5
+# Sentences are kept for the report only within these lengths
+MIN_SENTENCE_CHARS = 20
+MAX_SENTENCE_CHARS = 300
+# Text without any whitespace is cut here rather than carried to the next piece
+MAX_TAIL_CHARS = 4096
+
+POSITIVE_WORDS = {'good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic', 'brilliant', 'outstanding', 'superb', 'remarkable', 'positive', 'successful', 'beneficial', 'advantageous', 'favorable', 'promising', 'encouraging', 'impressive', 'valuable', 'effective'}
+NEGATIVE_WORDS = {'bad', 'terrible', 'awful', 'horrible', 'dreadful', 'abysmal', 'poor', 'negative', 'disappointing', 'frustrating', 'problematic', 'difficult', 'challenging', 'concerning', 'worrying', 'troubling', 'unfortunate', 'unfavorable', 'discouraging', 'ineffective'}
+STOP_WORDS = {'that', 'have', 'with', 'this', 'from', 'they', 'will', 'would', 'there', 'what', 'when', 'where', 'which', 'while', 'these', 'those', 'than', 'been', 'were', 'could', 'should', 'might', 'must', 'about', 'into', 'over', 'after', 'before', 'under', 'above', 'below', 'between', 'among', 'through', 'during', 'without', 'within', 'along', 'across', 'behind', 'beyond', 'toward', 'around', 'amongst', 'throughout'}
+COMMON_CAPITALIZED = {'The', 'This', 'That', 'These', 'Those', 'With', 'From', 'They', 'Will', 'Would', 'There', 'What', 'When', 'Where', 'Which', 'While', 'Than', 'Been', 'Were', 'Could', 'Should', 'Might', 'Must', 'About', 'After', 'Before', 'Under'}
+
+
+@dataclass
+class TextStats:
+    """Statistics of one document"""
+    word_count: int = 0
+    char_count: int = 0
+    sentence_count: int = 0
+    # Lowercased words of four or more letters
+    word_freq: Counter = field(default_factory=Counter)
+    # Runs of capitalized words, e.g. "New York Times"
+    names: Counter = field(default_factory=Counter)
+    numbers: List[str] = field(default_factory=list)
+    emails: List[str] = field(default_factory=list)
+    positive_words: Set[str] = field(default_factory=set)
+    negative_words: Set[str] = field(default_factory=set)
+    opening_sentences: List[str] = field(default_factory=list)
+    # Sentences of a reportable length, in document order (an even sample of long documents)
+    sentences: List[str] = field(default_factory=list)
+
+    def top_words(self, count: int, min_freq: int = 2) -> List[tuple]:
+        """Most frequent words that are not stop words"""
+        words = []
+        for word, freq in self.word_freq.most_common(count + len(STOP_WORDS)):
+            if freq < min_freq or len(words) == count:
+                break
+            if word not in STOP_WORDS:
+                words.append((word, freq))
+        return words
+
+    def top_names(self, count: int) -> List[str]:
+        return [name for name, _ in self.names.most_common(count)]
+
+
+class TextStatsBuilder:
+    """Accumulates TextStats over text fed in any number of pieces"""
+
+    def __init__(self):
+        self.stats = TextStats()
+        # Insertion-ordered sets: each email and number is reported once
+        self._emails: Dict[str, None] = {}
+        self._numbers: Dict[str, None] = {}
+        self._tail = ""
+        # Characters since the last token at the end of the previous piece
+        self._trailing_gap = 2
+        # The sentence in progress
+        self._sentence: List[str] = []
+        self._sentence_chars = 0
+        self._sentence_words = 0
+        # Every _sentence_stride-th candidate is kept once there are too many
+        self._sentence_index = 0
+        self._sentence_stride = 1
+        # The capitalized run in progress
+        self._name: List[str] = []
+
+    def feed(self, text: str) -> "TextStatsBuilder":
+        """Scan the next piece of text; a token cut at the end of the piece is completed by the next one"""
+        self.stats.char_count += len(text)
+        buffer = self._tail + text if self._tail else text
+        cut = len(buffer)
+        while cut > 0 and not buffer[cut - 1].isspace():
+            cut -= 1
+        if cut == 0 and len(buffer) <= MAX_TAIL_CHARS:
+            self._tail = buffer
+            return self
+        if cut == 0:
+            cut = len(buffer)
+        self._tail = buffer[cut:]
+        self._scan(buffer[:cut] if cut < len(buffer) else buffer)
+        return self
+
+    def finish(self) -> TextStats:
+        """Scan what is left and return the statistics"""
+        if self._tail:
+            self._scan(self._tail)
+            self._tail = ""
+        self._end_sentence()
+        self._end_name()
+        self.stats.emails = list(self._emails)
+        self.stats.numbers = list(self._numbers)
+        return self.stats
+
+    def _scan(self, text: str):
+        stats = self.stats
+        # Hot loop: module-level lookups are bound to locals
+        word_freq = stats.word_freq
+        positive_words, negative_words = stats.positive_words, stats.negative_words
+        positive, negative = POSITIVE_WORDS, NEGATIVE_WORDS
+        name = self._name
+        last_end = -self._trailing_gap
+        sentence_start = 0
+        words = 0
+
+        for match in TOKEN.finditer(text):
+            kind = match.lastgroup
+            start, end = match.span()
+
+            if kind == "end":
+                stats.word_count += words
+                self._sentence_words += words
+                words = 0
+                self._sentence_text(text, sentence_start, end)
+                sentence_start = end
+                self._end_sentence()
+                self._end_name()
+                last_end = end
+                continue
+
+            token = match.group()
+            words += 1
+
+            if kind == "word":
+                lower = token.lower()
+                if len(lower) >= 4:
+                    word_freq[lower] += 1
+                if lower in positive:
+                    positive_words.add(lower)
+                elif lower in negative:
+                    negative_words.add(lower)
+
+                first = token[0]
+                if "A" <= first <= "Z" and len(token) > 1:
+                    rest = token[1:]
+                    if rest.islower() and rest.isascii():
+                        # A single whitespace character continues a run of capitalized words
+                        if name and not (start - last_end == 1 and (start == 0 or text[start - 1].isspace())):
+                            self._end_name()
+                        name.append(token)
+                    elif name:
+                        self._end_name()
+                elif name:
+                    self._end_name()
+            else:
+                if name:
+                    self._end_name()
+                if kind == "number":
+                    if token not in self._numbers and len(self._numbers) < MAX_NUMBERS:
+                        self._numbers[token] = None
+                else:
+                    self._emails.setdefault(token, None)
+            last_end = end
+
+        stats.word_count += words
+        self._sentence_words += words
+        self._sentence_text(text, sentence_start, len(text))
+        self._trailing_gap = len(text) - last_end
+
+    def _sentence_text(self, text: str, start: int, end: int):
+        """Add text[start:end] to the sentence in progress, keeping only what the report can use"""
+        # One character past the limit is kept to tell an overlong sentence apart
+        room = MAX_SENTENCE_CHARS + 1 - self._sentence_chars
+        if room > 0:
+            self._sentence.append(text[start:min(end, start + room)])
+        self._sentence_chars += end - start
+
+    def _end_sentence(self):
+        if self._sentence_words:
+            stats = self.stats
+            stats.sentence_count += 1
+            wanted_opening = len(stats.opening_sentences) < OPENING_SENTENCES
+            candidate = MIN_SENTENCE_CHARS < self._sentence_chars and self._sentence_chars < MAX_SENTENCE_CHARS + 2
+            if wanted_opening or candidate:
+                sentence = " ".join("".join(self._sentence).split()).rstrip(".!?")
+                if wanted_opening:
+                    if self._sentence_chars > MAX_SENTENCE_CHARS:
+                        # An overlong opening sentence is cut rather than dropped
+                        sentence = sentence[:MAX_SENTENCE_CHARS].rstrip() + "..."
+                    stats.opening_sentences.append(sentence)
+                if candidate and MIN_SENTENCE_CHARS < len(sentence) < MAX_SENTENCE_CHARS:
+                    self._add_candidate(sentence)
+        self._sentence = []
+        self._sentence_chars = 0
+        self._sentence_words = 0
+
+    def _add_candidate(self, sentence: str):
+        if self._sentence_index % self._sentence_stride == 0:
+            sentences = self.stats.sentences
+            sentences.append(sentence)
+            if len(sentences) > MAX_SUMMARY_SENTENCES:
+                # Halve the sample: keep the candidates whose index is a multiple of the doubled stride
+                sentences[:] = sentences[::2]
+                self._sentence_stride *= 2
+        self._sentence_index += 1
+
+    def _end_name(self):
+        if self._name:
+            name = " ".join(self._name)
+            if name not in COMMON_CAPITALIZED and len(name) > 2:
+                self.stats.names[name] += 1
+            # Cleared in place: _scan holds a reference to the list
+            self._name.clear()
+
+
+def compute_text_stats(text: str) -> TextStats:
+    """Statistics of a document held in one string"""
+    return TextStatsBuilder().feed(text).finish()
+
@@ -0,0 +1,216 @@
+"""
+Streaming multipart uploads
+
+Request bodies are parsed incrementally with python-multipart and the file
+parts are written to temporary files chunk by chunk, so an upload is never
+held in memory as a whole (or as base64). Uploads larger than
+UPLOAD_MAX_BYTES are rejected as soon as they cross the limit. The file's
+SHA-256 is computed on the way through, for the document cache. Batch
+requests may carry several file parts under one field name.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from fastapi import Request
+from multipart.multipart import MultipartParser, parse_options_header
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+# Batch uploads: files per request and their combined size
+UPLOAD_BATCH_MAX_FILES = int(os.getenv("UPLOAD_BATCH_MAX_FILES", "50"))
+UPLOAD_BATCH_MAX_BYTES = int(os.getenv("UPLOAD_BATCH_MAX_BYTES", str(200 * 1024 * 1024)))
+# Defaults to the system temporary directory
+UPLOAD_TMP_DIR = os.getenv("UPLOAD_TMP_DIR") or None
+
+# Non-file form fields are small; anything larger is rejected
+MAX_FIELD_BYTES = 64 * 1024
+# Allowance for multipart boundaries and part headers on top of the file size
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadError(Exception):
+    """The request is not a usable multipart upload"""
+    pass
+
+
+class UploadTooLargeError(UploadError):
+    """The upload exceeds UPLOAD_MAX_BYTES"""
+    pass
+
+
+@dataclass
+class SpooledUpload:
+    """An uploaded file spooled to disk, plus the request's other form fields"""
+    path: str
+    filename: Optional[str]
+    content_type: Optional[str]
+    size: int
+    sha256: str
+    fields: Dict[str, str] = field(default_factory=dict)
+
+    def cleanup(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class _UploadParser:
+    """python-multipart callbacks that write up to max_files parts of one file field to disk"""
+
+    def __init__(self, file_field: str, max_bytes: int, max_files: int = 1, max_total_bytes: Optional[int] = None):
+        self.file_field = file_field
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.max_total_bytes = max_total_bytes
+        self.total_size = 0
+        self.files: List[SpooledUpload] = []
+        self.fields: Dict[str, str] = {}
+        self._out = None
+        self._digest = None
+        self._headers: Dict[str, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._name: Optional[str] = None
+        self._is_file = False
+        self._value = bytearray()
+
+    def on_part_begin(self):
+        self._headers = {}
+        self._name = None
+        self._is_file = False
+        self._value = bytearray()
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        self._headers[self._header_field.decode("latin-1").lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, params = parse_options_header(self._headers.get("content-disposition", b""))
+        self._name = params.get(b"name", b"").decode("utf-8", errors="replace")
+        filename = params.get(b"filename")
+        self._is_file = self._name == self.file_field and filename is not None
+        if self._is_file and len(self.files) == self.max_files:
+            if self.max_files == 1:
+                # Single-file uploads ignore any further file parts
+                self._is_file = False
+                return
+            raise UploadError(f"Too many files; at most {self.max_files} per request")
+        if self._is_file:
+            content_type = self._headers.get("content-type")
+            fd, path = tempfile.mkstemp(prefix="upload-", dir=UPLOAD_TMP_DIR)
+            self._out = os.fdopen(fd, "wb")
+            self._digest = hashlib.sha256()
+            self.files.append(SpooledUpload(
+                path=path,
+                filename=filename.decode("utf-8", errors="replace"),
+                content_type=content_type.decode("latin-1") if content_type else None,
+                size=0,
+                sha256=""
+            ))
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if self._is_file:
+            upload = self.files[-1]
+            upload.size += end - start
+            self.total_size += end - start
+            if upload.size > self.max_bytes:
+                raise UploadTooLargeError(f"Upload exceeds the {self.max_bytes} byte limit")
+            if self.max_total_bytes is not None and self.total_size > self.max_total_bytes:
+                raise UploadTooLargeError(f"Uploads exceed the {self.max_total_bytes} byte limit per request")
+            chunk = data[start:end]
+            self._digest.update(chunk)
+            self._out.write(chunk)
+        else:
+            self._value += data[start:end]
+            if len(self._value) > MAX_FIELD_BYTES:
+                raise UploadError(f"Form field '{self._name}' is too large")
+
+    def on_part_end(self):
+        if self._is_file:
+            self.files[-1].sha256 = self._digest.hexdigest()
+            self.close()
+        elif self._name:
+            self.fields[self._name] = self._value.decode("utf-8", errors="replace")
+
+    def close(self):
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+
+    def callbacks(self) -> Dict[str, object]:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end
+        }
+
+
+async def _receive(request: Request, file_field: str, max_bytes: int, max_files: int,
+                   max_total_bytes: Optional[int]) -> _UploadParser:
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise UploadError("Expected a multipart/form-data request")
+
+    limit = max_total_bytes if max_total_bytes is not None else max_bytes
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > limit + max_files * MULTIPART_OVERHEAD_BYTES:
+        raise UploadTooLargeError(f"Upload exceeds the {limit} byte limit")
+
+    handler = _UploadParser(file_field, max_bytes, max_files, max_total_bytes)
+    try:
+        parser = MultipartParser(params[b"boundary"], handler.callbacks())
+        async for chunk in request.stream():
+            parser.write(chunk)
+        parser.finalize()
+        if not handler.files:
+            raise UploadError(f"Missing file field '{file_field}'")
+    except BaseException as e:
+        handler.close()
+        for upload in handler.files:
+            upload.cleanup()
+        if isinstance(e, ValueError):
+            # python-multipart parse errors
+            raise UploadError(f"Malformed multipart body: {str(e)}")
+        raise
+    finally:
+        handler.close()
+
+    for upload in handler.files:
+        upload.fields = handler.fields
+        logger.info(f"Spooled upload {upload.filename} ({upload.size} bytes) to {upload.path}")
+    return handler
+
+
+async def receive_upload(request: Request, file_field: str = "file", max_bytes: int = UPLOAD_MAX_BYTES) -> SpooledUpload:
+    """Stream a multipart/form-data request body to a temporary file; the caller must cleanup()"""
+    handler = await _receive(request, file_field, max_bytes, 1, None)
+    return handler.files[0]
+
+
+async def receive_uploads(request: Request, file_field: str = "files", max_files: int = UPLOAD_BATCH_MAX_FILES,
+                          max_bytes: int = UPLOAD_MAX_BYTES,
+                          max_total_bytes: int = UPLOAD_BATCH_MAX_BYTES) -> List[SpooledUpload]:
+    """
+    Stream every file part named file_field to its own temporary file, in
+    request order; each upload carries the request's other form fields.
+    The caller must cleanup() every upload.
+    """
+    handler = await _receive(request, file_field, max_bytes, max_files, max_total_bytes)
+    return handler.files
@@ -0,0 +1,321 @@
+"""
+Vector indexes for the JARVIS retrieval layer
+
+Two interchangeable backends sit behind the VectorIndex interface:
+
+- NumpyIndex: exact cosine search as one vectorized matrix multiply plus a
+  partial sort. Fastest for the few hundred to tens of thousands of chunks a
+  research session or document produces.
+- HNSWIndex: approximate search over a hierarchical navigable small world
+  graph (hnswlib). Sub-linear query time for shared corpora of millions of
+  chunks.
+
+AutoIndex starts exact and migrates to HNSW once it grows past
+VECTOR_INDEX_HNSW_THRESHOLD vectors, so callers never pick a backend.
+All vectors are expected to be L2-normalized; scores are cosine similarity.
+
+NumpyIndex can store vectors as float16 (half the memory) or int8 with a
+per-vector scale (a quarter). Quantized indexes optionally keep float32
+copies in an unlinked temporary file and re-rank the top candidates
+against them, which restores float32 recall without holding them in RAM.
+"""
+import logging
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Collections larger than this switch from exact to approximate search
+HNSW_THRESHOLD = int(os.getenv("VECTOR_INDEX_HNSW_THRESHOLD", "50000"))
+
+# HNSW graph parameters (see the hnswlib documentation)
+HNSW_M = int(os.getenv("VECTOR_INDEX_HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("VECTOR_INDEX_HNSW_EF_CONSTRUCTION", "200"))
+HNSW_EF_SEARCH = int(os.getenv("VECTOR_INDEX_HNSW_EF_SEARCH", "64"))
+
+# Storage precision for exact indexes: float32, float16 or int8
+VECTOR_INDEX_DTYPE = os.getenv("VECTOR_INDEX_DTYPE", "float32")
+# Quantized indexes re-rank k * factor candidates at full precision; 0 disables
+VECTOR_INDEX_RERANK_FACTOR = int(os.getenv("VECTOR_INDEX_RERANK_FACTOR", "4"))
+
+STORAGE_DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+
+# Quantized rows are widened to float32 this many at a time while scoring;
+# small blocks stay in cache
+SCORE_BLOCK_ROWS = 2048
+
+SearchResult = List[Tuple[str, float]]
+
+
+class VectorIndex(ABC):
+    """Base class for cosine-similarity vector indexes keyed by string ids"""
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+
+    @abstractmethod
+    def add(self, ids: Sequence[str], vectors: np.ndarray):
+        """Add vectors (n, dimension) under the given ids"""
+        pass
+
+    @abstractmethod
+    def search(self, queries: np.ndarray, k: int) -> List[SearchResult]:
+        """Return the top-k (id, score) pairs, best first, for each query row"""
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    @abstractmethod
+    def memory_bytes(self) -> int:
+        """Approximate memory held by the index"""
+        pass
+
+    def _as_matrix(self, vectors: np.ndarray) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        if matrix.shape[1] != self.dimension:
+            raise ValueError(f"Expected vectors of dimension {self.dimension}, got {matrix.shape[1]}")
+        return matrix
+
+
+class _DiskVectors:
+    """Append-only float32 rows in an unlinked temporary file, read through a memmap"""
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+        self._file = tempfile.TemporaryFile(prefix="vectors-")
+        self._count = 0
+        self._view = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, matrix: np.ndarray):
+        self._file.seek(0, os.SEEK_END)
+        self._file.write(np.ascontiguousarray(matrix, dtype=np.float32).tobytes())
+        self._file.flush()
+        self._count += len(matrix)
+        self._view = None
+
+    def rows(self, indices=slice(None)) -> np.ndarray:
+        if self._count == 0:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        if self._view is None:
+            self._view = np.memmap(self._file, dtype=np.float32, mode="r", shape=(self._count, self.dimension))
+        return np.array(self._view[indices])
+
+
+class NumpyIndex(VectorIndex):
+    """Exact brute-force search with a single matrix multiply per query batch"""
+
+    def __init__(self, dimension: int, capacity: int = 1024, dtype: str = VECTOR_INDEX_DTYPE,
+                 rerank_factor: int = VECTOR_INDEX_RERANK_FACTOR):
+        super().__init__(dimension)
+        if dtype not in STORAGE_DTYPES:
+            raise ValueError(f"Unsupported vector storage dtype: {dtype}")
+        self.dtype = dtype
+        self.rerank_factor = rerank_factor if dtype != "float32" else 0
+        self._vectors = np.zeros((capacity, dimension), dtype=STORAGE_DTYPES[dtype])
+        # int8 rows are stored as round(v / scale) with one scale per row
+        self._scales = np.zeros(capacity, dtype=np.float32) if dtype == "int8" else None
+        self._full = _DiskVectors(dimension) if self.rerank_factor > 0 else None
+        self._ids: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _quantize(self, matrix: np.ndarray):
+        if self.dtype == "int8":
+            scales = np.abs(matrix).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            return np.round(matrix / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+        return matrix.astype(self._vectors.dtype), None
+
+    def add(self, ids: Sequence[str], vectors: np.ndarray):
+        matrix = self._as_matrix(vectors)
+        needed = len(self._ids) + len(matrix)
+        if needed > len(self._vectors):
+            # Grow geometrically so appends stay amortized O(1)
+            size = max(needed, 2 * len(self._vectors))
+            grown = np.zeros((size, self.dimension), dtype=self._vectors.dtype)
+            grown[:len(self._ids)] = self._vectors[:len(self._ids)]
+            self._vectors = grown
+            if self._scales is not None:
+                scales = np.zeros(size, dtype=np.float32)
+                scales[:len(self._ids)] = self._scales[:len(self._ids)]
+                self._scales = scales
+        codes, scales = self._quantize(matrix)
+        self._vectors[len(self._ids):needed] = codes
+        if scales is not None:
+            self._scales[len(self._ids):needed] = scales
+        if self._full is not None:
+            self._full.append(matrix)
+        self._ids.extend(ids)
+
+    def vectors(self) -> np.ndarray:
+        """Stored vectors as float32, in insertion order"""
+        count = len(self._ids)
+        if self.dtype == "float32":
+            return self._vectors[:count]
+        if self._full is not None:
+            return self._full.rows()
+        matrix = self._vectors[:count].astype(np.float32)
+        if self._scales is not None:
+            matrix *= self._scales[:count, None]
+        return matrix
+
+    def _scores(self, queries: np.ndarray, count: int) -> np.ndarray:
+        if self.dtype == "float32":
+            return queries @ self._vectors[:count].T
+        # NumPy has no BLAS kernels for float16/int8, so widen a block at a time
+        scores = np.empty((len(queries), count), dtype=np.float32)
+        for start in range(0, count, SCORE_BLOCK_ROWS):
+            end = min(start + SCORE_BLOCK_ROWS, count)
+            block = queries @ self._vectors[start:end].astype(np.float32).T
+            if self._scales is not None:
+                block *= self._scales[start:end]
+            scores[:, start:end] = block
+        return scores
+
+    def search(self, queries: np.ndarray, k: int) -> List[SearchResult]:
+        queries = self._as_matrix(queries)
+        count = len(self._ids)
+        if count == 0:
+            return [[] for _ in range(len(queries))]
+
+        k = min(k, count)
+        candidates_per_query = min(count, k * self.rerank_factor) if self._full is not None else k
+        scores = self._scores(queries, count)
+        # argpartition finds the top-k in O(n); only those k are sorted
+        top = np.argpartition(-scores, candidates_per_query - 1, axis=1)[:, :candidates_per_query]
+        results = []
+        for row, candidates in enumerate(top):
+            if self._full is not None:
+                candidates = np.sort(candidates)
+                row_scores = self._full.rows(candidates) @ queries[row]
+            else:
+                row_scores = scores[row, candidates]
+            ordered = np.argsort(-row_scores)[:k]
+            results.append([(self._ids[candidates[i]], float(row_scores[i])) for i in ordered])
+        return results
+
+    def memory_bytes(self) -> int:
+        # Full-precision re-rank copies live on disk and are not counted
+        return self._vectors.nbytes + (self._scales.nbytes if self._scales is not None else 0)
+
+
+class HNSWIndex(VectorIndex):
+    """Approximate nearest-neighbour search backed by hnswlib (float32 storage only)"""
+
+    def __init__(self, dimension: int, capacity: int = 10000, m: int = HNSW_M,
+                 ef_construction: int = HNSW_EF_CONSTRUCTION, ef_search: int = HNSW_EF_SEARCH):
+        super().__init__(dimension)
+        import hnswlib
+        self.m = m
+        self.ef_search = ef_search
+        self._index = hnswlib.Index(space="ip", dim=dimension)
+        self._index.init_index(max_elements=capacity, ef_construction=ef_construction, M=m)
+        self._index.set_ef(ef_search)
+        self._ids: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, ids: Sequence[str], vectors: np.ndarray):
+        matrix = self._as_matrix(vectors)
+        needed = len(self._ids) + len(matrix)
+        if needed > self._index.get_max_elements():
+            self._index.resize_index(max(needed, 2 * self._index.get_max_elements()))
+        labels = np.arange(len(self._ids), needed)
+        self._index.add_items(matrix, labels)
+        self._ids.extend(ids)
+
+    def search(self, queries: np.ndarray, k: int) -> List[SearchResult]:
+        queries = self._as_matrix(queries)
+        if not self._ids:
+            return [[] for _ in range(len(queries))]
+
+        k = min(k, len(self._ids))
+        # ef must be at least k for hnswlib to return k results
+        self._index.set_ef(max(self.ef_search, k))
+        labels, distances = self._index.knn_query(queries, k=k)
+        # The inner-product space reports 1 - similarity as the distance
+        return [
+            [(self._ids[label], 1.0 - float(distance)) for label, distance in zip(row_labels, row_distances)]
+            for row_labels, row_distances in zip(labels, distances)
+        ]
+
+    def memory_bytes(self) -> int:
+        # Vector data plus two layers' worth of neighbour links and labels per element
+        per_element = self.dimension * 4 + self.m * 2 * 4 + self.m * 4 + 16
+        return self._index.get_max_elements() * per_element
+
+
+def hnsw_available() -> bool:
+    try:
+        import hnswlib  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class AutoIndex(VectorIndex):
+    """Exact search for small collections, migrating to HNSW past a size threshold"""
+
+    def __init__(self, dimension: int, threshold: int = HNSW_THRESHOLD, dtype: str = VECTOR_INDEX_DTYPE):
+        super().__init__(dimension)
+        self.threshold = threshold
+        self._backend: VectorIndex = NumpyIndex(dimension, dtype=dtype)
+
+    @property
+    def backend_name(self) -> str:
+        return type(self._backend).__name__
+
+    def __len__(self) -> int:
+        return len(self._backend)
+
+    def add(self, ids: Sequence[str], vectors: np.ndarray):
+        self._backend.add(ids, vectors)
+        if isinstance(self._backend, NumpyIndex) and len(self._backend) > self.threshold:
+            self._migrate()
+
+    def _migrate(self):
+        if not hnsw_available():
+            logger.warning("hnswlib not installed; keeping exact search for a large collection")
+            self.threshold = float("inf")
+            return
+        exact = self._backend
+        logger.info(f"Migrating vector index with {len(exact)} vectors to HNSW")
+        approximate = HNSWIndex(self.dimension, capacity=2 * len(exact))
+        approximate.add(exact._ids, exact.vectors())
+        self._backend = approximate
+
+    def search(self, queries: np.ndarray, k: int) -> List[SearchResult]:
+        return self._backend.search(queries, k)
+
+    def memory_bytes(self) -> int:
+        return self._backend.memory_bytes()
+
+
+def create_index(dimension: int, expected_size: Optional[int] = None) -> VectorIndex:
+    """Pick an index backend for a collection of the expected size"""
+    if expected_size is not None and expected_size > HNSW_THRESHOLD and hnsw_available():
+        return HNSWIndex(dimension, capacity=expected_size)
+    return AutoIndex(dimension)
+
+
+def merge_results(result_lists: List[SearchResult], k: int) -> SearchResult:
+    """Merge per-collection results into one top-k list"""
+    merged: Dict[str, float] = {}
+    for results in result_lists:
+        for item_id, score in results:
+            if score > merged.get(item_id, float("-inf")):
+                merged[item_id] = score
+    return sorted(merged.items(), key=lambda item: item[1], reverse=True)[:k]
@@ -0,0 +1,116 @@
+"""
+Benchmark PDF text extraction.
+
+Compares the previous approach (one pdfplumber pass over every page in the
+calling thread, concatenating with +=) with page-parallel extraction in the
+process pool, for each worker count. Test PDFs of the requested page counts
+are generated with text-only pages so the benchmark needs no fixtures.
+
+Usage:
+    python benchmark_pdf_extraction.py
+    python benchmark_pdf_extraction.py --pages 10 100 1000 --workers 1 2 4 --lines 40
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '.'))
+
+from backend import pdf_extraction
+
+WORDS = ("market research analysis revenue growth customer segment strategy quarter forecast "
+         "product pricing channel competitor survey adoption retention margin operations").split()
+
+
+def make_pdf(pages: int, lines: int) -> bytes:
+    """A text-only PDF with `lines` lines of Helvetica text on every page"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    ]
+    kids = []
+    for page in range(pages):
+        rows = []
+        for line in range(lines):
+            words = " ".join(WORDS[(page * 7 + line * 3 + i) % len(WORDS)] for i in range(10))
+            rows.append(f"BT /F1 10 Tf 50 {780 - line * 18} Td (Page {page + 1} line {line + 1}: {words}) Tj ET")
+        content = "\n".join(rows).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (len(objects)))
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{kid} 0 R" for kid in kids).encode(), pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def sequential_baseline(path: str) -> str:
+    """The previous implementation: every page in the calling thread, quadratic concatenation"""
+    import pdfplumber
+    with pdfplumber.open(path) as pdf:
+        text = ""
+        for page in pdf.pages:
+            page_text = page.extract_text()
+            if page_text:
+                text += page_text + "\n"
+        return text
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def run(pages: int, lines: int, worker_counts):
+    print(f"\n=== {pages:,} pages x {lines} lines ===")
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    with os.fdopen(fd, "wb") as out:
+        out.write(make_pdf(pages, lines))
+
+    try:
+        expected, baseline_s = timed(sequential_baseline, path)
+        print(f"{'method':<28} {'seconds':>9} {'speedup':>9}")
+        print(f"{'sequential (previous)':<28} {baseline_s:>9.2f} {1.0:>9.2f}")
+
+        for workers in worker_counts:
+            pdf_extraction.shutdown_pool()
+            pdf_extraction.PDF_EXTRACT_WORKERS = workers
+            if workers > 1:
+                # Start the worker processes outside the timed run, as a running server would have them
+                pdf_extraction.extract_pdf_text(path)
+            text, elapsed = timed(pdf_extraction.extract_pdf_text, path)
+            if text != expected:
+                print(f"  warning: output with {workers} workers differs from the sequential text")
+            print(f"{f'page-parallel, {workers} workers':<28} {elapsed:>9.2f} {baseline_s / elapsed:>9.2f}")
+    finally:
+        os.unlink(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--lines", type=int, default=40, help="lines of text per page")
+    args = parser.parse_args()
+
+    print(f"CPUs available: {os.cpu_count()}")
+    for pages in args.pages:
+        run(pages, args.lines, args.workers)
+    pdf_extraction.shutdown_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark quantized vector storage against float32.
+
+For each storage precision (with and without full-precision re-ranking),
+reports memory per million vectors, recall@k against float32 exact search
+and query latency (p50/p95).
+
+Usage:
+    python benchmark_quantization.py
+    python benchmark_quantization.py --sizes 100000 --dim 384 --queries 200 --k 10 --rerank-factor 4
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '.'))
+
+from backend.vector_index import NumpyIndex
+from benchmark_vector_index import make_vectors, recall_at_k, time_queries
+
+
+def build(ids, vectors, **kwargs):
+    start = time.perf_counter()
+    index = NumpyIndex(vectors.shape[1], capacity=len(ids), **kwargs)
+    for offset in range(0, len(ids), 50000):
+        index.add(ids[offset:offset + 50000], vectors[offset:offset + 50000])
+    return index, time.perf_counter() - start
+
+
+def run(size: int, dim: int, num_queries: int, k: int, rerank_factor: int, rng: np.random.Generator):
+    print(f"\n=== {size:,} vectors x {dim} dims ===")
+    vectors = make_vectors(size, dim, rng)
+    queries = make_vectors(num_queries, dim, rng)
+    ids = [str(i) for i in range(size)]
+
+    configs = [
+        ("float32", "float32", 0),
+        ("float16", "float16", 0),
+        ("float16+rr", "float16", rerank_factor),
+        ("int8", "int8", 0),
+        ("int8+rr", "int8", rerank_factor),
+    ]
+    print(f"{'storage':<11} {'build s':>9} {'MB / 1M':>9} {'recall@' + str(k):>10} {'p50 ms':>9} {'p95 ms':>9}")
+    truth = None
+    for label, dtype, factor in configs:
+        index, build_s = build(ids, vectors, dtype=dtype, rerank_factor=factor)
+        results, p50, p95 = time_queries(index, queries, k)
+        if truth is None:
+            truth = results
+        per_million = index.memory_bytes() / size * 1_000_000 / 2**20
+        print(f"{label:<11} {build_s:>9.2f} {per_million:>9.0f} {recall_at_k(truth, results, k):>10.3f} "
+              f"{p50:>9.2f} {p95:>9.2f}")
+        del index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--dim", type=int, default=384, help="embedding dimension (all-MiniLM-L6-v2 uses 384)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rerank-factor", type=int, default=4, help="candidates re-ranked per result at float32")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    for size in args.sizes:
+        run(size, args.dim, args.queries, args.k, args.rerank_factor, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Benchmark worker cold start.
+
+Every measurement runs in a fresh interpreter, as a new worker would:
+
+- import time of backend.server and of each backend module it pulls in
+  (cumulative, from python -X importtime),
+- import time of the heavy optional modules the backend loads lazily on
+  first use, and
+- time until the lifespan has started the shared resources, with each
+  resource's own startup time; resources started in the background are
+  listed with the time they took to finish.
+
+Usage:
+    python benchmark_startup.py
+    python benchmark_startup.py --repeat 5 --skip-startup
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, Optional
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Imported through backend.lifecycle.lazy_import() when first needed
+OPTIONAL_MODULES = [
+    "authlib.integrations.starlette_client",
+    "ddgs",
+    "docx",
+    "huggingface_hub",
+    "pdfplumber",
+    "pymongo",
+    "sentence_transformers",
+]
+
+# Run in a fresh interpreter: enter the app's lifespan, wait for background resources, report
+STARTUP_SCRIPT = """
+import asyncio, json, time
+started = time.perf_counter()
+from backend.server import app
+imported = time.perf_counter() - started
+
+async def main():
+    from backend.lifecycle import get_resource_manager
+    resources = get_resource_manager()
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter() - started
+        for name in list(resources.health()):
+            try:
+                await resources.wait(name)
+            except Exception:
+                pass
+        report = resources.health()
+    print(json.dumps({"import": imported, "ready": ready, "resources": report,
+                      "background": [name for name in report if resources.get(name).background]}))
+
+asyncio.run(main())
+"""
+
+
+def run(args, timeout: float = 600) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable] + args, cwd=ROOT, capture_output=True, text=True, timeout=timeout,
+                          env=dict(os.environ, PYTHONPATH=ROOT))
+
+
+def import_times(module: str) -> Optional[Dict[str, float]]:
+    """Cumulative import seconds of every module imported by `import module`, or None if it fails"""
+    result = run(["-X", "importtime", "-c", f"import {module}"])
+    if result.returncode != 0:
+        return None
+    times: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = [part.strip() for part in line.split(":", 1)[1].split("|")]
+        if cumulative.isdigit():
+            times[name] = int(cumulative) / 1e6
+    return times
+
+
+def best_import_times(module: str, repeat: int) -> Optional[Dict[str, float]]:
+    best: Optional[Dict[str, float]] = None
+    for _ in range(repeat):
+        times = import_times(module)
+        if times is None:
+            return None
+        if best is None or times.get(module, 0) < best.get(module, 0):
+            best = times
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per measurement (best is kept)")
+    parser.add_argument("--top", type=int, default=15, help="backend modules listed")
+    parser.add_argument("--skip-startup", action="store_true", help="only measure imports")
+    args = parser.parse_args()
+
+    server = best_import_times("backend.server", args.repeat)
+    if server is None:
+        print("backend.server failed to import:")
+        print(run(["-c", "import backend.server"]).stderr.strip().splitlines()[-1])
+        return
+    print(f"import backend.server: {server['backend.server']:.3f}s")
+    backend = sorted(((seconds, name) for name, seconds in server.items()
+                      if name.startswith("backend.") and name != "backend.server"), reverse=True)
+    print(f"\n{'backend module (cumulative)':<44} {'seconds':>8}")
+    for seconds, name in backend[:args.top]:
+        print(f"{name:<44} {seconds:>8.3f}")
+
+    print(f"\n{'optional module':<44} {'seconds':>8} {'at import':>10}")
+    for module in OPTIONAL_MODULES:
+        times = best_import_times(module, args.repeat)
+        seconds = "missing" if times is None else f"{times.get(module, 0):.3f}"
+        # An optional module imported by backend.server itself is on the cold start path
+        eager = "yes" if module in server else "no"
+        print(f"{module:<44} {seconds:>8} {eager:>10}")
+
+    if args.skip_startup:
+        return
+    reports = []
+    for _ in range(args.repeat):
+        result = run(["-c", STARTUP_SCRIPT])
+        if result.returncode != 0:
+            print("\nLifespan startup failed:")
+            print(result.stderr.strip().splitlines()[-1])
+            return
+        reports.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    report = min(reports, key=lambda item: item["ready"])
+    print(f"\nimport {report['import']:.3f}s, ready to serve after {report['ready']:.3f}s")
+    print(f"{'resource':<26} {'status':<10} {'seconds':>8}")
+    for name, resource in report["resources"].items():
+        seconds = resource["startup_seconds"]
+        label = f"{name} (background)" if name in report["background"] else name
+        print(f"{label:<26} {resource['status']:<10} {'-' if seconds is None else f'{seconds:.3f}':>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Benchmark the local analyzer's extractive summarizer.
+
+Times the single-pass text statistics (which collect the candidate
+sentences) and LexRank over them for synthetic documents of growing word
+counts. The ranking target is well under a second for 100k words on one
+CPU core.
+
+Usage:
+    python benchmark_summarizer.py
+    python benchmark_summarizer.py --words 10000 100000 1000000 --repeat 3
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '.'))
+
+from backend.summarizer import rank_sentences
+from backend.text_stats import compute_text_stats
+from benchmark_text_stats import make_text
+
+# make_text() averages about seven bytes per word
+BYTES_PER_WORD = 7
+
+
+def best_time(function, argument, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(argument)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'words':>10} {'sentences':>10} {'ranked':>8} {'stats s':>9} {'lexrank s':>10}")
+    for words in args.words:
+        text = make_text(words * BYTES_PER_WORD)
+        stats, stats_s = best_time(compute_text_stats, text, args.repeat)
+        _, rank_s = best_time(rank_sentences, stats.sentences, args.repeat)
+        print(f"{stats.word_count:>10,} {stats.sentence_count:>10,} {len(stats.sentences):>8,} {stats_s:>9.3f} {rank_s:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark the local analyzer's text statistics.
+
+Compares the previous multi-pass statistics (text cleaning, three sentence
+splits, two word-frequency counts and separate entity regexes) with the
+single-pass engine in backend/text_stats.py on synthetic documents of
+growing size. Throughput (MB/s) that stays flat as the size grows shows
+linear scaling.
+
+Usage:
+    python benchmark_text_stats.py
+    python benchmark_text_stats.py --sizes-mb 1 2 4 8 16 --repeat 3
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '.'))
+
+from backend.text_stats import compute_text_stats
+
+VOCABULARY = ("market research analysis revenue growth customer segment strategy quarter forecast product "
+              "pricing channel competitor survey adoption retention margin operations important significant "
+              "promising difficult the and of to in for with on by from").split()
+NAMES = ["Acme Corporation", "New York", "Jane Smith", "European Union", "NASA", "Q3"]
+
+
+def make_text(size_bytes: int, seed: int = 7) -> str:
+    """Sentences of 8-25 words with occasional names, figures and emails"""
+    rng = random.Random(seed)
+    sentences = []
+    total = 0
+    while total < size_bytes:
+        words = [rng.choice(VOCABULARY) for _ in range(rng.randint(8, 25))]
+        if rng.random() < 0.3:
+            words.insert(rng.randint(0, len(words)), rng.choice(NAMES))
+        if rng.random() < 0.2:
+            words.append(f"{rng.randint(1, 999)}.{rng.randint(0, 9)}%")
+        if rng.random() < 0.01:
+            words.append(f"contact{rng.randint(1, 50)}@example.com")
+        sentence = " ".join(words).capitalize() + rng.choice([". ", ". ", "! ", "? ", ".\n"])
+        sentences.append(sentence)
+        total += len(sentence)
+    return "".join(sentences)
+
+
+def multi_pass_baseline(text: str):
+    """The previous _generate_local_analysis statistics, pass for pass"""
+    cleaned = re.sub(r'\s+', ' ', text)
+    cleaned = re.sub(r'[^\w\s.,!?;:-]', ' ', cleaned).strip()
+    word_count = len(cleaned.split())
+    sentence_count = len(re.split(r'[.!?]+', cleaned))
+    key_points = [s.strip() for s in re.split(r'[.!?]+', cleaned)
+                  if 20 < len(s.strip()) < 300 and (re.search(r'\d+', s) or len(re.findall(r'\b[A-Z]{2,}\b', s)) > 1)]
+    names = re.findall(r'\b[A-Z][a-z]+(?:\s[A-Z][a-z]+)*\b', cleaned)
+    numbers = re.findall(r'\b\d+(?:\.\d+)?\b', cleaned)
+    emails = re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', cleaned)
+    for _ in range(2):
+        word_freq = {}
+        for word in re.findall(r'\b[a-zA-Z]{4,}\b', cleaned.lower()):
+            word_freq[word] = word_freq.get(word, 0) + 1
+    sentiment_words = set(cleaned.lower().split())
+    opening = re.split(r'[.!?]+', cleaned)[:5]
+    return word_count, sentence_count, key_points, names, numbers, emails, word_freq, sentiment_words, opening
+
+
+def best_time(function, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'size':>8} {'multi-pass s':>13} {'MB/s':>7} {'single-pass s':>14} {'MB/s':>7} {'speedup':>8}")
+    for size_mb in args.sizes_mb:
+        text = make_text(int(size_mb * 1024 * 1024))
+        baseline = best_time(multi_pass_baseline, text, args.repeat)
+        single = best_time(compute_text_stats, text, args.repeat)
+        print(f"{size_mb:>6.1f}MB {baseline:>13.3f} {size_mb / baseline:>7.2f} {single:>14.3f} {size_mb / single:>7.2f} {baseline / single:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
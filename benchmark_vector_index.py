@@ -0,0 +1,111 @@
+"""
+Benchmark the vector index backends used by the retrieval layer.
+
+Reports build time, recall@k against exact search, query latency (p50/p95)
+and memory for the exact NumPy index and the HNSW index at each size.
+
+Usage:
+    python benchmark_vector_index.py
+    python benchmark_vector_index.py --sizes 10000 100000 --dim 384 --queries 200 --k 10
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '.'))
+
+from backend.vector_index import HNSWIndex, NumpyIndex, hnsw_available
+
+
+def make_vectors(count: int, dim: int, rng: np.random.Generator, latent_dim: int = 24) -> np.ndarray:
+    """
+    Unit vectors with low intrinsic dimension, closer to real sentence
+    embeddings than isotropic noise (which makes every neighbour equidistant)
+    """
+    projection = np.random.default_rng(0).standard_normal((latent_dim, dim)).astype(np.float32)
+    vectors = np.empty((count, dim), dtype=np.float32)
+    for start in range(0, count, 100000):
+        end = min(start + 100000, count)
+        latent = rng.standard_normal((end - start, latent_dim)).astype(np.float32)
+        vectors[start:end] = latent @ projection + 0.5 * rng.standard_normal((end - start, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def rss_bytes() -> int:
+    """Resident set size of this process (Linux), or 0 where unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def time_queries(index, queries: np.ndarray, k: int):
+    latencies = []
+    results = []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(index.search(query, k)[0])
+        latencies.append((time.perf_counter() - start) * 1000)
+    return results, np.percentile(latencies, 50), np.percentile(latencies, 95)
+
+
+def recall_at_k(truth, results, k: int) -> float:
+    hits = 0
+    for expected, found in zip(truth, results):
+        hits += len({item_id for item_id, _ in expected[:k]} & {item_id for item_id, _ in found[:k]})
+    return hits / (len(truth) * k)
+
+
+def build(index_class, ids, vectors, **kwargs):
+    before = rss_bytes()
+    start = time.perf_counter()
+    index = index_class(vectors.shape[1], **kwargs)
+    for offset in range(0, len(ids), 50000):
+        index.add(ids[offset:offset + 50000], vectors[offset:offset + 50000])
+    return index, time.perf_counter() - start, rss_bytes() - before
+
+
+def run(size: int, dim: int, num_queries: int, k: int, rng: np.random.Generator):
+    print(f"\n=== {size:,} vectors x {dim} dims ===")
+    vectors = make_vectors(size, dim, rng)
+    queries = make_vectors(num_queries, dim, rng)
+    ids = [str(i) for i in range(size)]
+
+    exact, build_s, rss_delta = build(NumpyIndex, ids, vectors, capacity=size)
+    truth, p50, p95 = time_queries(exact, queries, k)
+    print(f"{'backend':<8} {'build s':>9} {'recall@' + str(k):>10} {'p50 ms':>9} {'p95 ms':>9} {'index MB':>9} {'RSS +MB':>9}")
+    print(f"{'numpy':<8} {build_s:>9.2f} {1.0:>10.3f} {p50:>9.2f} {p95:>9.2f} "
+          f"{exact.memory_bytes() / 2**20:>9.1f} {rss_delta / 2**20:>9.1f}")
+    del exact
+
+    if not hnsw_available():
+        print("hnsw     skipped (pip install hnswlib)")
+        return
+
+    approximate, build_s, rss_delta = build(HNSWIndex, ids, vectors, capacity=size)
+    results, p50, p95 = time_queries(approximate, queries, k)
+    print(f"{'hnsw':<8} {build_s:>9.2f} {recall_at_k(truth, results, k):>10.3f} {p50:>9.2f} {p95:>9.2f} "
+          f"{approximate.memory_bytes() / 2**20:>9.1f} {rss_delta / 2**20:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--dim", type=int, default=384, help="embedding dimension (all-MiniLM-L6-v2 uses 384)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    for size in args.sizes:
+        run(size, args.dim, args.queries, args.k, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-import requests
+from backend.http_client import get_client
 import os
 from dotenv import load_dotenv
 
@@ -15,7 +15,7 @@ def check_available_models():
     
     try:
         headers = {'Authorization': f'Bearer {hf_key}'}
-        response = requests.get('https://huggingface.co/api/models?limit=10&full=false', headers=headers)
+        response = get_client().get('https://huggingface.co/api/models?limit=10&full=false', headers=headers)
         
         print('Status:', response.status_code)
         
@@ -10,7 +10,7 @@ def check_available_models():
     """Check what Hugging Face models are available with the API key"""
     print("Checking available Hugging Face models...")
     
-    import requests
+    from backend.http_client import get_client
     huggingface_api_key = os.getenv("HUGGINGFACE_API_KEY")
     
     if not huggingface_api_key:
@@ -23,7 +23,7 @@ def check_available_models():
         }
         
         # Get list of models
-        response = requests.get('https://huggingface.co/api/models', headers=headers)
+        response = get_client().get('https://huggingface.co/api/models', headers=headers)
         
         if response.status_code == 200:
             models = response.json()
@@ -56,7 +56,7 @@ def test_top_models_for_reports(instruct_models):
     print("\n" + "=" * 60)
     print("Testing top instruct models for report generation...")
     
-    import requests
+    from backend.http_client import get_client
     huggingface_api_key = os.getenv("HUGGINGFACE_API_KEY")
     
     if not huggingface_api_key or not instruct_models:
@@ -88,9 +88,9 @@ def test_top_models_for_reports(instruct_models):
                 }
             }
             
-            response = requests.post(model_url, json=payload, headers=headers, timeout=30)
+            response = get_client().post(model_url, json=payload, headers=headers, timeout=30)
             
-            if response.ok:
+            if response.is_success:
                 result = response.json()
                 content = result[0]["generated_text"] if isinstance(result, list) else result.get("generated_text", "")
                 word_count = len(content.split())
@@ -10,7 +10,7 @@ def check_inference_api_compatible_models():
     """Check for models that are specifically compatible with the inference API"""
     print("Checking for Inference API Compatible Models...")
     
-    import requests
+    from backend.http_client import get_client
     huggingface_api_key = os.getenv("HUGGINGFACE_API_KEY")
     
     if not huggingface_api_key:
@@ -29,7 +29,7 @@ def check_inference_api_compatible_models():
             "limit": 20
         }
         
-        response = requests.get(search_url, headers=headers, params=params, timeout=30)
+        response = get_client().get(search_url, headers=headers, params=params, timeout=30)
         
         if response.status_code == 200:
             models = response.json()
@@ -57,7 +57,7 @@ def test_direct_inference_endpoint(model_id):
     """Test a model using the direct inference endpoint"""
     print(f"\n   Testing direct inference endpoint for {model_id}...")
     
-    import requests
+    from backend.http_client import get_client
     huggingface_api_key = os.getenv("HUGGINGFACE_API_KEY")
     
     if not huggingface_api_key:
@@ -80,9 +80,9 @@ def test_direct_inference_endpoint(model_id):
             }
         }
         
-        response = requests.post(inference_url, json=payload, headers=headers, timeout=30)
+        response = get_client().post(inference_url, json=payload, headers=headers, timeout=30)
         
-        if response.ok:
+        if response.is_success:
             result = response.json()
             content = result[0]["generated_text"] if isinstance(result, list) else result.get("generated_text", "")
             word_count = len(content.split())
@@ -112,7 +112,7 @@ def check_popular_models():
     for model_id in popular_models:
         print(f"\n   Testing {model_id}...")
         
-        import requests
+        from backend.http_client import get_client
         huggingface_api_key = os.getenv("HUGGINGFACE_API_KEY")
         
         if not huggingface_api_key:
@@ -131,9 +131,9 @@ def check_popular_models():
                 "inputs": "The capital of France is"
             }
             
-            response = requests.post(inference_url, json=payload, headers=headers, timeout=30)
+            response = get_client().post(inference_url, json=payload, headers=headers, timeout=30)
             
-            if response.ok:
+            if response.is_success:
                 result = response.json()
                 print(f"   ✅ Success! Model is accessible")
                 working_models.append(model_id)
@@ -1,4 +1,4 @@
-import requests
+from backend.http_client import get_client
 import os
 from dotenv import load_dotenv
 
@@ -20,7 +20,7 @@ def find_text_generation_models():
         print(f"\nSearching for '{search_term}' models...")
         try:
             headers = {'Authorization': f'Bearer {hf_key}'}
-            response = requests.get(f'https://huggingface.co/api/models?search={search_term}&limit=3', headers=headers)
+            response = get_client().get(f'https://huggingface.co/api/models?search={search_term}&limit=3', headers=headers)
             
             if response.status_code == 200:
                 models = response.json()
@@ -54,10 +54,10 @@ def test_model_accessibility(model_id):
         }
         
         router_url = f"https://router.huggingface.co/models/{model_id}"
-        response = requests.post(router_url, json=payload, headers=headers, timeout=10)
+        response = get_client().post(router_url, json=payload, headers=headers, timeout=10)
         
-        print(f"  {model_id}: {'✅ PASS' if response.ok else f'❌ FAIL ({response.status_code})'}")
-        return response.ok
+        print(f"  {model_id}: {'✅ PASS' if response.is_success else f'❌ FAIL ({response.status_code})'}")
+        return response.is_success
     except Exception as e:
         print(f"  {model_id}: ❌ ERROR ({str(e)[:50]})")
         return False
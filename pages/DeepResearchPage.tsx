@@ -6,7 +6,7 @@ import { ChatPanel } from '../components/ChatPanel';
 import { WaveLoader } from '../components/WaveLoader';
 import { LayersIcon, GlobeIcon, ArrowLeftIcon, DownloadIcon, FileIcon } from '../components/Icons';
 import { ResearchStatus, LogEntry, AgentEvent, ResearchResult, ChatMessage } from '../types';
-import { askFollowUp } from '../services/analysisService';
+import { streamFollowUp } from '../services/analysisService';
 import { logActivity } from '../services/mongoService';
 import { exportToPDF, exportToDOCX } from '../services/exportService';
 
@@ -109,8 +109,13 @@ export const DeepResearchPage: React.FC<DeepResearchPageProps> = ({ initialQuery
     setChatMessages(p => [...p, userMsg]);
     setIsLoadingChat(true);
     try {
-      const answer = await askFollowUp(chatMessages, currentContext, question);
-      setChatMessages(p => [...p, { id: generateId(), role: 'assistant', content: answer, timestamp: new Date() }]);
+      // Show the answer as it streams in, adding the message on the first token
+      const answerId = generateId();
+      await streamFollowUp(currentContext, question, result?.session_id, partial => {
+        setChatMessages(p => p.some(m => m.id === answerId)
+          ? p.map(m => m.id === answerId ? { ...m, content: partial } : m)
+          : [...p, { id: answerId, role: 'assistant', content: partial, timestamp: new Date() }]);
+      });
     } catch (e: any) {
       setLogs(prev => [...prev, { id: generateId(), message: `Chat Error: ${e.message}`, timestamp: new Date(), type: 'error' }]);
       setChatMessages(p => [...p, { id: generateId(), role: 'assistant', content: "System Error: Unable to process request.", timestamp: new Date() }]);
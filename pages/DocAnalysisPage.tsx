@@ -6,7 +6,7 @@ import { WaveLoader } from '../components/WaveLoader';
 import { FileUploader } from '../components/FileUploader';
 import { ActivityIcon, ArrowLeftIcon, DownloadIcon, FileIcon } from '../components/Icons';
 import { ResearchStatus, LogEntry, ResearchResult, ChatMessage } from '../types';
-import { askFollowUp, analyzeDocument } from '../services/analysisService';
+import { streamFollowUp, uploadDocument } from '../services/analysisService';
 import { logActivity } from '../services/mongoService';
 import { exportToPDF, exportToDOCX } from '../services/exportService';
 
@@ -48,34 +48,25 @@ export const DocAnalysisPage: React.FC<DocAnalysisPageProps> = ({ initialFile, o
     });
 
     try {
-        const reader = new FileReader();
-        reader.onload = async (e) => {
-          try {
-             const base64 = (e.target?.result as string).split(',')[1];
-             setStatus(ResearchStatus.SYNTHESIZING);
-             setLogs(p => [...p, { id: generateId(), message: 'RAG Protocol: Retrieving key contexts...', timestamp: new Date(), type: 'info' }]);
-             
-             const data = await analyzeDocument(base64, file.type || 'text/plain');
-             setResult(data);
-             setStatus(ResearchStatus.COMPLETED);
-             setLogs(p => [...p, { id: generateId(), message: 'Analysis Complete', timestamp: new Date(), type: 'success' }]);
-             
-             // Initialize chat with a welcome message
-             setChatMessages([{
-               id: generateId(),
-               role: 'assistant',
-               content: `I've analyzed the document "${file.name}" and am ready to answer your questions about its content. What would you like to know?`,
-               timestamp: new Date()
-             }]);
-          } catch (analysisError: any) {
-             setStatus(ResearchStatus.ERROR);
-             setLogs(p => [...p, { id: generateId(), message: `Analysis Error: ${analysisError.message}`, timestamp: new Date(), type: 'error' }]);
-          }
-        };
-        reader.readAsDataURL(file);
+        setStatus(ResearchStatus.SYNTHESIZING);
+        setLogs(p => [...p, { id: generateId(), message: 'RAG Protocol: Retrieving key contexts...', timestamp: new Date(), type: 'info' }]);
+        
+        // The file is streamed as multipart/form-data instead of a base64 data URL
+        const data = await uploadDocument(file);
+        setResult(data);
+        setStatus(ResearchStatus.COMPLETED);
+        setLogs(p => [...p, { id: generateId(), message: 'Analysis Complete', timestamp: new Date(), type: 'success' }]);
+        
+        // Initialize chat with a welcome message
+        setChatMessages([{
+          id: generateId(),
+          role: 'assistant',
+          content: `I've analyzed the document "${file.name}" and am ready to answer your questions about its content. What would you like to know?`,
+          timestamp: new Date()
+        }]);
     } catch (e: any) {
         setStatus(ResearchStatus.ERROR);
-        setLogs(p => [...p, { id: generateId(), message: `Upload Failed: ${e.message}`, timestamp: new Date(), type: 'error' }]);
+        setLogs(p => [...p, { id: generateId(), message: `Analysis Error: ${e.message}`, timestamp: new Date(), type: 'error' }]);
     }
   };
 
@@ -92,8 +83,13 @@ export const DocAnalysisPage: React.FC<DocAnalysisPageProps> = ({ initialFile, o
     setIsLoadingChat(true);
     
     try {
-        const answer = await askFollowUp(chatMessages, result.report, question);
-        setChatMessages(p => [...p, { id: generateId(), role: 'assistant', content: answer, timestamp: new Date() }]);
+        // Show the answer as it streams in, adding the message on the first token
+        const answerId = generateId();
+        await streamFollowUp(result.report, question, result.session_id, partial => {
+          setChatMessages(p => p.some(m => m.id === answerId)
+            ? p.map(m => m.id === answerId ? { ...m, content: partial } : m)
+            : [...p, { id: answerId, role: 'assistant', content: partial, timestamp: new Date() }]);
+        });
     } catch (e: any) {
         setLogs(p => [...p, { id: generateId(), message: `Chat Error: ${e.message}`, timestamp: new Date(), type: 'error' }]);
         setChatMessages(p => [...p, { id: generateId(), role: 'assistant', content: "Error: Unable to fetch response.", timestamp: new Date() }]);
@@ -25,6 +25,33 @@ export const analyzeDocument = async (fileBase64: string, mimeType: string): Pro
   }
 };
 
+/**
+ * Upload a document for analysis as multipart/form-data (no base64 encoding)
+ */
+export const uploadDocument = async (file: File): Promise<ResearchResult> => {
+  const form = new FormData();
+  form.append("file", file);
+  form.append("mime_type", file.type || "text/plain");
+
+  const response = await fetch(getApiUrl('/api/document-analysis/upload'), {
+    method: "POST",
+    body: form
+  });
+
+  if (!response.ok) {
+    let errorMessage = `Document analysis failed: ${response.statusText}`;
+    try {
+      const errorData = await response.json();
+      if (errorData.detail) errorMessage = errorData.detail;
+    } catch (e) {
+      // Keep the status text
+    }
+    throw new Error(errorMessage);
+  }
+
+  return await response.json();
+};
+
 /**
  * Ask a question using the AI Chatbot
  */
@@ -55,21 +82,28 @@ export const askQuestion = async (question: string, context: string): Promise<st
 export const askFollowUp = async (
   history: ChatMessage[], 
   context: string, 
-  question: string
+  question: string,
+  sessionId?: string
 ): Promise<string> => {
   try {
-    // Use backend API for AI Chatbot
-    const response = await fetch(getApiUrl('/api/question'), {
+    const post = (body: object) => fetch(getApiUrl('/api/question'), {
       method: "POST",
       headers: {
         "Content-Type": "application/json",
       },
-      body: JSON.stringify({
-        question: question,
-        context: context,
-      }),
+      body: JSON.stringify(body),
     });
 
+    // With a session the backend already holds the context; only send the question
+    let response = sessionId
+      ? await post({ question: question, session_id: sessionId })
+      : await post({ question: question, context: context });
+
+    // Expired or unknown session: fall back to sending the full context
+    if (sessionId && response.status === 404) {
+      response = await post({ question: question, context: context });
+    }
+
     if (!response.ok) {
       const errorData = await response.json();
       throw new Error(errorData.detail || "AI Chatbot failed");
@@ -81,4 +115,66 @@ export const askFollowUp = async (
     console.error("Chat failed:", error);
     throw error;
   }
-};
\ No newline at end of file
+};
+/**
+ * Streaming AI Chatbot: calls onToken with the answer so far as it is generated
+ */
+export const streamFollowUp = async (
+  context: string,
+  question: string,
+  sessionId: string | undefined,
+  onToken: (partialAnswer: string) => void
+): Promise<string> => {
+  const post = (body: object) => fetch(getApiUrl('/api/question/stream'), {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(body),
+  });
+
+  let response = sessionId
+    ? await post({ question: question, session_id: sessionId })
+    : await post({ question: question, context: context });
+
+  // Expired or unknown session: fall back to sending the full context
+  if (sessionId && response.status === 404) {
+    response = await post({ question: question, context: context });
+  }
+
+  if (!response.ok || !response.body) {
+    let errorMessage = "AI Chatbot failed";
+    try {
+      const errorData = await response.json();
+      if (errorData.detail) errorMessage = errorData.detail;
+    } catch (e) {
+      errorMessage = response.statusText || errorMessage;
+    }
+    throw new Error(errorMessage);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let answer = "";
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // Server-sent events are separated by a blank line
+    const events = buffer.split("\n\n");
+    buffer = events.pop() || "";
+    for (const rawEvent of events) {
+      if (!rawEvent.startsWith("data:")) continue;
+      const event = JSON.parse(rawEvent.slice(5).trim());
+      if (event.type === "token") {
+        answer += event.text;
+        onToken(answer);
+      } else if (event.type === "error") {
+        throw new Error(event.message || "AI Chatbot failed");
+      }
+    }
+  }
+
+  return answer;
+};
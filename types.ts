@@ -8,6 +8,7 @@ export interface ResearchResult {
   report: string;
   sources: Source[];
   images?: string[];
+  session_id?: string;
 }
 
 export enum ResearchStatus {